@@ -0,0 +1,108 @@
+"""Micro-benchmark for conforming report rows to their stream schema.
+
+Compares the SDK's generic `_conform_record_data_types` walker with
+`tap_googleads.transform.RecordConformer`, which compiles the conversion of
+every property from the schema, on click_view and campaign performance rows
+with their int64 metrics typed as integers. The SDK walker leaves the int64
+strings as they are, so the conformer is timed doing more work.
+
+Usage:
+    poetry run python benchmarks/bench_conform.py [rows] [repeat]
+"""
+
+import json
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+from singer_sdk.helpers._typing import (
+    TypeConformanceLevel,
+    _conform_record_data_types,
+)
+
+from tap_googleads.transform import RecordConformer, int64_as_integer
+
+SCHEMAS = Path(__file__).parent.parent / "tap_googleads" / "schemas"
+
+
+def click_view_row(row: int) -> dict:
+    """Build a row shaped like a click_view report result."""
+    return {
+        "clickView": {
+            "gclid": f"gclid-{row}",
+            "adGroupAd": f"customers/1234/adGroupAds/1~{row}",
+            "keyword": f"customers/1234/adGroupCriteria/1~{row}",
+            "keywordInfo": {"matchType": "BROAD"},
+        },
+        "customer": {"id": "1234"},
+        "adGroup": {"id": "1", "name": "Ad group"},
+        "campaign": {"id": "2", "name": "Campaign"},
+        "segments": {
+            "adNetworkType": "SEARCH",
+            "device": "MOBILE",
+            "slot": "SEARCH_TOP",
+            "clickType": "URL_CLICKS",
+        },
+        "metrics": {"clicks": "1"},
+        "date": "2024-01-01",
+    }
+
+
+def campaign_performance_row(row: int) -> dict:
+    """Build a row shaped like a campaign performance report result."""
+    return {
+        "campaign": {"name": f"Campaign {row}", "status": "ENABLED"},
+        "segments": {"date": "2024-01-01", "device": "MOBILE"},
+        "metrics": {
+            "clicks": str(row),
+            "costMicros": str(row * 10000),
+            "impressions": str(row * 20),
+            "ctr": 0.05,
+            "averageCpc": 1.5,
+        },
+        "customer_id": "1234",
+        "date": "2024-01-01",
+    }
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    logger = logging.getLogger("bench")
+    for name, build_row in (
+        ("click_view_report", click_view_row),
+        ("campaign_performance", campaign_performance_row),
+    ):
+        api_schema = json.loads((SCHEMAS / f"{name}.json").read_text())
+        records = [build_row(row) for row in range(rows)]
+        assert [RecordConformer(api_schema, name, logger)(r) for r in records[:10]] == [
+            _conform_record_data_types(
+                r, api_schema, TypeConformanceLevel.RECURSIVE, None
+            )[0]
+            for r in records[:10]
+        ]
+        schema = int64_as_integer(api_schema)
+        conformer = RecordConformer(schema, name, logger)
+
+        def generic():
+            return [
+                _conform_record_data_types(
+                    record, schema, TypeConformanceLevel.RECURSIVE, None
+                )[0]
+                for record in records
+            ]
+
+        def compiled():
+            return [conformer(record) for record in records]
+
+        baseline = min(timeit.repeat(generic, number=1, repeat=repeat))
+        fast = min(timeit.repeat(compiled, number=1, repeat=repeat))
+        print(f"{name} ({rows} rows)")
+        print(f"  SDK conformance:  {rows / baseline:10.0f} records/s")
+        print(f"  RecordConformer:  {rows / fast:10.0f} records/s")
+        print(f"  speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark for decoding a googleAds:search page.
+
+Compares the SDK default, where the paginator and `parse_response` each call
+`response.json()` on the same page, with the shared single decode done by
+`tap_googleads.decoding.decode_response`. The same rows are then decoded from a
+`googleAds:searchStream` body, one batch at a time as its chunks arrive, against
+decoding them as `googleAds:search` pages.
+
+Usage:
+    poetry run python benchmarks/bench_decode.py [rows] [repeat]
+"""
+
+import json
+import sys
+import timeit
+
+import requests
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_googleads.decoding import _json, decode_response, iter_json_array
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_body(rows: int) -> dict:
+    """Build a search page shaped like a campaign performance report."""
+    return {
+        "results": [
+            {
+                "campaign": {
+                    "resourceName": f"customers/1234/campaigns/{row}",
+                    "name": f"Campaign {row}",
+                    "status": "ENABLED",
+                },
+                "segments": {"device": "MOBILE", "date": "2024-01-01"},
+                "metrics": {
+                    "clicks": str(row),
+                    "impressions": str(row * 10),
+                    "ctr": 0.1,
+                    "averageCpc": 1234.5,
+                    "costMicros": str(row * 1000),
+                },
+            }
+            for row in range(rows)
+        ],
+        "nextPageToken": "token",
+        "fieldMask": "campaign.name,campaign.status,segments.device",
+    }
+
+
+def build_response(rows: int) -> requests.Response:
+    """Build a search page response."""
+    response = requests.Response()
+    response._content = json.dumps(build_body(rows)).encode()
+    response.status_code = 200
+    return response
+
+
+def parse_twice(response: requests.Response) -> None:
+    """Decode the page once for records and once more for the page token."""
+    for _ in extract_jsonpath("$.results[*]", input=response.json()):
+        pass
+    response.json().get("nextPageToken")
+
+
+def parse_once(response: requests.Response) -> None:
+    """Decode the page once, sharing it between records and the page token."""
+    response.__dict__.pop("_tap_googleads_decoded_body", None)
+    for _ in decode_response(response).get("results", []):
+        pass
+    decode_response(response).get("nextPageToken")
+
+
+def parse_pages(pages: list) -> None:
+    """Decode the rows of every search page."""
+    for response in pages:
+        response.__dict__.pop("_tap_googleads_decoded_body", None)
+        for _ in decode_response(response).get("results", []):
+            pass
+
+
+def parse_stream(body: bytes) -> None:
+    """Decode the rows of a searchStream body, chunk by chunk."""
+    chunks = (body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    for batch in iter_json_array(chunks):
+        for _ in batch.get("results", []):
+            pass
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    response = build_response(rows)
+    print(f"page: {rows} rows, {len(response.content) / 1e6:.1f} MB")
+    print(f"decoder: {_json.__name__}")
+
+    baseline = min(
+        timeit.repeat(lambda: parse_twice(response), number=1, repeat=repeat)
+    )
+    shared = min(timeit.repeat(lambda: parse_once(response), number=1, repeat=repeat))
+    print(f"response.json() twice: {baseline * 1000:8.1f} ms/page")
+    print(f"decode_response once:  {shared * 1000:8.1f} ms/page")
+    print(f"speedup: {baseline / shared:.1f}x")
+
+    # searchStream sends the same rows in batches of up to 10000 rows
+    pages = [build_response(rows) for _ in range(4)]
+    stream = json.dumps([build_body(rows) for _ in range(4)]).encode()
+    print(f"searchStream: 4 batches of {rows} rows, {len(stream) / 1e6:.1f} MB")
+    search = min(timeit.repeat(lambda: parse_pages(pages), number=1, repeat=repeat))
+    streamed = min(timeit.repeat(lambda: parse_stream(stream), number=1, repeat=repeat))
+    print(f"search pages:          {search * 1000:8.1f} ms")
+    print(f"searchStream chunks:   {streamed * 1000:8.1f} ms")
+    print(f"ratio: {streamed / search:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
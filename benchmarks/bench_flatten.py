@@ -0,0 +1,90 @@
+"""Micro-benchmark for flattening click_view rows into snake_case keys.
+
+Compares a per-row recursive walk that runs the camelCase to snake_case regex
+on every key with `tap_googleads.transform.RecordFlattener`, which works out
+every output key once from the stream schema.
+
+Usage:
+    poetry run python benchmarks/bench_flatten.py [rows] [repeat]
+"""
+
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+from tap_googleads.transform import RecordFlattener
+
+SCHEMA = json.loads(
+    (
+        Path(__file__).parent.parent
+        / "tap_googleads"
+        / "schemas"
+        / "click_view_report.json"
+    ).read_text()
+)
+
+
+def build_rows(rows: int) -> list:
+    """Build rows shaped like click_view report results."""
+    return [
+        {
+            "clickView": {
+                "gclid": f"gclid-{row}",
+                "adGroupAd": f"customers/1234/adGroupAds/1~{row}",
+                "keyword": f"customers/1234/adGroupCriteria/1~{row}",
+                "keywordInfo": {"matchType": "BROAD"},
+            },
+            "customer": {"id": "1234"},
+            "adGroup": {"id": "1", "name": "Ad group"},
+            "campaign": {"id": "2", "name": "Campaign"},
+            "segments": {
+                "adNetworkType": "SEARCH",
+                "device": "MOBILE",
+                "slot": "SEARCH_TOP",
+                "clickType": "URL_CLICKS",
+            },
+            "metrics": {"clicks": "1"},
+            "date": "2024-01-01",
+        }
+        for row in range(rows)
+    ]
+
+
+def flatten_with_regex(row: dict, prefix: str = "", flat: dict = None) -> dict:
+    """Flatten a row, converting every key with a regex."""
+    flat = {} if flat is None else flat
+    for key, value in row.items():
+        name = prefix + re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+        if isinstance(value, dict):
+            flatten_with_regex(value, name + "__", flat)
+        else:
+            flat[name] = value
+    return flat
+
+
+def main() -> None:
+    rows = build_rows(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    flattener = RecordFlattener(SCHEMA)
+    assert [flattener(row) for row in rows[:10]] == [
+        flatten_with_regex(row) for row in rows[:10]
+    ]
+
+    baseline = min(
+        timeit.repeat(
+            lambda: [flatten_with_regex(row) for row in rows], number=1, repeat=repeat
+        )
+    )
+    compiled = min(
+        timeit.repeat(lambda: [flattener(row) for row in rows], number=1, repeat=repeat)
+    )
+    print(f"rows: {len(rows)}")
+    print(f"regex per key:     {baseline * 1000:8.1f} ms")
+    print(f"RecordFlattener:   {compiled * 1000:8.1f} ms")
+    print(f"speedup: {baseline / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
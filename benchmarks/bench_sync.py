@@ -0,0 +1,194 @@
+"""End-to-end benchmark of syncing streams against the local replay server.
+
+Each stream is synced alone, in a fresh process, against synthetic pages served
+by `benchmarks/replay_server.py`, and its records, wall time, records per second
+and peak resident memory are reported. The data served only depends on the
+options, so results saved with `--output` can be compared with those of another
+commit using `--baseline`, which fails when a stream got slower than the
+tolerance allows.
+
+Usage:
+    poetry run python benchmarks/bench_sync.py [--streams NAME ...] [options]
+        [--setting NAME=JSON ...]
+        [--output results.json] [--baseline results.json [--tolerance 0.1]]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from replay_server import ReplayOptions, ReplayServer
+
+DEFAULT_STREAMS = [
+    "stream_campaign_performance",
+    "stream_adgroupsperformance",
+    "stream_click_view_report",
+]
+
+
+def sync_stream(stream_name: str, config: dict, url: str) -> Dict[str, Any]:
+    """Sync one stream with its parents, writing its messages to /dev/null."""
+    from singer_sdk._singerlib import Catalog, RecordMessage
+    from singer_sdk.helpers._catalog import (
+        deselect_all_streams,
+        set_catalog_stream_selected,
+    )
+
+    from tap_googleads.client import GoogleAdsStream
+    from tap_googleads.tap import TapGoogleAds
+
+    logging.disable(logging.WARNING)
+    GoogleAdsStream.url_base = f"{url}/v18"
+    catalog = Catalog.from_dict(TapGoogleAds(config=config).catalog_dict)
+    deselect_all_streams(catalog)
+    set_catalog_stream_selected(catalog, stream_name, selected=True)
+    tap = TapGoogleAds(config=config, catalog=catalog.to_dict())
+
+    records = 0
+    write_message = tap.write_message
+
+    def count_records(message: Any) -> None:
+        nonlocal records
+        if isinstance(message, RecordMessage):
+            records += 1
+        write_message(message)
+
+    tap.write_message = count_records  # type: ignore[method-assign]
+    stdout = sys.stdout
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            tap.sync_all()
+        finally:
+            sys.stdout = stdout
+    seconds = time.perf_counter() - start
+    return {
+        "records": records,
+        "wall_seconds": round(seconds, 3),
+        "records_per_second": round(records / seconds, 1),
+        # Kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def tap_config(url: str, days: int) -> dict:
+    # Ending yesterday, as click_view is always synced up to yesterday, so every
+    # stream syncs the same number of days whatever day it runs
+    end_date = date.today() - timedelta(days=1)
+    return {
+        "oauth_credentials": {
+            "refresh_proxy_url": f"{url}/token",
+            "refresh_token": "replay",
+        },
+        "login_customer_id": "1000000000",
+        "developer_token": "replay",
+        "start_date": (end_date - timedelta(days=days - 1)).isoformat(),
+        "end_date": end_date.isoformat(),
+        "enable_click_view_report_stream": True,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Describe the streams that got slower than `baseline` by over `tolerance`."""
+    slower = []
+    for stream_name, result in results["streams"].items():
+        before = baseline["streams"].get(stream_name)
+        if not before:
+            continue
+        ratio = result["records_per_second"] / before["records_per_second"]
+        if ratio < 1 - tolerance:
+            slower.append(
+                f"{stream_name}: {result['records_per_second']} records/s, "
+                f"{before['records_per_second']} at {baseline.get('commit')}"
+            )
+    return slower
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", nargs="+", default=DEFAULT_STREAMS)
+    parser.add_argument("--days", type=int, default=7, help="days synced")
+    parser.add_argument(
+        "--setting",
+        action="append",
+        default=[],
+        metavar="NAME=JSON",
+        help="tap setting to sync with, e.g. page_prefetch_depth=2",
+    )
+    ReplayOptions.add_arguments(parser)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results of another run to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="share of a baseline's records per second a stream may lose",
+    )
+    args = parser.parse_args()
+    options = ReplayOptions.from_arguments(args)
+    settings = {
+        name: json.loads(value)
+        for name, value in (setting.split("=", 1) for setting in args.setting)
+    }
+
+    results: Dict[str, Any] = {
+        "commit": git_commit(),
+        "options": {**vars(options), "days": args.days, "settings": settings},
+        "streams": {},
+    }
+    spawn = multiprocessing.get_context("spawn")
+    with ReplayServer(options) as server:
+        config = {**tap_config(server.url, args.days), **settings}
+        for stream_name in args.streams:
+            with ProcessPoolExecutor(1, mp_context=spawn) as executor:
+                result = executor.submit(
+                    sync_stream, stream_name, config, server.url
+                ).result()
+            results["streams"][stream_name] = result
+            print(
+                f"{stream_name:<60} {result['records']:>9} records "
+                f"{result['wall_seconds']:>8.2f}s "
+                f"{result['records_per_second']:>10.1f} records/s "
+                f"{result['peak_rss_mb']:>8.1f} MB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            slower = regressions(results, json.load(file), args.tolerance)
+        for line in slower:
+            print(f"Regression: {line}", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
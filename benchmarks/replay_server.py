@@ -0,0 +1,287 @@
+"""Local stand-in for the Google Ads API, serving synthetic report pages.
+
+Answers the token, `customers:listAccessibleCustomers`, `googleAds:search` and
+`googleAds:searchStream` requests the tap makes, without network access or
+credentials. Report rows are generated from the fields selected by the GAQL
+query, spread over the days of its date range, so any stream can be synced
+against it. Rows, pages, latency and errors are derived from the options and a
+fixed seed, so runs against the same options serve identical responses.
+
+Usage:
+    poetry run python benchmarks/replay_server.py [--port 8765] [options]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+ACCESSIBLE_CUSTOMER_ID = "1000000000"
+
+_QUERY = re.compile(r"select\s+(?P<fields>.*?)\s+from\s+(?P<resource>\w+)", re.I | re.S)
+_DATE = re.compile(r"'(\d{4}-\d{2}-\d{2})'")
+_SEARCH = re.compile(r"/customers/(?P<customer_id>\d+)/googleAds:(?P<method>\w+)$")
+
+
+@dataclass
+class ReplayOptions:
+    """What the replay server serves."""
+
+    customers: int = 2
+    rows_per_day: int = 1000
+    rows_per_query: int = 1000
+    page_size: int = 10000
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        """Add an option per field to `parser`."""
+        defaults = cls()
+        parser.add_argument("--customers", type=int, default=defaults.customers)
+        parser.add_argument(
+            "--rows-per-day",
+            type=int,
+            default=defaults.rows_per_day,
+            help="rows per customer and day of date ranged reports",
+        )
+        parser.add_argument(
+            "--rows-per-query",
+            type=int,
+            default=defaults.rows_per_query,
+            help="rows per customer of other queries",
+        )
+        parser.add_argument("--page-size", type=int, default=defaults.page_size)
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=defaults.latency_ms,
+            help="delay before each response",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=defaults.error_rate,
+            help="share of API requests answered with a retryable quota error",
+        )
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+
+    @classmethod
+    def from_arguments(cls, args: argparse.Namespace) -> "ReplayOptions":
+        return cls(
+            customers=args.customers,
+            rows_per_day=args.rows_per_day,
+            rows_per_query=args.rows_per_query,
+            page_size=args.page_size,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+
+
+def _camel_case(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(part.capitalize() for part in rest)
+
+
+def _value(field: str, row: int) -> Any:
+    leaf = field.rsplit(".", 1)[-1]
+    if field.startswith("metrics."):
+        if leaf in ("ctr", "average_cpc", "conversions"):
+            return round(row * 0.37 % 100, 2)
+        return str(row * 7 % 10000)
+    if leaf == "id" or leaf.endswith("_micros"):
+        return str(1000000 + row)
+    if leaf in ("status", "type", "device", "slot", "match_type", "click_type"):
+        return "ENABLED" if leaf == "status" else "UNKNOWN"
+    if leaf == "manager":
+        return False
+    if leaf == "level":
+        return "1"
+    return f"{leaf}-{row}"
+
+
+def _set(row: Dict[str, Any], field: str, value: Any) -> None:
+    *parents, leaf = [_camel_case(part) for part in field.split(".")]
+    for parent in parents:
+        row = row.setdefault(parent, {})
+    row[leaf] = value
+
+
+class ReplayServer:
+    """Serve synthetic Google Ads API responses on a local port."""
+
+    def __init__(self, options: ReplayOptions, port: int = 0) -> None:
+        self.options = options
+        self._random = random.Random(options.seed)
+        self._random_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        # Pages of a query are sliced from rows generated once
+        self._cached_rows = lru_cache(maxsize=64)(self.rows)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _fails(self) -> bool:
+        with self._random_lock:
+            return self._random.random() < self.options.error_rate
+
+    def customer_ids(self) -> List[str]:
+        return [str(2000000000 + index) for index in range(self.options.customers)]
+
+    def rows(self, customer_id: str, query: str) -> List[Dict[str, Any]]:
+        """Return every row the query selects for the customer."""
+        match = _QUERY.search(query)
+        if match is None:
+            return []
+        fields = [field.strip() for field in match.group("fields").split(",")]
+        if match.group("resource") == "customer_client":
+            if customer_id != ACCESSIBLE_CUSTOMER_ID:
+                return []
+            return [self._client_row(client_id) for client_id in self.customer_ids()]
+
+        days = [date.fromisoformat(day) for day in _DATE.findall(query)]
+        if days:
+            start, end = min(days), max(days)
+            count = ((end - start).days + 1) * self.options.rows_per_day
+        else:
+            start, count = None, self.options.rows_per_query
+        rows = []
+        for index in range(count):
+            row: Dict[str, Any] = {}
+            for field in fields:
+                _set(row, field, _value(field, index))
+            if start is not None:
+                day = start + timedelta(days=index // self.options.rows_per_day)
+                _set(row, "segments.date", day.isoformat())
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _client_row(customer_id: str) -> Dict[str, Any]:
+        return {
+            "customerClient": {
+                "resourceName": f"customers/{ACCESSIBLE_CUSTOMER_ID}"
+                f"/customerClients/{customer_id}",
+                "clientCustomer": f"customers/{customer_id}",
+                "level": "1",
+                "status": "ENABLED",
+                "manager": False,
+                "descriptiveName": f"Customer {customer_id}",
+                "id": customer_id,
+            }
+        }
+
+    def search_page(
+        self, customer_id: str, query: str, page_token: Optional[str]
+    ) -> Dict[str, Any]:
+        rows = self._cached_rows(customer_id, query)
+        offset = int(page_token or 0)
+        end = offset + self.options.page_size
+        page: Dict[str, Any] = {"results": rows[offset:end]}
+        if end < len(rows):
+            page["nextPageToken"] = str(end)
+        return page
+
+    def search_stream(self, customer_id: str, query: str) -> List[Dict[str, Any]]:
+        rows = self._cached_rows(customer_id, query)
+        size = self.options.page_size
+        pages = []
+        for offset in range(0, max(len(rows), 1), size):
+            end = offset + size
+            pages.append({"results": rows[offset:end]})
+        return pages
+
+    def respond(self, path: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        """Return the status and JSON body of the response to a request."""
+        url = urlparse(path)
+        if url.path.endswith("/token"):
+            return 200, {"access_token": "replay", "expires_in": 3600}
+        if self.options.latency_ms:
+            time.sleep(self.options.latency_ms / 1000)
+        if self._fails():
+            return 429, {
+                "error": {
+                    "code": 429,
+                    "status": "RESOURCE_EXHAUSTED",
+                    "details": [{"retryDelay": "0s"}],
+                }
+            }
+        if url.path.endswith("customers:listAccessibleCustomers"):
+            return 200, {"resourceNames": [f"customers/{ACCESSIBLE_CUSTOMER_ID}"]}
+        match = _SEARCH.search(url.path)
+        if match is None:
+            return 404, {"error": {"code": 404, "status": "NOT_FOUND"}}
+        query = body.get("query") or parse_qs(url.query).get("query", [""])[0]
+        customer_id = match.group("customer_id")
+        if match.group("method") == "searchStream":
+            return 200, self.search_stream(customer_id, query)
+        return 200, self.search_page(customer_id, query, body.get("pageToken"))
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: Any) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                self._send(*server.respond(self.path, {}))
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._send(*server.respond(self.path, body))
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    ReplayOptions.add_arguments(parser)
+    args = parser.parse_args()
+    with ReplayServer(ReplayOptions.from_arguments(args), args.port) as server:
+        print(f"Serving on {server.url}, press Ctrl+C to stop")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
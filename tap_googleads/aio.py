@@ -0,0 +1,265 @@
+"""Asyncio engine sending the report queries of every stream on one event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from tap_googleads.parallel import _DONE, _Failure
+from tap_googleads.session import _API_URL
+from tap_googleads.throttle import RateLimiter, retry_delay
+
+if TYPE_CHECKING:
+    from tap_googleads.client import GoogleAdsStream
+
+# Pages of a query fetched ahead of the records being read
+DEFAULT_BUFFER_PAGES = 2
+
+
+def _import_httpx() -> Any:
+    try:
+        import httpx
+    except ImportError as ex:
+        raise ImportError(
+            "The async_requests setting requires httpx: "
+            "pip install 'tap-googleads[async]'"
+        ) from ex
+    return httpx
+
+
+class PageIterator:
+    """Synchronous iterator over the responses of a query run by the engine.
+
+    Pages are fetched on the event loop, up to `buffer_pages` ahead of the
+    reader. Closing the iterator cancels the query.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, buffer: asyncio.Queue, task: Any
+    ) -> None:
+        self._loop = loop
+        self._buffer = buffer
+        self._task = task
+
+    def __iter__(self) -> "PageIterator":
+        return self
+
+    def __next__(self) -> requests.Response:
+        item = asyncio.run_coroutine_threadsafe(self._buffer.get(), self._loop).result()
+        if item is _DONE:
+            raise StopIteration
+        if isinstance(item, _Failure):
+            raise item.exception
+        return item
+
+    def close(self) -> None:
+        self._task.cancel()
+
+
+class AsyncRequestEngine:
+    """Send API requests of many queries at once from a single event loop.
+
+    The loop runs on its own thread with an httpx client, and every query started
+    with `pages` is paginated there as a task. At most `max_in_flight` requests
+    are in flight at a time across all streams and customers, on top of the rate
+    and per-customer limits of the shared `RateLimiter`. Retries follow each
+    stream's backoff settings, and responses are handed back as `requests`
+    responses, so the streams parse them and write records as they otherwise do.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        rate_limiter: Optional[RateLimiter] = None,
+        *,
+        http2: bool = False,
+        buffer_pages: int = DEFAULT_BUFFER_PAGES,
+    ) -> None:
+        """Start the event loop; httpx is required."""
+        self._httpx = _import_httpx()
+        self.max_in_flight = max(max_in_flight, 1)
+        self.rate_limiter = rate_limiter
+        self.buffer_pages = buffer_pages
+        self._http2 = http2
+        self._client: Any = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="tap-googleads-aio", daemon=True
+        )
+        self._thread.start()
+        self._in_flight = self._run(self._create(asyncio.Semaphore, self.max_in_flight))
+        self._customer_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def _run(self, coroutine: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _create(factory: Any, *args: Any) -> Any:
+        # Synchronization primitives belong to the loop they are created on
+        return factory(*args)
+
+    def pages(self, stream: GoogleAdsStream, context: Optional[dict]) -> PageIterator:
+        """Start requesting every page of `stream`'s query for `context`."""
+        buffer = self._run(self._create(asyncio.Queue, self.buffer_pages))
+        task = asyncio.run_coroutine_threadsafe(
+            self._paginate(stream, context, buffer), self._loop
+        )
+        return PageIterator(self._loop, buffer, task)
+
+    def close(self) -> None:
+        """Cancel unfinished queries, close the client and stop the loop."""
+        if self._loop.is_closed():
+            return
+        self._run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _paginate(
+        self, stream: GoogleAdsStream, context: Optional[dict], buffer: asyncio.Queue
+    ) -> None:
+        task = asyncio.current_task()
+        self._tasks.add(task)  # type: ignore[arg-type]
+
+        # Decorated like `_request`, so backoff handlers get the same arguments
+        async def request(
+            prepared_request: requests.PreparedRequest, context: Optional[dict]
+        ) -> requests.Response:
+            return await self._send(stream, prepared_request, context)
+
+        send = stream.request_decorator(request)
+        try:
+            paginator = stream.get_new_paginator()
+            while not paginator.finished:
+                # Authenticating may refresh the access token, briefly blocking the
+                # loop about once an hour
+                prepared_request = stream.prepare_request(
+                    context, next_page_token=paginator.current_value
+                )
+                response = await send(prepared_request, context)
+                await buffer.put(response)
+                paginator.advance(response)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as ex:  # noqa: BLE001 - re-raised by the reader
+            await buffer.put(_Failure(ex))
+        else:
+            await buffer.put(_DONE)
+        finally:
+            self._tasks.discard(task)  # type: ignore[arg-type]
+
+    def _customer_slot(self, url: str) -> Optional[asyncio.Semaphore]:
+        limit = self.rate_limiter and self.rate_limiter.max_requests_per_customer
+        match = _API_URL.match(url)
+        if not limit or match is None or match.group("customer_id") is None:
+            return None
+        customer_id = match.group("customer_id")
+        if customer_id not in self._customer_slots:
+            self._customer_slots[customer_id] = asyncio.Semaphore(limit)
+        return self._customer_slots[customer_id]
+
+    async def _throttle(self) -> None:
+        while self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def _send(
+        self,
+        stream: GoogleAdsStream,
+        prepared_request: requests.PreparedRequest,
+        context: Optional[dict],
+    ) -> requests.Response:
+        url = prepared_request.url or ""
+        customer_slot = self._customer_slot(url)
+        # Wait for the customer first, so waiting holds no slot other customers need
+        if customer_slot is not None:
+            await customer_slot.acquire()
+        try:
+            async with self._in_flight:
+                if _API_URL.match(url):
+                    await self._throttle()
+                response = await self._fetch(stream, prepared_request)
+        finally:
+            if customer_slot is not None:
+                customer_slot.release()
+
+        if self.rate_limiter is not None and _API_URL.match(url):
+            if response.status_code == 429:
+                self.rate_limiter.throttled(retry_delay(response))
+            else:
+                self.rate_limiter.succeeded()
+        stream._write_request_duration_log(
+            endpoint=stream.path,
+            response=response,
+            context=context,
+            extra_tags=(
+                {"url": prepared_request.path_url}
+                if stream._LOG_REQUEST_METRIC_URLS
+                else None
+            ),
+        )
+        stream.validate_response(response)
+        return response
+
+    async def _fetch(
+        self, stream: GoogleAdsStream, prepared_request: requests.PreparedRequest
+    ) -> requests.Response:
+        httpx = self._httpx
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+            )
+        started = time.perf_counter()
+        try:
+            http_response = await self._client.request(
+                prepared_request.method or "GET",
+                prepared_request.url or "",
+                headers=dict(prepared_request.headers),
+                content=prepared_request.body,
+                timeout=stream.timeout,
+            )
+        except httpx.TimeoutException as ex:
+            raise requests.exceptions.ReadTimeout(ex, request=prepared_request) from ex
+        except httpx.TransportError as ex:
+            raise requests.exceptions.ConnectionError(
+                ex, request=prepared_request
+            ) from ex
+
+        response = requests.Response()
+        response.status_code = http_response.status_code
+        response.reason = http_response.reason_phrase
+        # httpx has already decoded the body, so drop the content encoding
+        response.headers = CaseInsensitiveDict(http_response.headers)
+        response.headers.pop("Content-Encoding", None)
+        # The body is read whole before it is handed on, also from searchStream,
+        # and is then read back from memory like a body still downloading
+        body = http_response.content
+        response.headers["Content-Length"] = str(len(body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = prepared_request.url or ""
+        response.request = prepared_request
+        response.elapsed = timedelta(seconds=time.perf_counter() - started)
+        return response
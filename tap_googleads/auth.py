@@ -1,40 +1,97 @@
 """GoogleAds Authentication."""
 
+import hashlib
 import json
+import threading
+import time
+from datetime import datetime, timezone
 from typing import Optional
 
 import requests
 from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
 from singer_sdk.helpers._util import utc_now
-from singer_sdk.streams import Stream as RESTStreamBase
+from singer_sdk.streams import RESTStream
 
+from tap_googleads.cache import FileCache
+
+# Seconds before expiry at which an access token is refreshed
+REFRESH_MARGIN = 300
+
+
+def _no_auth(request: requests.PreparedRequest) -> requests.PreparedRequest:
+    """Leave a token request unauthenticated.
+
+    The stream sets its authenticator as the session's `auth`, which would otherwise
+    be applied to the token request itself.
+    """
+    return request
 
-class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
-    """API Authenticator for Proxy OAuth 2.0 flows."""
+
+class _SessionOAuthAuthenticator(OAuthAuthenticator):
+    """OAuth 2.0 authenticator requesting tokens over the stream's HTTP session.
+
+    The access token is refreshed `REFRESH_MARGIN` seconds before it expires, by
+    one thread at a time: the others keep using the current token meanwhile, and
+    only wait for the refresh once the token has actually expired. With
+    `persist_access_token`, the token is kept in `cache_dir` so short runs can
+    reuse it rather than request a new one.
+    """
 
     def __init__(
         self,
-        stream: RESTStreamBase,
+        stream: RESTStream,
         auth_endpoint: Optional[str] = None,
         oauth_scopes: Optional[str] = None,
-        auth_headers: Optional[dict] = None,
-        auth_body: Optional[dict] = None,
     ) -> None:
-        """Create a new authenticator.
-
-        Args:
-            stream: The stream instance to use with this authenticator.
-            auth_endpoint: API username.
-            oauth_scopes: API password.
-        """
         super().__init__(
             stream=stream,
             auth_endpoint=auth_endpoint,
             oauth_scopes=oauth_scopes,
         )
+        self._requests_session = stream.requests_session
+        self._sync_metrics = getattr(stream, "sync_metrics", None)
+        self._refresh_lock = threading.Lock()
+        self._token_cache: Optional[FileCache] = None
+        if stream.config.get("persist_access_token") and stream.config.get("cache_dir"):
+            # Tokens carry their own expiry, checked when they are loaded
+            self._token_cache = FileCache(stream.config["cache_dir"], ttl=0)
 
-        self._auth_headers = auth_headers
-        self._auth_body = auth_body
+    @property
+    def token_cache_key(self) -> str:
+        """Return a digest of the credentials a persisted token was issued for."""
+        return hashlib.sha256(str(self.auth_endpoint).encode()).hexdigest()
+
+    def _needs_refresh(self) -> bool:
+        if self.last_refreshed is None:
+            return True
+        if not self.expires_in:
+            return False
+        age = (utc_now() - self.last_refreshed).total_seconds()
+        return self.expires_in - age < min(REFRESH_MARGIN, self.expires_in / 2)
+
+    def authenticate_request(
+        self, request: requests.PreparedRequest
+    ) -> requests.PreparedRequest:
+        """Authenticate a request, refreshing the access token ahead of expiry."""
+        if self._needs_refresh() and self._refresh_lock.acquire(
+            blocking=not self.is_token_valid()
+        ):
+            try:
+                if self._needs_refresh():
+                    self.update_access_token()
+            finally:
+                self._refresh_lock.release()
+        return super().authenticate_request(request)
+
+    def request_token(self) -> requests.Response:
+        """Send the token request."""
+        return self._requests_session.post(
+            self.auth_endpoint,
+            headers=self._oauth_headers,
+            data=self.oauth_request_payload,
+            auth=_no_auth,
+            timeout=60,
+        )
 
     # Authentication and refresh
     def update_access_token(self) -> None:
@@ -43,13 +100,14 @@ class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
         Raises:
             RuntimeError: When OAuth login fails.
         """
+        if self._load_persisted_token():
+            return
         request_time = utc_now()
 
-        token_response = requests.post(
-            self.auth_endpoint,
-            headers=self._auth_headers,
-            data=json.dumps(self._auth_body),
-        )
+        started = time.perf_counter()
+        token_response = self.request_token()
+        if self._sync_metrics is not None:
+            self._sync_metrics.record_token_refresh(time.perf_counter() - started)
         try:
             token_response.raise_for_status()
             self.logger.info("OAuth authorization attempt was successful.")
@@ -59,18 +117,94 @@ class ProxyGoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
             )
         token_json = token_response.json()
         self.access_token = token_json["access_token"]
-        self.expires_in = token_json["expires_in"]
+        expiration = token_json.get("expires_in", self._default_expiration)
+        self.expires_in = int(expiration) if expiration else None
         self.last_refreshed = request_time
+        if self._token_cache is not None:
+            self._token_cache.save(
+                "oauth_access_token",
+                self.token_cache_key,
+                [
+                    {
+                        "access_token": self.access_token,
+                        "expires_in": self.expires_in,
+                        "refreshed_at": request_time.timestamp(),
+                    }
+                ],
+            )
+
+    def _load_persisted_token(self) -> bool:
+        """Use the persisted access token if it is not due for a refresh."""
+        if self._token_cache is None:
+            return False
+        entry = self._token_cache.load(
+            "oauth_access_token", self.token_cache_key, allow_stale=True
+        )
+        if entry is None or not entry.rows:
+            return False
+        token = entry.rows[0]
+        self.access_token = token["access_token"]
+        self.expires_in = token["expires_in"]
+        self.last_refreshed = datetime.fromtimestamp(
+            token["refreshed_at"], tz=timezone.utc
+        )
+        if self._needs_refresh():
+            return False
+        self.logger.info("Reusing the persisted OAuth access token.")
+        return True
+
+
+class ProxyGoogleAdsAuthenticator(_SessionOAuthAuthenticator, metaclass=SingletonMeta):
+    """API Authenticator for Proxy OAuth 2.0 flows."""
+
+    def __init__(
+        self,
+        stream: RESTStream,
+        auth_endpoint: Optional[str] = None,
+        oauth_scopes: Optional[str] = None,
+        auth_headers: Optional[dict] = None,
+        auth_body: Optional[dict] = None,
+    ) -> None:
+        """Create a new authenticator.
+
+        Args:
+            stream: The stream instance to use with this authenticator.
+            auth_endpoint: API username.
+            oauth_scopes: API password.
+        """
+        super().__init__(
+            stream=stream,
+            auth_endpoint=auth_endpoint,
+            oauth_scopes=oauth_scopes,
+        )
+
+        self._auth_headers = auth_headers
+        self._auth_body = auth_body
+
+    def request_token(self) -> requests.Response:
+        """Send the token request to the proxy refresh server."""
+        return self._requests_session.post(
+            self.auth_endpoint,
+            headers=self._auth_headers,
+            data=json.dumps(self._auth_body),
+            auth=_no_auth,
+        )
 
     @property
     def oauth_request_body(self) -> dict:
         """Define the OAuth request body for the GoogleAds API."""
         return {}
 
+    @property
+    def token_cache_key(self) -> str:
+        """Return a digest of the credentials a persisted token was issued for."""
+        credentials = json.dumps([self.auth_endpoint, self._auth_body], sort_keys=True)
+        return hashlib.sha256(credentials.encode()).hexdigest()
+
 
 # The SingletonMeta metaclass makes your streams reuse the same authenticator instance.
 # If this behaviour interferes with your use-case, you can remove the metaclass.
-class GoogleAdsAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
+class GoogleAdsAuthenticator(_SessionOAuthAuthenticator, metaclass=SingletonMeta):
     """Authenticator class for GoogleAds."""
 
     @property
@@ -0,0 +1,136 @@
+"""Parquet and JSON Lines BATCH files of stream records."""
+
+from __future__ import annotations
+
+import gzip
+import itertools
+from typing import Any, Iterable, Iterator, List
+from uuid import uuid4
+
+from singer_sdk._singerlib.json import serialize_json
+from singer_sdk.helpers._batch import BatchConfig, BatchFileFormat
+
+# Rows converted to Arrow at once while writing a Parquet file
+ROWS_PER_RECORD_BATCH = 10000
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as ex:
+        raise ImportError(
+            "Parquet batch files require pyarrow: pip install 'tap-googleads[parquet]'"
+        ) from ex
+    return pyarrow
+
+
+def _arrow_type(pa: Any, schema: dict) -> Any:
+    types = schema.get("type", [])
+    types = [types] if isinstance(types, str) else types
+    if "object" in types and "properties" in schema:
+        return pa.struct(
+            [
+                pa.field(key, _arrow_type(pa, prop))
+                for key, prop in schema["properties"].items()
+            ]
+        )
+    if "array" in types:
+        return pa.list_(_arrow_type(pa, schema.get("items", {})))
+    if "integer" in types:
+        return pa.int64()
+    if "number" in types:
+        return pa.float64()
+    if "boolean" in types:
+        return pa.bool_()
+    return pa.string()
+
+
+def arrow_schema(schema: dict) -> Any:
+    """Return the Arrow schema of records of a JSON `schema`.
+
+    Every file of a stream gets the same columns and types, however sparse the
+    rows it holds are.
+    """
+    pa = _import_pyarrow()
+    return pa.schema(
+        [
+            pa.field(key, _arrow_type(pa, prop))
+            for key, prop in schema.get("properties", {}).items()
+        ]
+    )
+
+
+class BatchFileWriter:
+    """Write the records of a stream to the files announced by BATCH messages.
+
+    Records are written to files of up to `batch_size` records, named after the
+    stream and the partition they belong to, e.g. a customer and date. Parquet
+    files are written one Arrow record batch at a time with the Arrow schema of the
+    stream, and JSON Lines files are gzipped when the encoding asks for it.
+    """
+
+    def __init__(
+        self, tap_name: str, stream_name: str, batch_config: BatchConfig, schema: dict
+    ) -> None:
+        """Create a writer of `batch_config` files of records of `schema`."""
+        self.batch_config = batch_config
+        self._sync_id = f"{tap_name}--{stream_name}-{uuid4()}"
+        self._file_index = itertools.count(1)
+        self._parquet = batch_config.encoding.format == BatchFileFormat.PARQUET
+        self._arrow_schema = arrow_schema(schema) if self._parquet else None
+
+    def write(
+        self, records: Iterable[dict], partition: str = ""
+    ) -> Iterator[List[str]]:
+        """Write `records`, yielding the manifest of each file once written."""
+        records = iter(records)
+        while True:
+            chunk = list(itertools.islice(records, self.batch_config.batch_size))
+            if not chunk:
+                return
+            yield [self._write_file(chunk, partition)]
+
+    def _filename(self, partition: str) -> str:
+        prefix = self.batch_config.storage.prefix or ""
+        name = f"{prefix}{self._sync_id}"
+        if partition:
+            name += f"-{partition}"
+        name += f"-{next(self._file_index)}"
+        gzipped = self.batch_config.encoding.compression == "gzip"
+        if self._parquet:
+            return name + (".parquet.gz" if gzipped else ".parquet")
+        return name + (".json.gz" if gzipped else ".jsonl")
+
+    def _write_file(self, records: List[dict], partition: str) -> str:
+        filename = self._filename(partition)
+        with self.batch_config.storage.fs(create=True) as fs:
+            with fs.open(filename, "wb") as file:
+                if self._parquet:
+                    self._write_parquet(records, file)
+                elif self.batch_config.encoding.compression == "gzip":
+                    with gzip.GzipFile(fileobj=file, mode="wb") as gz:
+                        self._write_json_lines(records, gz)
+                else:
+                    self._write_json_lines(records, file)
+            return fs.geturl(filename)
+
+    def _write_json_lines(self, records: List[dict], file: Any) -> None:
+        file.writelines((serialize_json(record) + "\n").encode() for record in records)
+
+    def _write_parquet(self, records: List[dict], file: Any) -> None:
+        pa = _import_pyarrow()
+        compression = (
+            "GZIP" if self.batch_config.encoding.compression == "gzip" else "snappy"
+        )
+        with pa.parquet.ParquetWriter(
+            file, self._arrow_schema, compression=compression
+        ) as writer:
+            rows = iter(records)
+            while True:
+                batch = list(itertools.islice(rows, ROWS_PER_RECORD_BATCH))
+                if not batch:
+                    return
+                writer.write_batch(
+                    pa.RecordBatch.from_pylist(batch, schema=self._arrow_schema)
+                )
@@ -0,0 +1,90 @@
+"""On-disk cache for API data that rarely changes between runs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional
+
+from tap_googleads.decoding import loads
+
+
+def content_hash(rows: List[dict]) -> str:
+    """Return a hash of `rows` that only changes when their content does."""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, sort_keys=True).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    """Rows read from the cache, with when they were fetched and their hash."""
+
+    rows: List[dict]
+    fetched_at: float
+    content_hash: str
+
+
+class FileCache:
+    """Cache lists of rows as JSON files in `directory`, one file per name.
+
+    Each file records the key the rows were fetched for, e.g. the query, so a
+    changed query is never answered from the cache, and the hash of the rows,
+    which is checked on every read so a truncated or edited file is discarded.
+    """
+
+    def __init__(self, directory: str | os.PathLike, ttl: float) -> None:
+        """Create a cache whose entries are fresh for `ttl` seconds."""
+        self.directory = Path(directory).expanduser()
+        self.ttl = ttl
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def load(
+        self, name: str, key: str, *, allow_stale: bool = False
+    ) -> Optional[CacheEntry]:
+        """Return the rows cached under `name` for `key`, if any are still valid.
+
+        Args:
+            name: Name of the cache file.
+            key: What the rows were fetched for.
+            allow_stale: Also return entries older than the TTL.
+
+        Returns:
+            The cache entry, or None if it is missing, stale, for another key or
+            does not match its hash.
+        """
+        try:
+            data: Any = loads(self._path(name).read_bytes())
+            entry = CacheEntry(data["rows"], data["fetched_at"], data["content_hash"])
+            valid = (
+                data["key"] == key and content_hash(entry.rows) == entry.content_hash
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not valid or not (allow_stale or time.time() - entry.fetched_at < self.ttl):
+            return None
+        return entry
+
+    def save(self, name: str, key: str, rows: List[dict]) -> CacheEntry:
+        """Cache `rows` under `name` for `key` and return the new entry.
+
+        The file is replaced atomically, so concurrent runs never read a partial one.
+        """
+        entry = CacheEntry(rows, time.time(), content_hash(rows))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as temp_file:
+                json.dump({"key": key, **entry._asdict()}, temp_file)
+            os.replace(temp_path, self._path(name))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return entry
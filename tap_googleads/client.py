@@ -2,18 +2,71 @@
 
 from __future__ import annotations
 
+import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
-import re
+from itertools import groupby
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import requests
 from dateutil import parser
 from memoization import cached
 from singer_sdk.authenticators import OAuthAuthenticator
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
+from singer_sdk.helpers._catalog import pop_deselected_record_properties
+from singer_sdk.helpers._typing import TypeConformanceLevel
+from singer_sdk.helpers.jsonpath import extract_jsonpath
 from singer_sdk.streams import RESTStream
 from singer_sdk.pagination import BaseAPIPaginator
 
+from tap_googleads.aio import AsyncRequestEngine
 from tap_googleads.auth import GoogleAdsAuthenticator, ProxyGoogleAdsAuthenticator
+from tap_googleads.batch import BatchFileWriter
+from tap_googleads.cache import FileCache
+from tap_googleads.decoding import decode_response
+from tap_googleads.instrumentation import SyncMetrics
+from tap_googleads.parallel import MemoryBudget
+from tap_googleads.throttle import retry_delay
+from tap_googleads.transform import (
+    RecordConformer,
+    RecordFlattener,
+    flat_key,
+    int64_as_integer,
+    snake_case,
+)
+
+# Response attribute holding the context of the request, see `_record_page`
+_PAGE_CONTEXT = "_tap_googleads_context"
+
+# Rough memory taken by a page while its rows are read, per byte of its body: the
+# body itself, and its decoded rows at two to seven times its size
+PAGE_MEMORY_FACTOR = 5
+
+
+class StateCheckpoint(NamedTuple):
+    """A state update yielded by `get_records` among the records of a partition.
+
+    The update is applied to the state of `context` only once every record yielded
+    before it has been written, so bookmarks stay correct even when the records
+    were fetched ahead of time on a worker thread.
+    """
+
+    context: Optional[dict]
+    update: Callable[[dict], None]
 
 
 class GoogleAdsStream(RESTStream):
@@ -21,6 +74,16 @@ class GoogleAdsStream(RESTStream):
 
     url_base = "https://googleads.googleapis.com/v18"
 
+    # Record property starting a new batch file whenever its value changes
+    batch_partition_key: Optional[str] = None
+
+    # Whether each record belongs to a customer, so that every shard of a sharded
+    # run syncs its own; other streams are only synced by the first shard
+    customer_partitioned = True
+
+    # Records are conformed by `record_conformer` instead of the SDK's generic walker
+    TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.NONE
+
     records_jsonpath = "$[*]"  # Or override `parse_response`.
     next_page_token_jsonpath = "$.nextPageToken"  # Or override `get_next_page_token`.
     _LOG_REQUEST_METRIC_URLS: bool = True
@@ -29,6 +92,23 @@ class GoogleAdsStream(RESTStream):
     _start_date = datetime.now() - timedelta(days=91)
     _start_date = "'" + _start_date.strftime("%Y-%m-%d") + "'"
 
+    # Records fetched ahead of time by a worker thread, see `CustomerHierarchyStream`
+    _prefetched_records: Optional[Iterator[dict]] = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream, retyping and flattening its schema as configured."""
+        super().__init__(*args, **kwargs)
+        # Schema of the rows as the API returns them, before any flattening
+        self.api_schema = self.schema
+        if self.config.get("coerce_int64_metrics"):
+            self._schema = int64_as_integer(self.schema)
+        self.record_flattener: Optional[RecordFlattener] = None
+        if self.config.get("flatten_records"):
+            self.record_flattener = RecordFlattener(self.schema)
+            self._schema = self.record_flattener.schema
+            self.primary_keys = [flat_key(key) for key in self.primary_keys or []]
+        self.record_conformer = RecordConformer(self.schema, self.name, self.logger)
+
     @property
     @cached
     def authenticator(self) -> OAuthAuthenticator:
@@ -71,6 +151,73 @@ class GoogleAdsStream(RESTStream):
             auth_headers=auth_headers,
         )
 
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by all streams of the tap."""
+        return self._tap.requests_session  # type: ignore[attr-defined]
+
+    @property
+    def sync_metrics(self) -> SyncMetrics:
+        """Return the performance metrics shared by all streams of the tap."""
+        return self._tap.sync_metrics  # type: ignore[attr-defined]
+
+    @property
+    def memory_budget(self) -> Optional[MemoryBudget]:
+        """Return the ceiling on memory shared by all streams of the tap, if any."""
+        return self._tap.memory_budget  # type: ignore[attr-defined]
+
+    def hold_memory(self, body_bytes: int) -> ContextManager[None]:
+        """Hold the memory of a page with a body of `body_bytes` while it is read."""
+        if self.memory_budget is None:
+            return nullcontext()
+        return self.memory_budget.hold(body_bytes * PAGE_MEMORY_FACTOR)
+
+    @property  # type: ignore[misc]
+    def selected(self) -> bool:
+        """Whether the stream is selected, and synced by this shard."""
+        return super().selected and (
+            self.customer_partitioned
+            or self._tap.shard.first  # type: ignore[attr-defined]
+        )
+
+    @property
+    def request_engine(self) -> Optional[AsyncRequestEngine]:
+        """Return the async engine sending report queries, if enabled."""
+        return self._tap.request_engine  # type: ignore[attr-defined]
+
+    def start_requests(self, context: Optional[dict]) -> None:
+        """Start fetching the partition ahead of its sync, where supported."""
+
+    def _write_request_duration_log(
+        self,
+        endpoint: str,
+        response: requests.Response,
+        context: Optional[dict],  # type: ignore[override]
+        extra_tags: Optional[dict],
+    ) -> None:
+        super()._write_request_duration_log(endpoint, response, context, extra_tags)
+        self.sync_metrics.record_request(
+            self.name, context, response.elapsed.total_seconds()
+        )
+        # `parse_response` is only given the response, so note whose page it is
+        setattr(response, _PAGE_CONTEXT, context)
+
+    def _record_page(
+        self, response: requests.Response, response_bytes: int, parse_seconds: float
+    ) -> None:
+        self.sync_metrics.record_page(
+            self.name,
+            getattr(response, _PAGE_CONTEXT, None),
+            response_bytes,
+            parse_seconds,
+        )
+
+    def backoff_handler(self, details: Any) -> None:
+        """Log and count a retry."""
+        super().backoff_handler(details)
+        args: Sequence[Any] = details.get("args") or ()
+        self.sync_metrics.record_retry(self.name, args[1] if len(args) > 1 else None)
+
     @property
     def http_headers(self) -> dict:
         """Return the http headers needed."""
@@ -81,9 +228,41 @@ class GoogleAdsStream(RESTStream):
         headers["login-customer-id"] = self.config.get("login_customer_id")
         return headers
 
+    def backoff_wait_generator(self) -> Generator[float, Any, None]:
+        """Wait as long as a quota error asks to, otherwise back off exponentially."""
+        exception = yield  # type: ignore[misc]
+        attempt = 0
+        while True:
+            response = getattr(exception, "response", None)
+            wait = retry_delay(response) if response is not None else None
+            if wait is None:
+                wait = 2.0 * 2**attempt
+            attempt += 1
+            exception = yield wait
+
     def get_new_paginator(self) -> BaseAPIPaginator:
         return GoogleAdsPaginator(None)
 
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result rows.
+
+        The body is decoded once and shared with `GoogleAdsPaginator`; the common
+        `$.results[*]` path is read directly rather than through JSONPath, and
+        taken out of the decoded body so the rows go once they are written. With
+        `max_buffered_memory_mb`, the page is only decoded once the memory it
+        takes is available.
+        """
+        with self.hold_memory(len(response.content)):
+            started = time.perf_counter()
+            data = decode_response(response)
+            self._record_page(
+                response, len(response.content), time.perf_counter() - started
+            )
+            if self.records_jsonpath == "$.results[*]":
+                yield from data.pop("results", [])
+            else:
+                yield from extract_jsonpath(self.records_jsonpath, input=data)
+
     def get_url_params(
         self, context: Optional[dict], next_page_token: Optional[Any]
     ) -> Dict[str, Any]:
@@ -110,8 +289,142 @@ class GoogleAdsStream(RESTStream):
             date = "'" + date.strftime("%Y-%m-%d") + "'"
         return date or self._end_date
 
+    def _sync_records(
+        self,
+        context: Optional[dict] = None,  # type: ignore[override]
+        *,
+        write_messages: bool = True,
+    ) -> Generator[dict, Any, Any]:
+        """Sync records, applying any `StateCheckpoint` yielded among them.
+
+        When a parent stream has already fetched this partition on a worker thread,
+        its prefetched records are drained in place of `get_records`. Either way the
+        SDK's record, state and child handling runs here on the calling thread, so
+        messages keep being written by a single writer.
+        """
+        prefetched, self._prefetched_records = self._prefetched_records, None
+        get_records = self.get_records
+
+        def get_records_without_checkpoints(
+            current_context: Optional[dict],
+        ) -> Iterator[dict]:
+            source = get_records(current_context) if prefetched is None else prefetched
+            for record in source:
+                if isinstance(record, StateCheckpoint):
+                    self._apply_checkpoint(record, write_messages=write_messages)
+                    continue
+                yield record
+
+        self.get_records = get_records_without_checkpoints  # type: ignore
+        records = 0
+        started = time.perf_counter()
+        try:
+            for record in super()._sync_records(context, write_messages=write_messages):
+                records += 1
+                yield record
+        finally:
+            self.__dict__.pop("get_records", None)
+            self.sync_metrics.record_partition(
+                self.name, context, records, time.perf_counter() - started
+            )
+
+    def _transform_record(self, record: dict) -> dict:
+        # Flatten last, once parent streams have read their child contexts and the
+        # replication key has been bookmarked from the nested record
+        if self.record_flattener is not None:
+            record = self.record_flattener(record)
+        return self.record_conformer(record)
+
+    def _generate_record_messages(self, record: dict) -> Generator[Any, None, None]:
+        yield from super()._generate_record_messages(self._transform_record(record))
+
+    def get_batches(  # type: ignore[override]
+        self, batch_config: BatchConfig, context: Optional[dict] = None
+    ) -> Iterable[Tuple[BaseBatchFileEncoding, List[str]]]:
+        """Write the records of `context` to batch files, yielding their manifests.
+
+        Records are transformed as they are for RECORD messages, and a new file is
+        started whenever their `batch_partition_key` property changes, so each file
+        holds the records of one customer and, e.g., one date.
+        """
+        writer = BatchFileWriter(self.tap_name, self.name, batch_config, self.schema)
+        prefix = "-".join(str(value) for value in (context or {}).values())
+
+        def transformed(records: Iterable[dict]) -> Iterator[dict]:
+            for record in records:
+                record = self._transform_record(record)
+                pop_deselected_record_properties(record, self.schema, self.mask)
+                yield record
+
+        records = transformed(self._sync_records(context, write_messages=False))
+        key = self.batch_partition_key
+        for value, partition in groupby(
+            records, key=lambda r: r.get(key) if key else None
+        ):
+            label = "-".join(str(part) for part in (prefix, value) if part)
+            for manifest in writer.write(partition, label):
+                yield batch_config.encoding, manifest
+
+    def _apply_checkpoint(
+        self, checkpoint: StateCheckpoint, *, write_messages: bool = True
+    ) -> None:
+        checkpoint.update(self.get_context_state(checkpoint.context))
+        self._is_state_flushed = False
+        if write_messages:
+            self._write_state_message()
+
+    def request_cached_records(
+        self,
+        context: Optional[dict],
+        cache: Optional[FileCache],
+        *,
+        refresh: bool = False,
+    ) -> List[dict]:
+        """Return the rows of `context`, from `cache` while they are fresh.
+
+        Rows are cached per stream and partition, together with the url and query
+        they were requested with. If the request fails, rows cached by an earlier
+        run are returned however old they are, and the error is only raised when
+        there are none.
+
+        Args:
+            context: Stream partition or context dictionary.
+            cache: The cache to use, or None to always request the rows.
+            refresh: Request the rows even when the cache is fresh.
+
+        Returns:
+            The rows of the partition.
+        """
+        if cache is None:
+            return list(self.request_records(context))
+
+        name = "-".join([self.name, *map(str, (context or {}).values())])
+        key = f"{self.get_url(context)} {getattr(self, 'gaql', '')}"
+        entry = None if refresh else cache.load(name, key)
+        if entry is not None:
+            self.logger.info("Using cached %s for %s", self.name, context)
+            return entry.rows
+        try:
+            rows = list(self.request_records(context))
+        except (FatalAPIError, RetriableAPIError, requests.RequestException):
+            entry = cache.load(name, key, allow_stale=True)
+            if entry is None:
+                raise
+            self.logger.warning(
+                "Request for %s failed, using rows cached at %s",
+                self.name,
+                datetime.fromtimestamp(entry.fetched_at).isoformat(),
+                exc_info=True,
+            )
+            return entry.rows
+        return cache.save(name, key, rows).rows
+
     def _camel_case_to_snake_case(self, camel_case_word: str) -> str:
-        return re.sub(r"(?<!^)(?=[A-Z])", "_", camel_case_word).lower()
+        return snake_case(camel_case_word)
+
+    def _snake_case_to_camel_case(self, snake_case_word: str) -> str:
+        first, *rest = snake_case_word.split("_")
+        return first + "".join(word.capitalize() for word in rest)
 
 
 class GoogleAdsPaginator(BaseAPIPaginator):
@@ -125,5 +438,5 @@ class GoogleAdsPaginator(BaseAPIPaginator):
             The next page token or index. Return `None` from this method to indicate
                 the end of pagination.
         """
-        data = response.json()
+        data = decode_response(response)
         return data.get("nextPageToken")
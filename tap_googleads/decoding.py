@@ -0,0 +1,149 @@
+"""JSON decoding helpers for Google Ads API responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Use the fastest JSON decoder available; all of them accept bytes
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json  # type: ignore[no-redef]
+    except ImportError:
+        import json as _json  # type: ignore[no-redef]
+
+loads: Callable[[Union[bytes, str]], Any] = _json.loads
+
+_DECODED_BODY = "_tap_googleads_decoded_body"
+
+# Separators skipped between the elements of a streamed array
+_SEPARATORS = re.compile(r"[\s,]*")
+
+# Element bytes are decoded by the C scanner of the standard decoder, the only one
+# that reports where a value ends
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+class _ArrayReader:
+    """Decode complete top-level elements of a JSON array from a growing buffer."""
+
+    def __init__(self) -> None:
+        self.pieces: List[str] = []  # buffered text, only joined to be decoded
+        self.size = 0
+        self.opened = False
+        self.closed = False
+        self.attempted = 0  # buffer length at the last incomplete attempt
+        self.largest = 0  # length of the largest element decoded so far
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        """Append `text` and return every element now complete."""
+        self.pieces.append(text)
+        self.size += len(text)
+        if not (final or not self.opened or self._may_be_complete()):
+            return []
+        buffer = "".join(self.pieces)
+        elements = []
+        while not self.closed:
+            separators = _SEPARATORS.match(buffer)
+            position = separators.end() if separators else 0
+            if position == len(buffer):
+                break
+            if not self.opened:
+                if buffer[position] != "[":
+                    raise ValueError("Response body is not a JSON array")
+                self.opened = True
+                start = position + 1
+                buffer = buffer[start:]
+            elif buffer[position] == "]":
+                self.closed = True
+            elif not (final or self._may_be_complete(len(buffer))):
+                break
+            else:
+                try:
+                    element, end = _raw_decode(buffer, position)
+                except ValueError:
+                    self.attempted = len(buffer)
+                    break
+                self.attempted = 0
+                self.largest = max(self.largest, end - position)
+                buffer = buffer[end:]
+                elements.append(element)
+        self.pieces = [buffer]
+        self.size = len(buffer)
+        return elements
+
+    def _may_be_complete(self, size: Optional[int] = None) -> bool:
+        """Return whether decoding the buffered element is worth attempting.
+
+        An element is not attempted before the buffer is as long as the largest
+        one so far, as searchStream batches mostly are, nor before the buffer has
+        doubled since the last attempt, so each element is decoded a bounded
+        number of times.
+        """
+        size = self.size if size is None else size
+        return size >= max(2 * self.attempted, self.largest)
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a JSON array as its bytes arrive.
+
+    `googleAds:searchStream` answers with one JSON array of result batches. Rather
+    than buffering the whole body, only the elements not yet decoded are held, so
+    memory is bounded by about twice the size of the largest element. The body is
+    never scanned byte by byte in Python: decoding is attempted on the buffered
+    bytes, and the decoder itself finds where a complete element ends.
+
+    Args:
+        chunks: Raw body chunks, e.g. from `requests.Response.iter_content`.
+
+    Yields:
+        Each decoded element of the top-level array, in order.
+
+    Raises:
+        ValueError: If the body is not a JSON array or ends before it is closed.
+    """
+    text = codecs.getincrementaldecoder("utf-8")()
+    reader = _ArrayReader()
+    for chunk in chunks:
+        yield from reader.feed(text.decode(chunk))
+        if reader.closed:
+            return
+    yield from reader.feed(text.decode(b"", True), final=True)
+    if not reader.closed:
+        raise ValueError("Incomplete JSON array in response body")
+
+
+def decode_response(response: requests.Response) -> Any:
+    """Return the decoded JSON body of `response`, decoding it at most once.
+
+    The decoded body is kept on the response object itself, so the paginator and
+    `parse_response` share a single decode of each page and the cache goes away
+    with the response.
+
+    Args:
+        response: A response with a JSON body.
+
+    Returns:
+        The decoded body.
+    """
+    decoded = response.__dict__.get(_DECODED_BODY, response)
+    if decoded is response:
+        decoded = loads(response.content)
+        response.__dict__[_DECODED_BODY] = decoded
+    return decoded
@@ -0,0 +1,251 @@
+"""Performance metrics of a sync, per stream and customer."""
+
+from __future__ import annotations
+
+import bisect
+import enum
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from singer_sdk import metrics
+
+# Upper bounds, in seconds, of the request duration histogram buckets
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metric(str, enum.Enum):
+    """Metrics reported in METRIC messages besides those of the SDK."""
+
+    PAGE_COUNT = "page_count"
+    RETRY_COUNT = "retry_count"
+    RESPONSE_BYTES = "response_bytes"
+    HTTP_REQUEST_DURATION_HISTOGRAM = "http_request_duration_histogram"
+    PARSE_DURATION = "parse_duration"
+    RECORDS_PER_SECOND = "records_per_second"
+    TOKEN_REFRESH_DURATION = "token_refresh_duration"
+
+
+def _log_point(
+    metric_type: str, metric: Metric, value: Any, tags: Optional[dict] = None
+) -> None:
+    # Points are typed for the SDK's own metrics but only use the name's value
+    point = metrics.Point(metric_type, cast(metrics.Metric, metric), value, tags or {})
+    metrics.log(metrics.get_metrics_logger(), point)
+
+
+class Histogram:
+    """Count of observations per bucket, with their count and sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return `(upper bound, observations at or below it)` pairs, ending at +Inf."""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        totals, total = [], 0
+        for count in self.counts:
+            total += count
+            totals.append(total)
+        return list(zip(bounds, totals))
+
+
+class PartitionMetrics:
+    """Measurements of the requests and records of one stream partition."""
+
+    def __init__(self) -> None:
+        self.pages = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.request_duration = Histogram()
+        self.parse_seconds = 0.0
+        self.records = 0
+        self.sync_seconds = 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.sync_seconds if self.sync_seconds else 0.0
+
+
+class SyncMetrics:
+    """Performance metrics of a whole run, shared by the streams of a tap.
+
+    Measurements are recorded per stream and customer from any thread. Each
+    partition's totals are reported in METRIC messages once it is synced, and
+    with `prometheus_textfile` everything is written at the end of the run in
+    the Prometheus text format, e.g. for the node exporter's textfile collector.
+    """
+
+    def __init__(self, prometheus_textfile: Optional[str] = None) -> None:
+        self.prometheus_textfile = prometheus_textfile
+        self.token_refresh = Histogram()
+        self._partitions: Dict[Tuple[str, str], PartitionMetrics] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _customer_id(context: Optional[dict]) -> str:
+        return str((context or {}).get("customer_id", ""))
+
+    def _partition(self, stream: str, context: Optional[dict]) -> PartitionMetrics:
+        key = (stream, self._customer_id(context))
+        if key not in self._partitions:
+            self._partitions[key] = PartitionMetrics()
+        return self._partitions[key]
+
+    def record_request(
+        self, stream: str, context: Optional[dict], seconds: float
+    ) -> None:
+        with self._lock:
+            self._partition(stream, context).request_duration.observe(seconds)
+
+    def record_page(
+        self,
+        stream: str,
+        context: Optional[dict],
+        response_bytes: int,
+        parse_seconds: float,
+    ) -> None:
+        with self._lock:
+            partition = self._partition(stream, context)
+            partition.pages += 1
+            partition.response_bytes += response_bytes
+            partition.parse_seconds += parse_seconds
+
+    def record_retry(self, stream: str, context: Optional[dict]) -> None:
+        with self._lock:
+            self._partition(stream, context).retries += 1
+
+    def record_token_refresh(self, seconds: float) -> None:
+        with self._lock:
+            self.token_refresh.observe(seconds)
+        _log_point("timer", Metric.TOKEN_REFRESH_DURATION, seconds)
+
+    def record_partition(
+        self, stream: str, context: Optional[dict], records: int, seconds: float
+    ) -> None:
+        """Record a synced partition and report its totals in METRIC messages."""
+        with self._lock:
+            partition = self._partition(stream, context)
+            partition.records += records
+            partition.sync_seconds += seconds
+            histogram = partition.request_duration
+            points = [
+                ("counter", Metric.PAGE_COUNT, partition.pages),
+                ("counter", Metric.RETRY_COUNT, partition.retries),
+                ("counter", Metric.RESPONSE_BYTES, partition.response_bytes),
+                ("timer", Metric.PARSE_DURATION, round(partition.parse_seconds, 6)),
+                (
+                    "histogram",
+                    Metric.HTTP_REQUEST_DURATION_HISTOGRAM,
+                    {
+                        "buckets": dict(histogram.cumulative()),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                    },
+                ),
+                (
+                    "gauge",
+                    Metric.RECORDS_PER_SECOND,
+                    round(partition.records_per_second, 1),
+                ),
+            ]
+        tags = {metrics.Tag.STREAM: stream, metrics.Tag.CONTEXT: context or {}}
+        for metric_type, metric, value in points:
+            _log_point(metric_type, metric, value, tags)
+
+    def prometheus_text(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP tap_googleads_{name} {help_text}")
+            lines.append(f"# TYPE tap_googleads_{name} {kind}")
+
+        def histogram_lines(name: str, labels: str, histogram: Histogram) -> None:
+            separator = "," if labels else ""
+            for bound, total in histogram.cumulative():
+                lines.append(
+                    f'tap_googleads_{name}_bucket{{{labels}{separator}le="{bound}"}}'
+                    f" {total}"
+                )
+            lines.append(f"tap_googleads_{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"tap_googleads_{name}_count{{{labels}}} {histogram.count}")
+
+        with self._lock:
+            partitions = sorted(self._partitions.items())
+            labelled = [
+                (f'stream="{stream}",customer_id="{customer_id}"', partition)
+                for (stream, customer_id), partition in partitions
+            ]
+            for name, kind, help_text, value in (
+                ("pages_total", "counter", "Pages of results fetched.", "pages"),
+                ("retries_total", "counter", "Requests retried.", "retries"),
+                (
+                    "response_bytes_total",
+                    "counter",
+                    "Bytes of response bodies read.",
+                    "response_bytes",
+                ),
+                (
+                    "parse_seconds_total",
+                    "counter",
+                    "Seconds spent reading and decoding responses.",
+                    "parse_seconds",
+                ),
+                ("records_total", "counter", "Records synced.", "records"),
+                (
+                    "sync_seconds_total",
+                    "counter",
+                    "Seconds spent syncing partitions.",
+                    "sync_seconds",
+                ),
+            ):
+                family(name, kind, help_text)
+                for labels, partition in labelled:
+                    lines.append(
+                        f"tap_googleads_{name}{{{labels}}} {getattr(partition, value)}"
+                    )
+            family(
+                "request_duration_seconds",
+                "histogram",
+                "Durations of API requests.",
+            )
+            for labels, partition in labelled:
+                histogram_lines(
+                    "request_duration_seconds", labels, partition.request_duration
+                )
+            family(
+                "token_refresh_seconds",
+                "histogram",
+                "Durations of OAuth token refreshes.",
+            )
+            histogram_lines("token_refresh_seconds", "", self.token_refresh)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_textfile(self) -> None:
+        """Write `prometheus_textfile`, if set, replacing it atomically."""
+        if not self.prometheus_textfile:
+            return
+        path = Path(self.prometheus_textfile).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as temp_file:
+                temp_file.write(self.prometheus_text())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,222 @@
+"""Concurrency helpers for tap-googleads."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+_DONE = object()
+
+# The task run by the current worker thread, unset on the thread writing records
+_worker = threading.local()
+
+
+class _Failure:
+    """Wrap an exception raised in a worker so it can be re-raised by the reader."""
+
+    def __init__(self, exception: BaseException) -> None:
+        self.exception = exception
+
+
+class Task:
+    """A submitted task, linked to the task of the thread draining its items.
+
+    `draining` is set once the task's items are the next its reader writes.
+    """
+
+    def __init__(self, reader: Optional["Task"]) -> None:
+        self.reader = reader
+        self.draining = False
+
+    @property
+    def next_to_write(self) -> bool:
+        """Whether the items of this task are the next to be written."""
+        task: Optional[Task] = self
+        while task is not None:
+            if not task.draining:
+                return False
+            task = task.reader
+        return True
+
+
+def _next_to_write() -> bool:
+    task: Optional[Task] = getattr(_worker, "task", None)
+    return task is None or task.next_to_write
+
+
+def _run(task: Task, func: Callable[..., Any], *args: Any) -> Any:
+    _worker.task = task
+    try:
+        return func(*args)
+    finally:
+        _worker.task = None
+
+
+def submit_task(
+    executor: Executor, func: Callable[..., Any], *args: Any
+) -> Tuple[Future, Task]:
+    """Run `func(*args)` in `executor` as a task read by the current thread.
+
+    Like the tasks of `OrderedPrefetcher`, it may wait for a `MemoryBudget` until
+    the caller marks it `draining`.
+    """
+    task = Task(getattr(_worker, "task", None))
+    return executor.submit(_run, task, func, *args), task
+
+
+class Reservation:
+    """Memory of a `MemoryBudget` kept held after the pages holding it were read."""
+
+    def __init__(self, budget: "MemoryBudget") -> None:
+        self.budget = budget
+        self.size = 0
+
+    def release(self) -> None:
+        """Give the memory back, e.g. once the rows it was kept for are written."""
+        size, self.size = self.size, 0
+        self.budget._release(size)
+
+
+class MemoryBudget:
+    """Ceiling on the memory held by data fetched ahead of being written.
+
+    Fetching threads `hold` the estimated size of each page while its rows are
+    read, and wait while the ceiling is reached, so workers stop requesting pages
+    until the records already fetched have been written. The thread writing
+    records, and the worker fetching the records it writes next, are never made
+    to wait, so the budget cannot stall the sync; the ceiling may be exceeded by
+    what they hold. Rows collected beyond their pages keep their memory held with
+    `retain`.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def hold(self, size: int) -> Iterator[None]:
+        """Hold `size` bytes of the budget, waiting for them if need be."""
+        with self._condition:
+            # Poll, as the waiting worker may become next to write at any time
+            while self.used and self.used + size > self.limit and not _next_to_write():
+                self._condition.wait(0.1)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+        try:
+            yield
+        finally:
+            reservation = getattr(_worker, "reservation", None)
+            if reservation is not None and reservation.budget is self:
+                reservation.size += size
+            else:
+                self._release(size)
+
+    def _release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+    @contextmanager
+    def retain(self) -> Iterator[Reservation]:
+        """Keep what this thread holds until the yielded reservation is released.
+
+        Rows collected from several pages, e.g. a whole day's, still take memory
+        once their pages are read, so the holds of the pages are moved to the
+        reservation, to be released once the rows are written.
+        """
+        reservation = Reservation(self)
+        _worker.reservation = reservation
+        try:
+            yield reservation
+        except BaseException:
+            reservation.release()
+            raise
+        finally:
+            _worker.reservation = None
+
+
+class OrderedPrefetcher:
+    """Run iterables on a thread pool and hand them back in submission order.
+
+    Every submitted task runs in a worker thread and pushes its items into its
+    own bounded queue, so at most `buffer_size` items per task are held while the
+    caller is still draining an earlier task. Items are only ever consumed by
+    the calling thread, which keeps Singer message emission single-writer.
+    Workers know whether their items are read next, see `MemoryBudget`.
+
+    Iterators returned by `submit` must be drained in the order they were
+    submitted; the pool runs tasks first-in first-out, so the oldest undrained
+    task always has a worker.
+    """
+
+    def __init__(self, max_workers: int, buffer_size: int = 1000) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tap-googleads"
+        )
+        self._buffer_size = buffer_size
+        self._cancelled = threading.Event()
+
+    def __enter__(self) -> "OrderedPrefetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def submit(self, func: Callable[..., Iterable[Any]], *args: Any) -> Iterator[Any]:
+        """Start `func(*args)` in the pool and return an iterator over its items."""
+        buffer: queue.Queue = queue.Queue(maxsize=self._buffer_size)
+        task = Task(getattr(_worker, "task", None))
+        self._executor.submit(self._fill, task, buffer, func, *args)
+        return self._drain(task, buffer)
+
+    def close(self) -> None:
+        """Stop all workers, discarding anything that has not been drained."""
+        self._cancelled.set()
+        self._executor.shutdown(wait=True)
+
+    def _put(self, buffer: queue.Queue, item: Any) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(
+        self,
+        task: Task,
+        buffer: queue.Queue,
+        func: Callable[..., Iterable[Any]],
+        *args: Any,
+    ) -> None:
+        if self._cancelled.is_set():
+            return
+        _worker.task = task
+        try:
+            for item in func(*args):
+                if not self._put(buffer, item):
+                    return
+        except BaseException as ex:  # noqa: BLE001 - re-raised by the reader
+            self._put(buffer, _Failure(ex))
+            return
+        finally:
+            _worker.task = None
+        self._put(buffer, _DONE)
+
+    @staticmethod
+    def _drain(task: Task, buffer: queue.Queue) -> Iterator[Any]:
+        # Tasks are drained in submission order, so this one is read next
+        task.draining = True
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
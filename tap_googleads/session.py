@@ -0,0 +1,180 @@
+"""HTTP session shared by every stream of a tap-googleads run."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterator, Mapping, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from tap_googleads.throttle import RateLimiter, retry_delay
+
+# Connections kept open per host when no concurrency is configured
+DEFAULT_POOL_SIZE = 10
+
+_API_URL = re.compile(
+    r"https://googleads\.googleapis\.com/[^/]+/(?:customers/(?P<customer_id>\d+))?"
+)
+
+
+def get_pool_size(config: Mapping[str, Any]) -> int:
+    """Return how many connections per host the configured concurrency can use."""
+    max_parallel_customers = config.get("max_parallel_customers", 1)
+    max_parallel_windows = config.get("max_parallel_windows", 1)
+    return max(DEFAULT_POOL_SIZE, max_parallel_customers * max_parallel_windows)
+
+
+def build_requests_session(config: Mapping[str, Any]) -> requests.Session:
+    """Create a keep-alive session with a connection pool sized for `config`.
+
+    API requests are throttled according to `max_requests_per_second` and
+    `max_concurrent_requests_per_customer`, and paused when quota runs out.
+
+    HTTPS requests go over HTTP/2 when `http2` is enabled, which requires
+    `httpx[http2]` to be installed.
+    """
+    pool_size = get_pool_size(config)
+    adapter: BaseAdapter
+    if config.get("http2"):
+        adapter = HTTP2Adapter(pool_size)
+    else:
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+
+    session = ThrottledSession(
+        RateLimiter(
+            config.get("max_requests_per_second"),
+            config.get("max_concurrent_requests_per_customer"),
+        )
+    )
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip"
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+class ThrottledSession(requests.Session):
+    """Session passing Google Ads API requests through a shared `RateLimiter`.
+
+    Other requests, such as OAuth token refreshes, are sent straight away.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter) -> None:
+        super().__init__()
+        self.rate_limiter = rate_limiter
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """Send `request` once the rate limiter allows it."""
+        match = _API_URL.match(request.url or "")
+        if match is None:
+            return super().send(request, **kwargs)
+
+        # Streamed bodies are still being read after the customer's slot is freed
+        with self.rate_limiter.request(match.group("customer_id")):
+            response = super().send(request, **kwargs)
+        if response.status_code == 429:
+            self.rate_limiter.throttled(retry_delay(response))
+        else:
+            self.rate_limiter.succeeded()
+        return response
+
+
+class _HTTPXBody:
+    """File-like access to a streamed httpx response body, for `requests`."""
+
+    def __init__(self, response: Any) -> None:
+        self._response = response
+        self._chunks: Iterator[bytes] = response.iter_bytes()
+        self._buffer = b""
+
+    def read(self, amt: Optional[int] = None, **kwargs: Any) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        amt = len(self._buffer) if amt is None else amt
+        data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        if not data:
+            self.close()
+        return data
+
+    def close(self) -> None:
+        self._response.close()
+
+    release_conn = close
+
+
+class HTTP2Adapter(BaseAdapter):
+    """Transport adapter sending `requests` traffic through an HTTP/2 httpx client.
+
+    Proxies and client certificates configured on the session are not supported.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        super().__init__()
+        try:
+            import httpx
+        except ImportError as ex:
+            raise ImportError(
+                "The http2 setting requires httpx: pip install 'tap-googleads[http2]'"
+            ) from ex
+
+        self._httpx = httpx
+        self._client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Any = None,
+    ) -> requests.Response:
+        """Send `request` and return it as a `requests.Response`."""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = self._httpx.Timeout(read, connect=connect)
+
+        http_request = self._client.build_request(
+            request.method or "GET",
+            request.url or "",
+            headers=dict(request.headers),
+            content=request.body,
+            timeout=timeout,
+        )
+        try:
+            http_response = self._client.send(http_request, stream=True)
+        except self._httpx.TimeoutException as ex:
+            raise requests.exceptions.Timeout(ex, request=request) from ex
+        except self._httpx.TransportError as ex:
+            raise requests.exceptions.ConnectionError(ex, request=request) from ex
+
+        response = requests.Response()
+        response.status_code = http_response.status_code
+        response.reason = http_response.reason_phrase
+        # httpx has already decoded the body, so drop the content encoding
+        response.headers = CaseInsensitiveDict(http_response.headers)
+        response.headers.pop("Content-Encoding", None)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _HTTPXBody(http_response)
+        response.url = request.url or ""
+        response.request = request
+        response.connection = self  # type: ignore[assignment]
+        if not stream:
+            response.content  # noqa: B018 - read the body now, as requests does
+        return response
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._client.close()
@@ -0,0 +1,101 @@
+"""Sharding of customers across tap processes, and merging of their states.
+
+Usage:
+    python -m tap_googleads.sharding state-1.json ... state-M.json > state.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+
+class Shard(NamedTuple):
+    """The `number`th of `total` shards, counting from 1, e.g. `Shard(2, 4)`."""
+
+    number: int = 1
+    total: int = 1
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Shard":
+        """Parse an `N/M` shard, or return the single shard if `value` is empty."""
+        if not value:
+            return cls()
+        try:
+            number, total = (int(part) for part in value.split("/"))
+        except ValueError as ex:
+            raise ValueError(f"Shard must be given as N/M, not {value!r}") from ex
+        if not 1 <= number <= total:
+            raise ValueError(
+                f"Shard {value!r} is not between 1/{total} and {total}/{total}"
+            )
+        return cls(number, total)
+
+    @property
+    def first(self) -> bool:
+        return self.number == 1
+
+    def includes(self, customer_id: str) -> bool:
+        """Return whether the customer belongs to this shard.
+
+        Customers are assigned by a hash of their id, so every process of a run
+        agrees on the assignment whatever order it discovers customers in.
+        """
+        return zlib.crc32(str(customer_id).encode()) % self.total == self.number - 1
+
+
+def _partition_key(partition: dict) -> str:
+    return json.dumps(partition.get("context", {}), sort_keys=True)
+
+
+def _owned_by(shard: Shard, partition: dict) -> bool:
+    customer_id = partition.get("context", {}).get("customer_id")
+    return shard.first if customer_id is None else shard.includes(customer_id)
+
+
+def merge_states(states: Sequence[dict]) -> dict:
+    """Merge the final states of shards 1 to M of a run, given in shard order.
+
+    Each partition is taken from the state of the shard that synced its customer,
+    and partitions of no customer, like everything else, from the first shard.
+    Partitions missing from their shard's state are kept from any other.
+    """
+    merged = copy.deepcopy(dict(states[0])) if states else {}
+    bookmarks: Dict[str, Any] = merged.setdefault("bookmarks", {})
+    for number, state in enumerate(states, start=1):
+        shard = Shard(number, len(states))
+        for stream_name, stream_state in state.get("bookmarks", {}).items():
+            target = bookmarks.setdefault(stream_name, copy.deepcopy(stream_state))
+            partitions = {
+                _partition_key(partition): partition
+                for partition in target.get("partitions", [])
+            }
+            for partition in stream_state.get("partitions", []):
+                key = _partition_key(partition)
+                if _owned_by(shard, partition) or key not in partitions:
+                    partitions[key] = copy.deepcopy(partition)
+            if partitions:
+                target["partitions"] = list(partitions.values())
+    return merged
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Merge the state files written by the shards of a sharded run."
+    )
+    parser.add_argument(
+        "states", nargs="+", help="state file of each shard, from 1/M to M/M"
+    )
+    args = parser.parse_args(argv)
+    states = []
+    for path in args.states:
+        with open(path) as file:
+            states.append(json.load(file))
+    print(json.dumps(merge_states(states), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,49 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import date, timedelta
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, TypeVar
-
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import requests
+from singer_sdk import metrics
 from singer_sdk import typing as th  # JSON Schema typing helpers
-
-from tap_googleads.client import GoogleAdsStream
+from singer_sdk.exceptions import FatalAPIError
+from singer_sdk.streams.core import REPLICATION_INCREMENTAL
+from singer_sdk.pagination import BaseAPIPaginator, SinglePagePaginator
+
+from tap_googleads.aio import PageIterator
+from tap_googleads.cache import FileCache, content_hash
+from tap_googleads.client import GoogleAdsStream, StateCheckpoint
+from tap_googleads.decoding import decode_response, iter_json_array
+from tap_googleads.parallel import (
+    OrderedPrefetcher,
+    Reservation,
+    Task,
+    submit_task,
+)
+from tap_googleads.transform import RowPacker
 
 if TYPE_CHECKING:
     from singer_sdk.helpers.types import Context, Record
@@ -17,17 +53,72 @@ SCHEMAS_DIR = Path(__file__).parent / Path("./schemas")
 _TToken = TypeVar("_TToken")
 
 
+def _parse_date(value: str) -> date:
+    """Parse a quoted gaql date or an ISO date/timestamp."""
+    return date.fromisoformat(value.strip("'")[:10])
+
+
+def _format_date(value: date) -> str:
+    """Format a date as a quoted gaql date literal."""
+    return "'" + value.strftime("%Y-%m-%d") + "'"
+
+
+_SELECT_FIELDS = re.compile(r"\bSELECT\s+(?P<fields>.+?)\s+FROM\b", re.DOTALL)
+
+
+def _error_status(response: requests.Response) -> Optional[str]:
+    """Return the status of an API error response, e.g. `INVALID_ARGUMENT`.
+
+    searchStream errors come as an element of the streamed array instead.
+    """
+    try:
+        body = decode_response(response)
+    except ValueError:
+        return None
+    if isinstance(body, list) and body:
+        body = body[0]
+    error = body.get("error") if isinstance(body, dict) else None
+    return error.get("status") if isinstance(error, dict) else None
+
+
+def _customer_hierarchy_cache(config: Mapping[str, Any]) -> Optional[FileCache]:
+    """Return the cache of the customer hierarchy, if it is enabled.
+
+    Unlike geo target constants, the hierarchy is only cached when
+    `customer_hierarchy_cache_ttl_hours` is set, as newly linked customers are not
+    synced until the cache expires.
+    """
+    ttl_hours = config.get("customer_hierarchy_cache_ttl_hours")
+    if not config.get("cache_dir") or not ttl_hours:
+        return None
+    return FileCache(config["cache_dir"], ttl=ttl_hours * 3600)
+
+
 class AccessibleCustomers(GoogleAdsStream):
     """Accessible Customers"""
 
     path = "/customers:listAccessibleCustomers"
     name = "stream_accessible_customers"
+    customer_partitioned = False
     primary_keys = ["resource_names"]
     replication_key = None
     schema = th.PropertiesList(
         th.Property("resourceNames", th.ArrayType(th.StringType))
     ).to_dict()
 
+    def get_records(  # type: ignore[override]
+        self, context: Optional[dict]
+    ) -> Iterable[Dict[str, Any]]:
+        """Return the accessible customers, cached with the customer hierarchy."""
+        for row in self.request_cached_records(
+            context,
+            _customer_hierarchy_cache(self.config),
+            refresh=self.config.get("refresh_customer_hierarchy_cache", False),
+        ):
+            record = self.post_process(row, context)
+            if record is not None:
+                yield record
+
     def generate_child_contexts(
         self,
         record: Record,
@@ -50,6 +141,19 @@ class AccessibleCustomers(GoogleAdsStream):
         customer_id = record.split("/")[1]
         return {"customer_id": customer_id}
 
+    def _sync_records(
+        self,
+        context: Optional[dict] = None,  # type: ignore[override]
+        *,
+        write_messages: bool = True,
+    ) -> Generator[dict, Any, Any]:
+        yield from super()._sync_records(context, write_messages=write_messages)
+        # Customers below every accessible customer are synced together, so that
+        # those of different hierarchies are fetched concurrently too
+        for child_stream in self.child_streams:
+            if isinstance(child_stream, CustomerHierarchyStream):
+                child_stream._sync_pending_children()
+
 
 class CustomerHierarchyStream(GoogleAdsStream):
     """
@@ -109,12 +213,21 @@ class CustomerHierarchyStream(GoogleAdsStream):
         )
     ).to_dict()
 
+    # Customers already reached during this run, from any accessible customer
+    _visited_customer_ids: Optional[Set[str]] = None
+    # Child partitions deferred until every accessible customer's hierarchy is walked
+    _pending_child_contexts: Optional[List[dict]] = None
+
     # Goal of this stream is to send to children stream a dict of
     # login-customer-id:customer-id to query for all queries downstream
     def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
         """Return a generator of row-type dictionary objects.
 
-        Each row emitted should be a dictionary of property names to their values.
+        The hierarchy below the accessible customer is walked breadth first. Each
+        manager is queried for its direct clients, one level of the tree at a time
+        with up to `max_parallel_hierarchy_queries` queries in flight, and every
+        customer is visited once even when several managers lead to it. With
+        `shard`, only the customers of this process's shard are yielded.
 
         Args:
             context: Stream partition or context dictionary.
@@ -122,27 +235,135 @@ class CustomerHierarchyStream(GoogleAdsStream):
         Yields:
             One item per (possibly processed) record in the API.
         """
-        for row in self.request_records(context):
-            row = self.post_process(row, context)
-            # Don't search Manager accounts as we can't query them for everything
-            if (
-                row["customerClient"]["manager"]
-                or row["customerClient"]["status"] != "ENABLED"
-                or row["customerClient"]["id"]
-                not in self.config.get("customer_ids", [row["customerClient"]["id"]])
-            ):
-                continue
-            yield row
+        if self._visited_customer_ids is None:
+            self._visited_customer_ids = set()
+        visited = self._visited_customer_ids
+        shard = self._tap.shard  # type: ignore[attr-defined]
+        managers = [context["customer_id"]] if context else []
+        managers = [manager for manager in managers if manager not in visited]
+
+        depth = 0
+        with ThreadPoolExecutor(self.max_parallel_hierarchy_queries) as executor:
+            while managers:
+                next_managers = []
+                for manager_id, rows in zip(
+                    managers, executor.map(self._request_client_rows, managers)
+                ):
+                    visited.add(manager_id)
+                    for row in rows:
+                        row = self.post_process(row, context)
+                        client = row["customerClient"]
+                        # The queried customer's own row is only skipped for a
+                        # manager; an accessible client account is synced itself
+                        own_row = client["id"] == manager_id
+                        if own_row and client["manager"]:
+                            continue
+                        if not own_row and client["id"] in visited:
+                            continue
+                        visited.add(client["id"])
+                        # Make the level relative to the accessible customer
+                        client["level"] = str(depth + int(client["level"]))
+                        # Don't search Manager accounts as we can't query them for
+                        # everything, walk the customers they manage instead
+                        if client["manager"]:
+                            if client["status"] == "ENABLED":
+                                next_managers.append(client["id"])
+                            continue
+                        allowed = self.config.get("customer_ids", [client["id"]])
+                        if (
+                            client["status"] == "ENABLED"
+                            and client["id"] in allowed
+                            and shard.includes(client["id"])
+                        ):
+                            yield row
+                managers = next_managers
+                depth += 1
+
+    def _request_client_rows(self, manager_id: str) -> List[dict]:
+        """Return the manager's own customer_client row and those of its clients."""
+        return self.request_cached_records(
+            {"customer_id": manager_id},
+            _customer_hierarchy_cache(self.config),
+            refresh=self.config.get("refresh_customer_hierarchy_cache", False),
+        )
+
+    @property
+    def max_parallel_hierarchy_queries(self) -> int:
+        return self.config.get("max_parallel_hierarchy_queries", 1)
 
     def get_child_context(self, record: dict, context: Optional[dict]) -> dict:
         """Return a context dictionary for child streams."""
         return {"customer_id": record["customerClient"]["id"]}
 
+    @property
+    def max_parallel_customers(self) -> int:
+        return self.config.get("max_parallel_customers", 1)
+
+    def _sync_children(  # type: ignore[override]
+        self, child_context: Optional[dict]
+    ) -> None:
+        # Defer child syncs so customers can be fetched concurrently once the
+        # hierarchies of all accessible customers are known.
+        if self.max_parallel_customers == 1 or child_context is None:
+            super()._sync_children(child_context)
+            return
+        if self._pending_child_contexts is None:
+            self._pending_child_contexts = []
+        self._pending_child_contexts.append(child_context)
+
+    def _sync_pending_children(self) -> None:
+        """Sync deferred child partitions with up to `max_parallel_customers` workers.
+
+        Child records are fetched on worker threads in the order the customers were
+        discovered, and each partition is then synced on this thread in that same
+        order, so RECORD and STATE messages come from a single writer.
+        """
+        contexts, self._pending_child_contexts = self._pending_child_contexts or [], []
+        child_streams = [
+            child_stream
+            for child_stream in self.child_streams
+            if child_stream.selected or child_stream.has_selected_descendents
+        ]
+        if not contexts or not child_streams:
+            return
+
+        if self.request_engine is not None:
+            # Queries of the next partitions run on the async engine meanwhile
+            ordered = [
+                (child_stream, child_context)
+                for child_context in contexts
+                for child_stream in child_streams
+            ]
+            for index, (child_stream, child_context) in enumerate(ordered):
+                for upcoming_stream, upcoming_context in islice(
+                    ordered, index, index + self.max_parallel_customers
+                ):
+                    upcoming_stream.start_requests(  # type: ignore[attr-defined]
+                        upcoming_context
+                    )
+                child_stream.sync(context=child_context)
+            return
+
+        with OrderedPrefetcher(self.max_parallel_customers) as prefetcher:
+            partitions = [
+                (
+                    child_stream,
+                    child_context,
+                    prefetcher.submit(child_stream.get_records, dict(child_context)),
+                )
+                for child_context in contexts
+                for child_stream in child_streams
+            ]
+            for child_stream, child_context, records in partitions:
+                child_stream._prefetched_records = records  # type: ignore[attr-defined]
+                child_stream.sync(context=child_context)
+
 
 class GeotargetsStream(GoogleAdsStream):
     """Geotargets, worldwide, constant across all customers"""
 
     rest_method = "POST"
+    customer_partitioned = False
 
     @property
     def path(self):
@@ -162,16 +383,447 @@ class GeotargetsStream(GoogleAdsStream):
     schema_filepath = SCHEMAS_DIR / "geo_target_constant.json"
     parent_stream_type = None  # Override ReportsStream default as this is a constant
 
+    @property
+    def cache(self) -> Optional[FileCache]:
+        """Return the on-disk cache, if `cache_dir` is configured."""
+        cache_dir = self.config.get("cache_dir")
+        if not cache_dir:
+            return None
+        ttl_hours = self.config.get("geo_target_constant_cache_ttl_hours", 168)
+        return FileCache(cache_dir, ttl=ttl_hours * 3600)
+
+    def get_records(  # type: ignore[override]
+        self, context: Optional[dict]
+    ) -> Iterable[Dict[str, Any]]:
+        """Return a generator of row-type dictionary objects.
+
+        The rows are served from the on-disk cache while it is fresh. Their content
+        hash is kept in the stream state, so with `skip_unchanged_geo_target_constants`
+        a run whose rows match the last emitted ones emits no records at all.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) record in the API.
+        """
+        cache = self.cache
+        entry = cache.load(self.name, self.gaql) if cache else None
+        if entry is not None:
+            self.logger.info("Using cached %s", self.name)
+            rows, digest = entry.rows, entry.content_hash
+        else:
+            rows = list(self.request_records(context))
+            digest = (
+                cache.save(self.name, self.gaql, rows).content_hash
+                if cache
+                else content_hash(rows)
+            )
+
+        if self.config.get("skip_unchanged_geo_target_constants") and digest == (
+            self.get_context_state(context).get("content_hash")
+        ):
+            self.logger.info("Skipping %s, unchanged since the last run", self.name)
+            return
+
+        for row in rows:
+            record = self.post_process(row, context)
+            if record is not None:
+                yield record
+        yield StateCheckpoint(  # type: ignore[misc]
+            context, partial(self._set_content_hash, digest=digest)
+        )
+
+    def _set_content_hash(self, state: dict, *, digest: str) -> None:
+        state["content_hash"] = digest
+
 
 class ReportsStream(GoogleAdsStream):
     rest_method = "POST"
     parent_stream_type = CustomerHierarchyStream
-    path = "/customers/{customer_id}/googleAds:search"
+
+    @property
+    def use_search_stream(self) -> bool:
+        """Whether to read the report from `googleAds:searchStream`."""
+        return bool(self.config.get("use_search_stream"))
+
+    @property
+    def path(self) -> str:  # type: ignore[override]
+        if self.use_search_stream:
+            return "/customers/{customer_id}/googleAds:searchStream"
+        return "/customers/{customer_id}/googleAds:search"
+
+    # gaql fields queried even when deselected, besides primary keys, e.g. for
+    # `post_process`
+    required_gaql_fields: Tuple[str, ...] = ()
 
     @property
     def gaql(self):
         raise NotImplementedError
 
+    @property
+    def selected_gaql(self) -> str:
+        """Return `gaql` without the fields that are deselected in the catalog.
+
+        gaql fields map to schema properties by camel casing each part, so
+        `ad_group_criterion.age_range.type` is the `adGroupCriterion.ageRange.type`
+        property, or the `ad_group_criterion__age_range__type` property of flattened
+        records. Fields of primary keys, `required_gaql_fields` and the
+        `segments.date` of date ranged streams are always kept.
+        """
+        gaql = self.gaql
+        match = _SELECT_FIELDS.search(gaql)
+        if match is None:
+            return gaql
+        fields = [field.strip() for field in match.group("fields").split(",")]
+        selected = [field for field in fields if self._is_gaql_field_selected(field)]
+        if selected == fields:
+            return gaql
+        start, end = match.span("fields")
+        return gaql[:start] + ", ".join(selected) + gaql[end:]
+
+    def _is_gaql_field_selected(self, field: str) -> bool:
+        parts = field.split(".")
+        camel_parts = [self._snake_case_to_camel_case(part) for part in parts]
+        primary_keys = self.primary_keys or ()
+        if (
+            field in self.required_gaql_fields
+            or (self.date_ranged and field == "segments.date")
+            or "__".join(parts) in primary_keys
+            or "__".join(camel_parts) in primary_keys
+        ):
+            return True
+        if self.record_flattener is not None:
+            return self.mask[("properties", "__".join(parts))]
+        breadcrumb: Tuple[str, ...] = ()
+        for part in camel_parts:
+            breadcrumb += ("properties", part)
+        return self.mask[breadcrumb]
+
+    def get_url_params(  # type: ignore[override]
+        self, context: Optional[dict], next_page_token: Optional[Any]
+    ) -> Dict[str, Any]:
+        # Filtering and ordering are part of the gaql query in the request body
+        return {}
+
+    # Pages of queries started ahead on the async engine, by query context
+    _started_queries: Optional[Dict[Tuple, PageIterator]] = None
+
+    @staticmethod
+    def _query_key(context: Optional[dict]) -> Tuple:
+        return tuple(sorted((context or {}).items()))
+
+    def start_query(self, context: Optional[dict]) -> None:
+        """Start requesting the pages of the query of `context` on the async engine."""
+        engine = self.request_engine
+        if engine is None:
+            return
+        if self._started_queries is None:
+            self._started_queries = {}
+        key = self._query_key(context)
+        if key not in self._started_queries:
+            self._started_queries[key] = engine.pages(self, context)
+
+    def start_requests(self, context: Optional[dict]) -> None:
+        """Start the partition's first queries, up to `max_parallel_windows`."""
+        if self.request_engine is None:
+            return
+        if not self.date_ranged:
+            self.start_query(context)
+            return
+        window_contexts = self.get_window_contexts(context)
+        for window_context in islice(window_contexts, self.max_parallel_windows):
+            self.start_query(window_context)
+
+    def _cancel_queries(self, context: Optional[dict]) -> None:
+        """Cancel the queries started ahead for the partition and not read."""
+        items = set((context or {}).items())
+        started = self._started_queries or {}
+        for key in [key for key in started if items <= set(key)]:
+            started.pop(key).close()
+
+    @property
+    def page_prefetch_depth(self) -> int:
+        """Number of pages fetched ahead of the page whose records are read."""
+        return self.config.get("page_prefetch_depth", 0)
+
+    def request_records(  # type: ignore[override]
+        self, context: Optional[dict]
+    ) -> Iterable[dict]:
+        """Request records from the API, reading pages ahead where configured.
+
+        With the async engine, pages of a query started ahead are read from where
+        they were buffered, otherwise the query is started now. With
+        `page_prefetch_depth`, a worker thread requests the following pages as
+        soon as their page tokens are known, while the records of the current page
+        are written.
+        """
+        pages: Iterator[requests.Response]
+        close: Callable[[], None]
+        engine = self.request_engine
+        if engine is not None:
+            started = (self._started_queries or {}).pop(self._query_key(context), None)
+            page_iterator = started or engine.pages(self, context)
+            pages, close = page_iterator, page_iterator.close
+        elif self.page_prefetch_depth and not self.use_search_stream:
+            prefetcher = OrderedPrefetcher(1, self.page_prefetch_depth)
+            pages = prefetcher.submit(self._request_pages, context)
+            close = prefetcher.close
+        else:
+            yield from super().request_records(context)
+            return
+
+        try:
+            with metrics.http_request_counter(self.name, self.path) as request_counter:
+                request_counter.context = context
+                for response in pages:
+                    request_counter.increment()
+                    self.update_sync_costs(response.request, response, context)
+                    records = iter(self.parse_response(response))
+                    first_record = next(records, None)
+                    if first_record is None:
+                        break
+                    yield first_record
+                    yield from records
+        finally:
+            close()
+
+    def _request_pages(self, context: Optional[dict]) -> Iterator[requests.Response]:
+        """Request the pages of the query of `context` one after the other."""
+        paginator = self.get_new_paginator()
+        decorated_request = self.request_decorator(self._request)
+        while not paginator.finished:
+            prepared_request = self.prepare_request(
+                context, next_page_token=paginator.current_value
+            )
+            response = decorated_request(prepared_request, context)
+            yield response
+            paginator.advance(response)
+
+    def get_new_paginator(self) -> BaseAPIPaginator:
+        # searchStream returns every row in a single response
+        if self.use_search_stream:
+            return SinglePagePaginator()
+        return super().get_new_paginator()
+
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        """Send the request, leaving searchStream bodies unread for `parse_response`."""
+        if not self.use_search_stream:
+            return super()._request(prepared_request, context)
+
+        response = self.requests_session.send(
+            prepared_request,
+            timeout=self.timeout,
+            allow_redirects=self.allow_redirects,
+            stream=True,
+        )
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,  # type: ignore[arg-type]
+            extra_tags=(
+                {"url": prepared_request.path_url}
+                if self._LOG_REQUEST_METRIC_URLS
+                else None
+            ),
+        )
+        self.validate_response(response)
+        return response
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result rows.
+
+        searchStream bodies are decoded one result batch at a time while the
+        response is still downloading, each holding the memory it takes while its
+        rows are read.
+        """
+        if not self.use_search_stream:
+            yield from super().parse_response(response)
+            return
+
+        received = held = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                received += len(chunk)
+                yield chunk
+
+        batches = iter_json_array(chunks())
+        parse_seconds = 0.0
+        with self._hold_buffered_body(response):
+            while True:
+                started = time.perf_counter()
+                batch = next(batches, None)
+                parse_seconds += time.perf_counter() - started
+                if batch is None:
+                    break
+                if "error" in batch:
+                    raise FatalAPIError(
+                        f"searchStream failed for '{self.name}': {batch['error']}"
+                    )
+                with self.hold_memory(received - held):
+                    held = received
+                    yield from batch.pop("results", [])
+        self._record_page(response, received, parse_seconds)
+
+    def _hold_buffered_body(self, response: requests.Response) -> ContextManager:
+        """Hold the memory of a body the async engine read whole, while it is read.
+
+        Unlike a body downloading as it is decoded, all of it is in memory from the
+        start, on top of the result batches decoded from it.
+        """
+        if self.request_engine is None or self.memory_budget is None:
+            return nullcontext()
+        return self.memory_budget.hold(int(response.headers["Content-Length"]))
+
+    # Streams whose gaql filters on `{start_date}` and `{end_date}`, bookmarked on
+    # the day each row belongs to
+    date_ranged = False
+
+    @property
+    def date_window_days(self) -> Optional[int]:
+        """Number of days queried per request, or None for the whole date range."""
+        return self.config.get("date_window_days")
+
+    @property
+    def max_parallel_windows(self) -> int:
+        return self.config.get("max_parallel_windows", 1)
+
+    @property
+    def attribution_lookback_days(self) -> int:
+        """Number of already synced days to fetch again for late conversions."""
+        return int(self.config.get("attribution_lookback_days") or 0)
+
+    def get_date_range(self, context: Optional[dict]) -> Tuple[date, date]:
+        """Return the first and last day to sync.
+
+        Incremental syncs continue from the day after the partition's bookmark,
+        less `attribution_lookback_days`, but never before `start_date`.
+        """
+        start = _parse_date(self.start_date)
+        bookmark = self.get_context_state(context).get("replication_key_value")
+        if bookmark and self.replication_method == REPLICATION_INCREMENTAL:
+            start = max(
+                start,
+                _parse_date(bookmark)
+                + timedelta(days=1 - self.attribution_lookback_days),
+            )
+        return start, _parse_date(self.end_date)
+
+    def get_date_windows(self, context: Optional[dict]) -> List[Tuple[date, date]]:
+        """Split the date range into windows of `date_window_days` days."""
+        start, end = self.get_date_range(context)
+        size = timedelta(days=(self.date_window_days or (end - start).days + 1) - 1)
+        windows = []
+        while start <= end:
+            windows.append((start, min(start + size, end)))
+            start += size + timedelta(days=1)
+        return windows
+
+    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
+        """Return a generator of row-type dictionary objects.
+
+        Date ranged streams query one window at a time, up to
+        `max_parallel_windows` concurrently, and bookmark each completed window so
+        the next sync, or a retry of an interrupted one, continues after it.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per (possibly processed) record in the API.
+        """
+        if not self.date_ranged:
+            yield from super().get_records(context)
+            return
+
+        windows = self.get_date_windows(context)
+        window_contexts = self.get_window_contexts(context, windows)
+        fetch_window = super().get_records
+        with OrderedPrefetcher(self.max_parallel_windows) as prefetcher:
+            if self.request_engine is not None:
+                fetched: Iterable = self._fetch_ahead(window_contexts, fetch_window)
+            elif self.max_parallel_windows > 1:
+                fetched = [prefetcher.submit(fetch_window, c) for c in window_contexts]
+            else:
+                fetched = map(fetch_window, window_contexts)
+            try:
+                for window, records in zip(windows, fetched):
+                    yield from self._window_records(context, window, records)
+            finally:
+                if self.request_engine is not None:
+                    self._cancel_queries(context)
+
+    def get_window_contexts(
+        self,
+        context: Optional[dict],
+        windows: Optional[List[Tuple[date, date]]] = None,
+    ) -> List[dict]:
+        """Return the query context of each date window of the partition."""
+        if windows is None:
+            windows = self.get_date_windows(context)
+        return [
+            {
+                **(context or {}),
+                "start_date": _format_date(window_start),
+                "end_date": _format_date(window_end),
+            }
+            for window_start, window_end in windows
+        ]
+
+    def _fetch_ahead(
+        self, window_contexts: List[dict], fetch_window: Callable
+    ) -> Iterator[Iterable]:
+        """Yield the records of each window, with the next windows' queries started.
+
+        The queries of up to `max_parallel_windows` windows run on the async engine
+        while the records of the first of them are read.
+        """
+        for index, window_context in enumerate(window_contexts):
+            for upcoming in islice(
+                window_contexts, index, index + self.max_parallel_windows
+            ):
+                self.start_query(upcoming)
+            yield fetch_window(window_context)
+
+    def _window_records(
+        self, context: Optional[dict], window: Tuple[date, date], records: Iterable
+    ) -> Iterable:
+        """Yield the records of a window, then the checkpoint completing it."""
+        yield from records
+        yield StateCheckpoint(
+            context, partial(self._complete_window, window_end=window[1])
+        )
+
+    def _complete_window(self, state: dict, *, window_end: date) -> None:
+        # Today's figures are still changing, so only bookmark up to yesterday
+        completed = min(window_end, date.today() - timedelta(days=1)).isoformat()
+        if completed > state.get("replication_key_value", ""):
+            state["replication_key"] = self.replication_key
+            state["replication_key_value"] = completed
+
+    def _increment_stream_state(
+        self, latest_record: Record, *, context: Context | None = None
+    ) -> None:
+        # Date ranged streams are bookmarked per completed window, not per record
+        if not self.date_ranged:
+            super()._increment_stream_state(latest_record, context=context)
+
+    def post_process(
+        self,
+        row: Record,
+        context: Context | None = None,  # noqa: ARG002
+    ) -> dict | None:
+        """Copy `segments.date` to the top level `date` replication key."""
+        if self.date_ranged:
+            row["date"] = row["segments"]["date"]
+        return row
+
     def prepare_request_payload(
         self,
         context: Context | None,
@@ -190,12 +842,19 @@ class ReportsStream(GoogleAdsStream):
             next_page_token: Token, page number or any request argument to request the
                 next page of data.
         """
+        query = self.selected_gaql.format(**(context or {}))
+        if self.use_search_stream:
+            return {"query": query}
         return {
-            "query": self.gaql,
+            "query": query,
             "pageToken": next_page_token,
         }
 
 
+class DayQueryError(FatalAPIError):
+    """The API rejected the query of a single day, e.g. as out of range."""
+
+
 class ClickViewReportStream(ReportsStream):
     @property
     def gaql(self):
@@ -217,7 +876,7 @@ class ClickViewReportStream(ReportsStream):
             , click_view.keyword
             , click_view.keyword_info.match_type
         FROM click_view
-        WHERE segments.date = {date}
+        WHERE segments.date = {start_date}
         """
 
     records_jsonpath = "$.results[*]"
@@ -235,8 +894,37 @@ class ClickViewReportStream(ReportsStream):
         "date",
     ]
     replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "click_view_report.json"
-    state_partitioning_keys = []
+    batch_partition_key = "date"
+
+    # click_view can only be queried for the last 90 days
+    max_age_days = 90
+
+    # Fields of rows held packed that differ from click to click, so not interned
+    unique_fields = ("clickView.gclid", "clickView.resourceName")
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream, packing held rows if `compact_click_view_rows`."""
+        super().__init__(*args, **kwargs)
+        self.row_packer: Optional[RowPacker] = None
+        if self.config.get("compact_click_view_rows"):
+            self.row_packer = RowPacker(self.unique_fields)
+
+    def validate_response(self, response: requests.Response) -> None:
+        """Raise `DayQueryError` for a day the API rejects as an invalid argument.
+
+        Any other error, such as missing permission on the customer, is not
+        specific to the day and fails the customer's sync.
+        """
+        try:
+            super().validate_response(response)
+        except FatalAPIError as ex:
+            if response.status_code == 400 and _error_status(response) == (
+                "INVALID_ARGUMENT"
+            ):
+                raise DayQueryError(*ex.args) from ex
+            raise
 
     def post_process(self, row, context):
         row["date"] = row["segments"].pop("date")
@@ -247,52 +935,182 @@ class ClickViewReportStream(ReportsStream):
 
         return row
 
-    def get_records(self, context: Optional[dict]) -> Iterable[Dict[str, Any]]:
-        date_list = []
+    @property
+    def date_window_days(self) -> int:
+        # click_view only accepts single day queries
+        return 1
 
-        replication_values = []
+    def first_day(self) -> date:
+        """Return the first day to sync, no older than click_view allows."""
+        oldest = date.today() - timedelta(days=self.max_age_days)
+        return max(_parse_date(self.start_date), oldest)
 
-        value = self.stream_state.get("replication_key_value", False)
-        if value:
-            replication_values.append(value)
+    def get_date_range(self, context: Optional[dict]) -> Tuple[date, date]:
+        """Return the days to sync, from `first_day` up to yesterday.
 
-        # Get the maximum replication_key_value
-        if len(replication_values) > 0:
-            last_replication_date = max(replication_values)
-        else:
-            last_replication_date = None
+        A bookmark before `first_day`, e.g. held back by a day that kept failing
+        until it became too old to query, is moved up to it.
+        """
+        state = self.get_context_state(context)
+        legacy_bookmark = self.stream_state.get("replication_key_value")
+        if legacy_bookmark and "replication_key_value" not in state:
+            # Earlier versions kept a single bookmark for every customer
+            state["replication_key"] = self.replication_key
+            state["replication_key_value"] = legacy_bookmark
+        floor = (self.first_day() - timedelta(days=1)).isoformat()
+        if state.get("replication_key_value", floor) < floor:
+            self._move_bookmark(state, set(state.get("completed_dates", [])))
+        start, _ = super().get_date_range(context)
+        start = max(start, self.first_day())
+        yesterday = date.today() - timedelta(days=1)
+        # Only ever query full days of data
+        return min(start, yesterday), yesterday
+
+    def get_date_windows(self, context: Optional[dict]) -> List[Tuple[date, date]]:
+        """Return the days to sync, less those completed since the bookmark."""
+        completed = set(self.get_context_state(context).get("completed_dates", []))
+        return [
+            window
+            for window in super().get_date_windows(context)
+            if window[0].isoformat() not in completed
+        ]
 
-        yesterdays_date = datetime.now() - timedelta(days=1)
+    def _window_records(
+        self, context: Optional[dict], window: Tuple[date, date], records: Iterable
+    ) -> Iterable:
+        """Yield the records of a day, skipping the day if its query fails.
 
-        # if last_replication_date is today or greater, set the date to yesterday (last full days data)
-        if last_replication_date:
-            if last_replication_date >= datetime.now().strftime("%Y-%m-%d"):
-                last_replication_date = yesterdays_date.strftime("%Y-%m-%d")
+        The customer's later days are still synced, and the failed day is queried
+        again by the next sync as the bookmark stays before it.
+        """
+        day = window[0]
+        try:
+            yield from records
+        except DayQueryError as ex:
+            self._skip_day(context, day, ex)
+            return
+        yield StateCheckpoint(context, partial(self._complete_day, day=day))
+
+    def get_records(  # type: ignore[override]
+        self, context: Optional[dict]
+    ) -> Iterable[Dict[str, Any]]:
+        """Return a generator of row-type dictionary objects.
 
-            # This is if the last_replication_date defaults back to the start date (timestamp)
-            if "T" in last_replication_date:
-                last_replication_date, _ = last_replication_date.split("T")
+        With `max_parallel_windows` above one, that many days are fetched at once
+        and each day is written as soon as all of its pages are fetched, whatever
+        order the days complete in. Only the days being fetched are held in memory,
+        packed into tuples with `compact_click_view_rows` until they are written,
+        and `_complete_day` keeps the bookmark before the first day that is not
+        completed yet.
 
-        current_date = datetime.strptime(self.start_date.replace("'", ""), "%Y-%m-%d")
+        Args:
+            context: Stream partition or context dictionary.
 
-        if last_replication_date:
-            current_date = datetime.strptime(
-                last_replication_date.replace("'", ""), "%Y-%m-%d"
-            )
+        Yields:
+            One item per (possibly processed) record in the API.
+        """
+        if self.max_parallel_windows == 1 or self.request_engine is not None:
+            yield from super().get_records(context)
+            return
+
+        days = [window_start for window_start, _ in self.get_date_windows(context)]
+        fetch_day = partial(self._fetch_day, context)
+        with ThreadPoolExecutor(self.max_parallel_windows) as executor:
+            pending: Dict[Future, Tuple[date, Task]] = {}
+            try:
+                while days or pending:
+                    while days and len(pending) < self.max_parallel_windows:
+                        day = days.pop(0)
+                        future, task = submit_task(executor, fetch_day, day)
+                        pending[future] = (day, task)
+                    # The oldest day never waits for the memory budget, so days
+                    # fetched can't all be kept waiting for each other
+                    next(iter(pending.values()))[1].draining = True
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        day, _ = pending.pop(future)
+                        try:
+                            records, reservation = future.result()
+                        except DayQueryError as ex:
+                            self._skip_day(context, day, ex)
+                            continue
+                        try:
+                            if self.row_packer is not None:
+                                records = self.row_packer.unpack_all(records)
+                            yield from records
+                        finally:
+                            if reservation is not None:
+                                reservation.release()
+                        yield StateCheckpoint(  # type: ignore[misc]
+                            context, partial(self._complete_day, day=day)
+                        )
+            finally:
+                for future in pending:
+                    future.cancel()
+                    future.add_done_callback(self._discard_day)
+
+    def _fetch_day(
+        self, context: Optional[dict], day: date
+    ) -> Tuple[List[Any], Optional[Reservation]]:
+        """Return the rows of `day`, packed if `compact_click_view_rows`.
+
+        With `max_buffered_memory_mb`, the memory held by the day's pages stays
+        reserved until the rows have been written.
+        """
+        day_context = {
+            **(context or {}),
+            "start_date": _format_date(day),
+            "end_date": _format_date(day),
+        }
+        budget = self.memory_budget
+        retained = budget.retain() if budget is not None else nullcontext()
+        with retained as reservation:
+            records = super(ReportsStream, self).get_records(day_context)
+            if self.row_packer is None:
+                return list(records), reservation
+            return [self.row_packer.pack(record) for record in records], reservation
+
+    @staticmethod
+    def _discard_day(future: Future) -> None:
+        """Release the memory of a day fetched but never written."""
+        if not future.cancelled() and future.exception() is None:
+            _, reservation = future.result()
+            if reservation is not None:
+                reservation.release()
+
+    def _skip_day(self, context: Optional[dict], day: date, ex: Exception) -> None:
+        self.logger.warning(
+            "Skipping %s of customer %s until the next sync: %s",
+            day.isoformat(),
+            (context or {}).get("customer_id"),
+            ex,
+        )
 
-        # Generate a list of dates up to yesterday
-        if current_date < datetime.now() - timedelta(days=1):
-            while current_date < datetime.now() - timedelta(days=1):
-                date_list.append("'" + current_date.strftime("%Y-%m-%d") + "'")
-                current_date += timedelta(days=1)
-        else:
-            date_list.append("'" + yesterdays_date.strftime("%Y-%m-%d") + "'")
+    def _complete_day(self, state: dict, *, day: date) -> None:
+        """Mark `day` completed and move the bookmark over the days completed since.
 
-        for date in date_list:
-            context["date"] = date
-            # Call the parent get_records with the modified context (date value)
-            for record in super().get_records(context):
-                yield record
+        `replication_key_value` is the last day up to which every day is completed,
+        and `completed_dates` lists the days completed after it.
+        """
+        completed = set(state.get("completed_dates", []))
+        completed.add(day.isoformat())
+        self._move_bookmark(state, completed)
+
+    def _move_bookmark(self, state: dict, completed: Set[str]) -> None:
+        """Move the bookmark over the `completed` days that follow it.
+
+        The bookmark starts from the day before `first_day` at the earliest, and
+        completed days up to the bookmark are dropped.
+        """
+        floor = (self.first_day() - timedelta(days=1)).isoformat()
+        bookmark = max(state.get("replication_key_value") or floor, floor)
+        next_day = _parse_date(bookmark) + timedelta(days=1)
+        while next_day.isoformat() in completed:
+            bookmark = next_day.isoformat()
+            next_day += timedelta(days=1)
+        state["replication_key"] = self.replication_key
+        state["replication_key_value"] = bookmark
+        state["completed_dates"] = sorted(d for d in completed if d > bookmark)
 
     def sync(self, context):
         """Sync this stream.
@@ -355,7 +1173,7 @@ class CampaignsStream(ReportsStream):
         """
         properties = [
             f"{self._camel_case_to_snake_case(key)}.{self._camel_case_to_snake_case(prop)}"
-            for key, value in self.schema["properties"].items()
+            for key, value in self.api_schema["properties"].items()
             if key not in ["id", "customer_id"]
             for prop in value["properties"]
         ]
@@ -389,6 +1207,7 @@ class CampaignsStream(ReportsStream):
 
     records_jsonpath = "$.results[*]"
     name = "stream_campaign"
+    required_gaql_fields = ("campaign.id",)
     primary_keys = ["id"]
     replication_key = None
     schema_filepath = SCHEMAS_DIR / "campaign.json"
@@ -441,17 +1260,18 @@ class AdGroupsPerformance(ReportsStream):
 
     @property
     def gaql(self):
-        return f"""
-        SELECT campaign.id, ad_group.id, metrics.impressions, metrics.clicks,
-               metrics.cost_micros
+        return """
+        SELECT campaign.id, ad_group.id, segments.date, metrics.impressions,
+               metrics.clicks, metrics.cost_micros
                FROM ad_group
-               WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date}
+               WHERE segments.date >= {start_date} and segments.date <= {end_date}
         """
 
     records_jsonpath = "$.results[*]"
     name = "stream_adgroupsperformance"
-    primary_keys = ["campaign__id", "ad_group__id"]
-    replication_key = None
+    primary_keys = ["campaign__id", "ad_group__id", "segments__date"]
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "adgroups_performance.json"
 
 
@@ -460,8 +1280,8 @@ class CampaignPerformance(ReportsStream):
 
     @property
     def gaql(self):
-        return f"""
-    SELECT campaign.name, campaign.status, segments.device, segments.date, metrics.impressions, metrics.clicks, metrics.ctr, metrics.average_cpc, metrics.cost_micros FROM campaign WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date}
+        return """
+    SELECT campaign.name, campaign.status, segments.device, segments.date, metrics.impressions, metrics.clicks, metrics.ctr, metrics.average_cpc, metrics.cost_micros FROM campaign WHERE segments.date >= {start_date} and segments.date <= {end_date}
     """
 
     records_jsonpath = "$.results[*]"
@@ -472,17 +1292,21 @@ class CampaignPerformance(ReportsStream):
         "segments__date",
         "segments__device",
     ]
-    replication_key = None
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "campaign_performance.json"
 
 
+# The campaign performance streams can't share a query: GAQL selects from a single
+# resource, and age_range_view and gender_view rows are keyed by criterion rather
+# than by campaign, so each report is queried from its own resource.
 class CampaignPerformanceByAgeRangeAndDevice(ReportsStream):
     """Campaign Performance By Age Range and Device"""
 
     @property
     def gaql(self):
-        return f"""
-    SELECT ad_group_criterion.age_range.type, campaign.name, campaign.status, ad_group.name, segments.date, segments.device, ad_group_criterion.system_serving_status, ad_group_criterion.bid_modifier, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros, campaign.advertising_channel_type FROM age_range_view WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date}
+        return """
+    SELECT ad_group_criterion.age_range.type, campaign.name, campaign.status, ad_group.name, segments.date, segments.device, ad_group_criterion.system_serving_status, ad_group_criterion.bid_modifier, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros, campaign.advertising_channel_type FROM age_range_view WHERE segments.date >= {start_date} and segments.date <= {end_date}
     """
 
     records_jsonpath = "$.results[*]"
@@ -494,7 +1318,8 @@ class CampaignPerformanceByAgeRangeAndDevice(ReportsStream):
         "campaign__status",
         "segments__device",
     ]
-    replication_key = None
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "campaign_performance_by_age_range_and_device.json"
 
 
@@ -503,8 +1328,8 @@ class CampaignPerformanceByGenderAndDevice(ReportsStream):
 
     @property
     def gaql(self):
-        return f"""
-    SELECT ad_group_criterion.gender.type, campaign.name, campaign.status, ad_group.name, segments.date, segments.device, ad_group_criterion.system_serving_status, ad_group_criterion.bid_modifier, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros, campaign.advertising_channel_type FROM gender_view WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date}
+        return """
+    SELECT ad_group_criterion.gender.type, campaign.name, campaign.status, ad_group.name, segments.date, segments.device, ad_group_criterion.system_serving_status, ad_group_criterion.bid_modifier, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros, campaign.advertising_channel_type FROM gender_view WHERE segments.date >= {start_date} and segments.date <= {end_date}
     """
 
     records_jsonpath = "$.results[*]"
@@ -516,7 +1341,8 @@ class CampaignPerformanceByGenderAndDevice(ReportsStream):
         "campaign__status",
         "segments__device",
     ]
-    replication_key = None
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "campaign_performance_by_gender_and_device.json"
 
 
@@ -525,8 +1351,8 @@ class CampaignPerformanceByLocation(ReportsStream):
 
     @property
     def gaql(self):
-        return f"""
-    SELECT campaign_criterion.location.geo_target_constant, campaign.name, campaign_criterion.bid_modifier, segments.date, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros FROM location_view WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date} AND campaign_criterion.status != 'REMOVED'
+        return """
+    SELECT campaign_criterion.location.geo_target_constant, campaign.name, campaign_criterion.bid_modifier, segments.date, metrics.clicks, metrics.impressions, metrics.ctr, metrics.average_cpc, metrics.cost_micros FROM location_view WHERE segments.date >= {start_date} and segments.date <= {end_date} AND campaign_criterion.status != 'REMOVED'
     """
 
     records_jsonpath = "$.results[*]"
@@ -536,7 +1362,8 @@ class CampaignPerformanceByLocation(ReportsStream):
         "campaign__name",
         "segments__date",
     ]
-    replication_key = None
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "campaign_performance_by_location.json"
 
 
@@ -545,7 +1372,7 @@ class GeoPerformance(ReportsStream):
 
     @property
     def gaql(self):
-        return f"""
+        return """
     SELECT 
         campaign.name, 
         campaign.status, 
@@ -557,7 +1384,7 @@ class GeoPerformance(ReportsStream):
         geographic_view.location_type,
         geographic_view.country_criterion_id
     FROM geographic_view 
-    WHERE segments.date >= {self.start_date} and segments.date <= {self.end_date} 
+    WHERE segments.date >= {start_date} and segments.date <= {end_date} 
     """
 
     records_jsonpath = "$.results[*]"
@@ -568,5 +1395,6 @@ class GeoPerformance(ReportsStream):
         "campaign__name",
         "segments__date",
     ]
-    replication_key = None
+    replication_key = "date"
+    date_ranged = True
     schema_filepath = SCHEMAS_DIR / "geo_performance.json"
@@ -1,10 +1,18 @@
 """GoogleAds tap class."""
 
-from typing import List
+from typing import Any, List, Optional
 
+import click
+import requests
 from singer_sdk import Stream, Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk.helpers._util import read_json_file
 
+from tap_googleads.aio import AsyncRequestEngine
+from tap_googleads.instrumentation import SyncMetrics
+from tap_googleads.parallel import MemoryBudget
+from tap_googleads.session import build_requests_session
+from tap_googleads.sharding import Shard
 from tap_googleads.streams import (
     AccessibleCustomers,
     AdGroupsPerformance,
@@ -40,6 +48,11 @@ class TapGoogleAds(Tap):
 
     name = "tap-googleads"
 
+    _requests_session: Optional[requests.Session] = None
+    _sync_metrics: Optional[SyncMetrics] = None
+    _request_engine: Optional[AsyncRequestEngine] = None
+    _memory_budget: Optional[MemoryBudget] = None
+
     # TODO: Add Descriptions
     config_jsonschema = th.PropertiesList(
         th.Property(
@@ -69,16 +82,248 @@ class TapGoogleAds(Tap):
             th.ArrayType(th.StringType),
             description="Overrides the taps default get all data for all available customers logic, and will get you the data for only the the provided customer_ids, granted you have access to them.",
         ),
+        th.Property(
+            "shard",
+            th.StringType(pattern=r"^[0-9]+/[0-9]+$"),
+            description="Sync only the Nth of M shards of the customers, given as N/M, e.g. 2/4, so that M processes together sync every customer. Customers are assigned to shards by a hash of their id, and streams not partitioned by customer are synced by shard 1/M only. Also settable with the --shard command line option.",
+        ),
         th.Property(
             "enable_click_view_report_stream",
             th.BooleanType,
             description="Enables the tap's ClickViewReportStream. This requires setting up / permission on your google ads account(s)",
             default=False,
         ),
+        th.Property(
+            "max_parallel_customers",
+            th.IntegerType(minimum=1),
+            description="Number of customers whose report streams are fetched concurrently. Records are still written in customer order by a single writer.",
+            default=1,
+        ),
+        th.Property(
+            "use_search_stream",
+            th.BooleanType,
+            description="Read report streams from the googleAds:searchStream endpoint, decoding rows as the response arrives instead of paging through googleAds:search.",
+            default=False,
+        ),
+        th.Property(
+            "date_window_days",
+            th.IntegerType(minimum=1),
+            description="Split the start_date to end_date range of performance report streams into windows of this many days, queried separately. Defaults to a single query for the whole range.",
+        ),
+        th.Property(
+            "max_parallel_windows",
+            th.IntegerType(minimum=1),
+            description="Number of date windows fetched concurrently for each customer.",
+            default=1,
+        ),
+        th.Property(
+            "attribution_lookback_days",
+            th.IntegerType,
+            description="Number of already synced days that incremental performance report streams fetch again on every run, to pick up late attributed conversions.",
+            default=0,
+        ),
+        th.Property(
+            "http2",
+            th.BooleanType,
+            description="Send API requests over HTTP/2. Requires httpx[http2] to be installed.",
+            default=False,
+        ),
+        th.Property(
+            "page_prefetch_depth",
+            th.IntegerType(minimum=0),
+            description="Number of pages of a report query fetched ahead and held, by a worker thread that requests the next page as soon as its page token is known, while the records of the current page are written. Pages are requested one after the other when 0.",
+            default=0,
+        ),
+        th.Property(
+            "compact_click_view_rows",
+            th.BooleanType,
+            description="Hold the rows of click view days fetched concurrently with max_parallel_windows as tuples of their values, with repeated strings such as enum values and names interned, rather than as nested objects, until they are written.",
+            default=False,
+        ),
+        th.Property(
+            "max_buffered_memory_mb",
+            th.IntegerType,
+            description="Approximate ceiling, in megabytes, on the memory held by pages of results fetched ahead of their records being written, across all streams and workers. Workers wait for records to be written before decoding more pages while it is reached. Unlimited when unset.",
+        ),
+        th.Property(
+            "async_requests",
+            th.BooleanType,
+            description="Send report queries from a single asyncio event loop rather than worker threads, fetching the pages of upcoming date windows and customers ahead of the records being written. Requires httpx to be installed.",
+            default=False,
+        ),
+        th.Property(
+            "max_in_flight_requests",
+            th.IntegerType,
+            description="Maximum number of report requests in flight at a time with async_requests, across all streams and customers.",
+            default=10,
+        ),
+        th.Property(
+            "max_requests_per_second",
+            th.NumberType,
+            description="Maximum rate of Google Ads API requests, shared by all streams and workers. The rate is halved when the API reports exhausted quota and then recovers gradually. Unlimited when unset.",
+        ),
+        th.Property(
+            "max_concurrent_requests_per_customer",
+            th.IntegerType,
+            description="Maximum number of Google Ads API requests in flight for the same customer. Unlimited when unset.",
+        ),
+        th.Property(
+            "flatten_records",
+            th.BooleanType,
+            description="Emit records with nested objects flattened into snake_case keys, e.g. adGroup.id as ad_group__id, matching the declared primary keys.",
+            default=False,
+        ),
+        th.Property(
+            "coerce_int64_metrics",
+            th.BooleanType,
+            description="Emit int64 metrics and micros amounts, e.g. metrics.clicks and metrics.costMicros, as integers rather than the strings the API returns them as.",
+            default=False,
+        ),
+        th.Property(
+            "cache_dir",
+            th.StringType,
+            description="Directory in which to cache data that rarely changes, such as geo target constants and the customer hierarchy, between runs. Nothing is cached when unset.",
+        ),
+        th.Property(
+            "geo_target_constant_cache_ttl_hours",
+            th.IntegerType,
+            description="Number of hours cached geo target constants are used before they are downloaded again.",
+            default=168,
+        ),
+        th.Property(
+            "skip_unchanged_geo_target_constants",
+            th.BooleanType,
+            description="Emit no geo target constant records when they are unchanged since the last run, according to the stream state.",
+            default=False,
+        ),
+        th.Property(
+            "max_parallel_hierarchy_queries",
+            th.IntegerType(minimum=1),
+            description="Number of manager accounts queried concurrently while walking the customer hierarchy.",
+            default=1,
+        ),
+        th.Property(
+            "customer_hierarchy_cache_ttl_hours",
+            th.IntegerType(minimum=0),
+            description="Cache the accessible customers and customer hierarchy in cache_dir, using them for this many hours before they are queried again. Stale entries are still used when the queries fail. Customers linked meanwhile are not synced until the cache expires. Nothing is cached when unset or 0.",
+        ),
+        th.Property(
+            "refresh_customer_hierarchy_cache",
+            th.BooleanType,
+            description="Query the accessible customers and customer hierarchy again, ignoring any cached copy.",
+            default=False,
+        ),
+        th.Property(
+            "persist_access_token",
+            th.BooleanType,
+            description="Keep the OAuth access token in cache_dir, in a file readable only by its owner, so later runs reuse it until shortly before it expires instead of requesting a new one.",
+            default=False,
+        ),
+        th.Property(
+            "prometheus_textfile",
+            th.StringType,
+            description="Path of a file to which request, page, byte, parse time, record and retry metrics per stream and customer are written at the end of each run, in the Prometheus text format, e.g. for the node exporter textfile collector.",
+        ),
     ).to_dict()
 
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by all streams of this run."""
+        if self._requests_session is None:
+            self._requests_session = build_requests_session(self.config)
+        return self._requests_session
+
+    @property
+    def sync_metrics(self) -> SyncMetrics:
+        """Return the performance metrics of this run."""
+        if self._sync_metrics is None:
+            self._sync_metrics = SyncMetrics(self.config.get("prometheus_textfile"))
+        return self._sync_metrics
+
+    @property
+    def shard(self) -> Shard:
+        """Return the shard of customers this process syncs."""
+        return Shard.parse(self.config.get("shard"))
+
+    @property
+    def memory_budget(self) -> Optional[MemoryBudget]:
+        """Return the ceiling set by `max_buffered_memory_mb`, if any."""
+        limit = self.config.get("max_buffered_memory_mb")
+        if self._memory_budget is None and limit:
+            self._memory_budget = MemoryBudget(int(limit) * 1024 * 1024)
+        return self._memory_budget
+
+    @property
+    def request_engine(self) -> Optional[AsyncRequestEngine]:
+        """Return the engine sending report queries, if `async_requests` is set."""
+        if self._request_engine is None and self.config.get("async_requests"):
+            self._request_engine = AsyncRequestEngine(
+                int(self.config.get("max_in_flight_requests") or 10),
+                getattr(self.requests_session, "rate_limiter", None),
+                http2=bool(self.config.get("http2")),
+            )
+        return self._request_engine
+
+    def sync_all(self) -> None:  # type: ignore[misc]
+        """Sync all streams, then write the Prometheus textfile, if configured."""
+        try:
+            super().sync_all()
+        finally:
+            if self._request_engine is not None:
+                self._request_engine.close()
+                self._request_engine = None
+            if self._memory_budget is not None:
+                self.logger.info(
+                    "Fetched pages held up to %.1f MB of max_buffered_memory_mb",
+                    self._memory_budget.peak / 1024 / 1024,
+                )
+            self.sync_metrics.write_prometheus_textfile()
+
+    @classmethod
+    def invoke(  # type: ignore[override]
+        cls, *, shard: Optional[str] = None, **kwargs: Any
+    ) -> None:
+        """Invoke the tap's command line interface, with `--shard` setting `shard`."""
+        if shard is None:
+            super().invoke(**kwargs)
+            return
+
+        # As `Tap.invoke`, with the shard added to the settings of the config files
+        super(Tap, cls).invoke(
+            about=kwargs.get("about", False), about_format=kwargs.get("about_format")
+        )
+        cls.print_version(print_fn=cls.logger.info)
+        config_files, parse_env_config = cls.config_from_cli_args(
+            *kwargs.get("config", ())
+        )
+        config: dict = {}
+        for config_file in config_files:
+            config.update(read_json_file(config_file))
+        config["shard"] = shard
+        tap = cls(
+            config=config,
+            state=kwargs.get("state"),
+            catalog=kwargs.get("catalog"),
+            parse_env_config=parse_env_config,
+            validate_config=True,
+        )
+        tap.sync_all()
+
+    @classmethod
+    def get_singer_command(cls) -> click.Command:
+        """Return the tap's command, taking a `--shard N/M` option too."""
+        command = super().get_singer_command()
+        command.params.append(
+            click.Option(
+                ["--shard"],
+                help="Sync only the Nth of M shards of the customers, e.g. 2/4.",
+            )
+        )
+        return command
+
     def discover_streams(self) -> List[Stream]:
         """Return a list of discovered streams."""
+        stream_types = list(STREAM_TYPES)
         if self.config["enable_click_view_report_stream"]:
-            STREAM_TYPES.append(ClickViewReportStream)
-        return [stream_class(tap=self) for stream_class in STREAM_TYPES]
+            stream_types.append(ClickViewReportStream)
+        return [stream_class(tap=self) for stream_class in stream_types]
@@ -0,0 +1,185 @@
+"""Tests sending report queries through the asyncio request engine."""
+
+import json
+import re
+import threading
+import time
+import unittest
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.tests.test_throttle import quota_error
+
+SEARCH_PATH = re.compile(r"/customers/(\d+)/googleAds:search")
+
+
+class ReportServer:
+    """Local server answering report queries with two pages per customer"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = []
+        self.body_sizes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                body = json.loads(self.rfile.read(length))
+                status, page = server.respond(self.path, body)
+                data = json.dumps(page).encode()
+                server.body_sizes.append(len(data))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d/v18" % self.httpd.server_address[1]
+
+    def respond(self, path, body):
+        customer_id = SEARCH_PATH.search(path).group(1)
+        with self.lock:
+            self.requests.append((customer_id, body.get("pageToken")))
+            if self.failures:
+                self.failures -= 1
+                return 429, quota_error("0s")
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        page = 1 if body.get("pageToken") else 0
+        result = {
+            "results": [
+                {
+                    "campaign": {"id": "1"},
+                    "adGroup": {"id": f"{customer_id}-{page}"},
+                    "segments": {"date": "2024-01-01"},
+                    "metrics": {"clicks": "1"},
+                }
+            ]
+        }
+        if path.endswith("searchStream"):
+            # Every row in a single response, as an array of result batches
+            result["results"].append(
+                {**result["results"][0], "adGroup": {"id": f"{customer_id}-1"}}
+            )
+            return 200, [result]
+        if not page:
+            result["nextPageToken"] = "next"
+        return 200, result
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestAsyncRequests(unittest.TestCase):
+    """Test class for the async_requests setting"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "async_requests": True,
+            "max_in_flight_requests": 2,
+            "max_parallel_customers": 4,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def sync(self, server, customer_ids, write_message=None):
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+        tap.streams["stream_adgroupsperformance"].url_base = server.url
+        test_utils.add_customer_responses(customer_ids)
+        if write_message:
+            tap.write_message = partial(write_message, tap)
+        tap.sync_all()
+        return [
+            msg.record["adGroup"]["id"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+
+    @responses.activate
+    def test_pages_of_all_customers_fetched_in_order(self):
+        """Test every page is written in customer order, within the in-flight cap"""
+        server = ReportServer()
+        self.addCleanup(server.close)
+
+        records = self.sync(server, ["11", "12", "13", "14"])
+
+        self.assertEqual(
+            records,
+            [f"{customer}-{page}" for customer in range(11, 15) for page in (0, 1)],
+        )
+        self.assertEqual(len(server.requests), 8)
+        self.assertLessEqual(server.max_in_flight, 2)
+        # Customers were queried ahead, before the first one was written
+        self.assertGreater(server.max_in_flight, 1)
+
+    @responses.activate
+    def test_quota_errors_retried(self):
+        """Test requests failing with exhausted quota are retried"""
+        server = ReportServer(failures=2)
+        self.addCleanup(server.close)
+
+        records = self.sync(server, ["11"])
+
+        self.assertEqual(records, ["11-0", "11-1"])
+        self.assertEqual(len(server.requests), 4)
+
+    @responses.activate
+    def test_search_stream(self):
+        """Test searchStream responses fetched by the engine are parsed"""
+        server = ReportServer()
+        self.addCleanup(server.close)
+        self.mock_config["use_search_stream"] = True
+
+        records = self.sync(server, ["11", "12"])
+
+        self.assertEqual(records, ["11-0", "11-1", "12-0", "12-1"])
+        self.assertEqual(len(server.requests), 2)
+
+    @responses.activate
+    def test_search_stream_body_held_while_read(self):
+        """Test a searchStream body read whole by the engine is held while read"""
+        server = ReportServer()
+        self.addCleanup(server.close)
+        self.mock_config["use_search_stream"] = True
+        self.mock_config["max_buffered_memory_mb"] = 1
+        held_while_written = []
+
+        def write_message(tap, message):
+            if isinstance(message, singer.RecordMessage):
+                held_while_written.append(tap.memory_budget.used)
+            test_utils.accumulate_singer_messages(message)
+
+        records = self.sync(server, ["11"], write_message)
+
+        self.assertEqual(records, ["11-0", "11-1"])
+        [size] = server.body_sizes
+        # The body itself, and the batch decoded from it
+        self.assertEqual(held_while_written, [6 * size, 6 * size])
@@ -0,0 +1,134 @@
+"""Tests writing BATCH files of report records."""
+
+import gzip
+import importlib.util
+import json
+import re
+import shutil
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.batch import arrow_schema
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+
+def click_view_rows(request):
+    """Return a click_view row for the date queried by request"""
+    query = json.loads(request.body)["query"]
+    day = re.search(r"segments.date = '([\d-]+)'", query).group(1)
+    rows = [
+        {
+            "clickView": {"gclid": f"{day}-{row}", "keyword": "k"},
+            "segments": {"date": day},
+            "metrics": {"clicks": "1"},
+        }
+        for row in range(3)
+    ]
+    return 200, {}, json.dumps({"results": rows})
+
+
+class TestBatchFiles(unittest.TestCase):
+    """Test class for syncing report streams to batch files"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.days = [date.today() - timedelta(days=days) for days in (2, 1)]
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": self.days[0].isoformat(),
+            "enable_click_view_report_stream": True,
+            "flatten_records": True,
+            "coerce_int64_metrics": True,
+            "batch_config": {
+                "encoding": {"format": "jsonl", "compression": "gzip"},
+                "storage": {"root": f"file://{self.directory}", "prefix": "test-"},
+                "batch_size": 2,
+            },
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    @responses.activate
+    def test_files_per_customer_and_date(self):
+        """Test transformed records are written to files of one customer and date"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_click_view_report"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, callback=click_view_rows)
+
+        tap.sync_all()
+
+        manifests = [
+            msg.manifest
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.Message) and msg.type == "BATCH"
+        ]
+        files = [
+            Path(url.replace("file://", "", 1)) for urls in manifests for url in urls
+        ]
+        self.assertEqual(len(files), 4)
+        for day, day_files in zip(self.days, (files[:2], files[2:])):
+            rows = []
+            for file in day_files:
+                self.assertIn(f"-11-{day.isoformat()}-", file.name)
+                with gzip.open(file) as lines:
+                    rows += [json.loads(line) for line in lines]
+            self.assertEqual(
+                [row["click_view__gclid"] for row in rows],
+                [f"{day.isoformat()}-{row}" for row in range(3)],
+            )
+            self.assertEqual({row["metrics__clicks"] for row in rows}, {1})
+        self.assertFalse(
+            [
+                msg
+                for msg in test_utils.SINGER_MESSAGES
+                if isinstance(msg, singer.RecordMessage)
+                and msg.stream == "stream_click_view_report"
+            ]
+        )
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+    def test_arrow_schema(self):
+        """Test the Arrow schema follows the types of the JSON schema"""
+        import pyarrow as pa
+
+        schema = arrow_schema(
+            {
+                "properties": {
+                    "clicks": {"type": ["integer", "null"]},
+                    "ctr": {"type": "number"},
+                    "campaign": {
+                        "type": "object",
+                        "properties": {"name": {"type": "string"}},
+                    },
+                    "labels": {"type": "array", "items": {"type": "string"}},
+                }
+            }
+        )
+
+        self.assertEqual(
+            schema,
+            pa.schema(
+                [
+                    ("clicks", pa.int64()),
+                    ("ctr", pa.float64()),
+                    ("campaign", pa.struct([("name", pa.string())])),
+                    ("labels", pa.list_(pa.string())),
+                ]
+            ),
+        )
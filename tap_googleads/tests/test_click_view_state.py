@@ -0,0 +1,226 @@
+"""Tests per customer and per date bookmarks of the click view report."""
+
+import json
+import re
+import time
+import unittest
+from datetime import date, timedelta
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+SEARCH_STREAM_URL = (
+    "https://googleads.googleapis.com/v18/customers/11/googleAds:searchStream"
+)
+
+
+def click_view_callback(failing_days=(), slow_days=(), denied=False, stream=False):
+    """Return a click_view row for the queried date, failing for failing_days
+
+    With stream, bodies are searchStream arrays, errors included.
+    """
+
+    def callback(request):
+        query = json.loads(request.body)["query"]
+        day = re.search(r"segments.date = '([\d-]+)'", query).group(1)
+        if denied:
+            return 403, {}, json.dumps({"error": {"status": "PERMISSION_DENIED"}})
+        if day in slow_days:
+            time.sleep(0.2)
+        if day in failing_days:
+            error = {"error": {"status": "INVALID_ARGUMENT"}}
+            return 400, {}, json.dumps([error] if stream else error)
+        row = {
+            "clickView": {"gclid": day, "keyword": "k"},
+            "segments": {"date": day},
+        }
+        body = {"results": [row]}
+        return 200, {}, json.dumps([body] if stream else body)
+
+    return callback
+
+
+class TestClickViewState(unittest.TestCase):
+    """Test class for click view bookmarks"""
+
+    def setUp(self):
+        self.days = [
+            (date.today() - timedelta(days=days)).isoformat() for days in (3, 2, 1)
+        ]
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": self.days[0],
+            "enable_click_view_report_stream": True,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def sync(self, state=None, failing_days=(), slow_days=(), denied=False):
+        """Sync the click view report, returning the synced days and final state"""
+        del test_utils.SINGER_MESSAGES[:]
+        responses.reset()
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_click_view_report"], state
+        )
+        test_utils.add_customer_responses(["11"])
+        stream = self.mock_config.get("use_search_stream", False)
+        responses.add_callback(
+            responses.POST,
+            SEARCH_STREAM_URL if stream else SEARCH_URL,
+            callback=click_view_callback(failing_days, slow_days, denied, stream),
+        )
+        tap.sync_all()
+        days = [
+            msg.record["date"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        states = [
+            msg.value
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.StateMessage)
+        ]
+        return days, states[-1]
+
+    def partition(self, state):
+        [partition] = state["bookmarks"]["stream_click_view_report"]["partitions"]
+        return partition
+
+    @responses.activate
+    def test_failed_day_synced_again(self):
+        """Test a failed day is skipped and is the only day synced next run"""
+        days, state = self.sync(failing_days=[self.days[1]])
+
+        self.assertEqual(days, [self.days[0], self.days[2]])
+        partition = self.partition(state)
+        self.assertEqual(partition["context"], {"customer_id": "11"})
+        self.assertEqual(partition["replication_key_value"], self.days[0])
+        self.assertEqual(partition["completed_dates"], [self.days[2]])
+
+        days, state = self.sync(state)
+
+        self.assertEqual(days, [self.days[1]])
+        partition = self.partition(state)
+        self.assertEqual(partition["replication_key_value"], self.days[2])
+        self.assertEqual(partition["completed_dates"], [])
+
+    @responses.activate
+    def test_failed_day_skipped_with_search_stream(self):
+        """Test a day rejected in a searchStream error body is skipped too"""
+        self.mock_config["use_search_stream"] = True
+
+        days, state = self.sync(failing_days=[self.days[1]])
+
+        self.assertEqual(days, [self.days[0], self.days[2]])
+        partition = self.partition(state)
+        self.assertEqual(partition["replication_key_value"], self.days[0])
+        self.assertEqual(partition["completed_dates"], [self.days[2]])
+
+    @responses.activate
+    def test_legacy_bookmark(self):
+        """Test the bookmark shared by every customer in earlier versions is used"""
+        state = {
+            "bookmarks": {
+                "stream_click_view_report": {
+                    "replication_key": "date",
+                    "replication_key_value": self.days[1],
+                }
+            }
+        }
+
+        days, state = self.sync(state)
+
+        self.assertEqual(days, [self.days[2]])
+        self.assertEqual(self.partition(state)["replication_key_value"], self.days[2])
+
+    @responses.activate
+    def test_parallel_days_written_as_completed(self):
+        """Test days fetched at once are written in the order they complete"""
+        self.mock_config["max_parallel_windows"] = 3
+
+        days, state = self.sync(slow_days=[self.days[0]])
+
+        self.assertEqual(days, [self.days[1], self.days[2], self.days[0]])
+        partition = self.partition(state)
+        self.assertEqual(partition["replication_key_value"], self.days[2])
+        self.assertEqual(partition["completed_dates"], [])
+
+    @responses.activate
+    def test_parallel_days_bookmark_completed_prefix(self):
+        """Test the bookmark stays before a failed day fetched in parallel"""
+        self.mock_config["max_parallel_windows"] = 3
+
+        days, state = self.sync(failing_days=[self.days[0]])
+
+        self.assertEqual(sorted(days), self.days[1:])
+        partition = self.partition(state)
+        self.assertLess(partition["replication_key_value"], self.days[0])
+        self.assertEqual(partition["completed_dates"], self.days[1:])
+
+    def queried_days(self):
+        return [
+            re.search(r"'([\d-]+)'", json.loads(call.request.body)["query"]).group(1)
+            for call in responses.calls
+            if call.request.url == SEARCH_URL
+        ]
+
+    @responses.activate
+    def test_permission_error_fails_customer(self):
+        """Test an error not specific to a day stops the customer's sync"""
+        days, state = self.sync(denied=True)
+
+        self.assertEqual(days, [])
+        self.assertEqual(len(self.queried_days()), 1)
+        self.assertNotIn("replication_key_value", self.partition(state))
+
+    @responses.activate
+    def test_days_older_than_click_view_allows_not_queried(self):
+        """Test days before the last 90 are neither queried nor waited for"""
+        oldest = date.today() - timedelta(days=90)
+        self.mock_config["start_date"] = (oldest - timedelta(days=30)).isoformat()
+        self.mock_config["max_parallel_windows"] = 4
+
+        days, state = self.sync()
+
+        self.assertEqual(min(self.queried_days()), oldest.isoformat())
+        self.assertEqual(len(days), 90)
+        partition = self.partition(state)
+        self.assertEqual(partition["replication_key_value"], self.days[2])
+        self.assertEqual(partition["completed_dates"], [])
+
+    @responses.activate
+    def test_bookmark_moved_past_expired_days(self):
+        """Test a bookmark held back by a day now too old to query moves on"""
+        expired = [
+            (date.today() - timedelta(days=days)).isoformat() for days in (150, 95)
+        ]
+        state = {
+            "bookmarks": {
+                "stream_click_view_report": {
+                    "partitions": [
+                        {
+                            "context": {"customer_id": "11"},
+                            "replication_key": "date",
+                            "replication_key_value": "2024-01-01",
+                            "completed_dates": expired + [self.days[1]],
+                        }
+                    ]
+                }
+            }
+        }
+
+        days, state = self.sync(state)
+
+        self.assertEqual(days, [self.days[0], self.days[2]])
+        partition = self.partition(state)
+        self.assertEqual(partition["replication_key_value"], self.days[2])
+        self.assertEqual(partition["completed_dates"], [])
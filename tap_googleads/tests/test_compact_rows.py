@@ -0,0 +1,120 @@
+"""Tests holding click view rows packed into tuples until they are written."""
+
+import json
+import re
+import unittest
+from datetime import date, timedelta
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.transform import RowPacker
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+
+class TestRowPacker(unittest.TestCase):
+    """Test class for packing rows into tuples"""
+
+    def test_rows_round_trip(self):
+        """Test rows of any shape unpack to what was packed"""
+        rows = [
+            {"clickView": {"gclid": "a", "keyword": None}, "metrics": {"clicks": "1"}},
+            {"clickView": {"gclid": "b", "keywordInfo": {"matchType": "EXACT"}}},
+            {"segments": {"device": "MOBILE"}, "clickView": {"keywordInfo": {}}},
+            {"clickView": None, "labels": ["x", "y"], "metrics": {}},
+            {},
+        ]
+        packer = RowPacker()
+
+        packed = [packer.pack(row) for row in rows]
+
+        self.assertTrue(all(isinstance(values, tuple) for values in packed))
+        self.assertEqual([packer.unpack(values) for values in packed], rows)
+        self.assertEqual(list(packer.unpack_all(packed)), rows)
+        self.assertEqual(packed, [])
+
+    def test_repeated_strings_interned(self):
+        """Test repeated strings are held once, except those of unique fields"""
+        packer = RowPacker(["clickView.gclid"])
+        first, second = (
+            packer.pack(
+                json.loads('{"clickView": {"gclid": "Cj0KCQ"}, "device": "MOBILE"}')
+            )
+            for _ in range(2)
+        )
+
+        self.assertIs(first[1], second[1])
+        self.assertIsNot(first[0], second[0])
+
+
+class TestCompactClickViewRows(unittest.TestCase):
+    """Test class for syncing the click view report with compact_click_view_rows"""
+
+    def setUp(self):
+        self.days = [
+            (date.today() - timedelta(days=days)).isoformat() for days in (3, 2, 1)
+        ]
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": self.days[0],
+            "enable_click_view_report_stream": True,
+            "max_parallel_windows": 2,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def search_callback(self, request):
+        query = json.loads(request.body)["query"]
+        day = re.search(r"segments.date = '([\d-]+)'", query).group(1)
+        rows = [
+            {
+                "clickView": {"gclid": f"{day}-{click}"},
+                "segments": {"date": day, "device": "MOBILE", "slot": "SEARCH_TOP"},
+                "metrics": {"clicks": "1"},
+            }
+            for click in range(3)
+        ]
+        rows[1]["clickView"].update(keyword="k", keywordInfo={"matchType": "EXACT"})
+        return 200, {}, json.dumps({"results": rows})
+
+    def sync(self):
+        del test_utils.SINGER_MESSAGES[:]
+        responses.reset()
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_click_view_report"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, self.search_callback)
+        tap.sync_all()
+        return [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+
+    @responses.activate
+    def test_same_records_as_unpacked(self):
+        """Test records synced from packed rows are those synced without packing"""
+        records = self.sync()
+        self.mock_config["compact_click_view_rows"] = True
+
+        compact_records = self.sync()
+
+        def gclid(record):
+            return record["clickView"]["gclid"]
+
+        # Days are written in the order they complete
+        self.assertEqual(len(records), 9)
+        self.assertEqual(sorted(compact_records, key=gclid), sorted(records, key=gclid))
+        self.assertEqual(
+            [record["clickView"]["keyword"] for record in compact_records[:3]],
+            ["null", "k", "null"],
+        )
@@ -0,0 +1,111 @@
+"""Tests caching the customer hierarchy between runs."""
+
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+ACCESSIBLE_CUSTOMERS_URL = (
+    "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers"
+)
+HIERARCHY_URL = (
+    "https://googleads.googleapis.com/v18/customers/1234512345/googleAds:search"
+)
+
+
+class TestCustomerHierarchyCache(unittest.TestCase):
+    """Test class for caching the customer hierarchy in cache_dir"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "cache_dir": self.cache_dir.name,
+            "customer_hierarchy_cache_ttl_hours": 24,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def sync(self):
+        """Sync the customer hierarchy stream, returning its customer ids"""
+        del test_utils.SINGER_MESSAGES[:]
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_customer_hierarchy"]
+        )
+        tap.sync_all()
+        return [
+            msg.record["customerClient"]["id"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+            and msg.stream == "stream_customer_hierarchy"
+        ]
+
+    def count_calls(self, url):
+        return sum(call.request.url.startswith(url) for call in responses.calls)
+
+    @responses.activate
+    def test_second_run_served_from_cache(self):
+        """Test a fresh cache answers the next run without hierarchy queries"""
+        test_utils.add_customer_responses(["11", "12"])
+
+        self.assertEqual(self.sync(), ["11", "12"])
+        self.assertEqual(self.sync(), ["11", "12"])
+
+        self.assertEqual(self.count_calls(ACCESSIBLE_CUSTOMERS_URL), 1)
+        self.assertEqual(self.count_calls(HIERARCHY_URL), 1)
+
+    @responses.activate
+    def test_not_cached_without_ttl(self):
+        """Test cache_dir alone does not cache the hierarchy"""
+        del self.mock_config["customer_hierarchy_cache_ttl_hours"]
+        test_utils.add_customer_responses(["11", "12"])
+
+        self.sync()
+        self.sync()
+
+        self.assertEqual(self.count_calls(ACCESSIBLE_CUSTOMERS_URL), 2)
+        self.assertEqual(self.count_calls(HIERARCHY_URL), 2)
+
+    @responses.activate
+    def test_refresh_ignores_cache(self):
+        """Test refresh_customer_hierarchy_cache queries the hierarchy again"""
+        test_utils.add_customer_responses(["11", "12"])
+
+        self.sync()
+        self.mock_config["refresh_customer_hierarchy_cache"] = True
+        self.sync()
+
+        self.assertEqual(self.count_calls(HIERARCHY_URL), 2)
+
+    @responses.activate
+    def test_stale_cache_used_when_query_fails(self):
+        """Test an expired cache entry is used when the hierarchy query fails"""
+        test_utils.add_customer_responses(["11", "12"])
+        self.assertEqual(self.sync(), ["11", "12"])
+
+        responses.replace(
+            responses.POST,
+            HIERARCHY_URL,
+            json={"error": {"status": "PERMISSION_DENIED"}},
+            status=403,
+        )
+
+        # A day later the cached hierarchy has expired
+        with mock.patch("tap_googleads.cache.time") as cache_time:
+            cache_time.time.return_value = time.time() + 25 * 3600
+            self.assertEqual(self.sync(), ["11", "12"])
+        self.assertEqual(self.count_calls(HIERARCHY_URL), 2)
@@ -0,0 +1,151 @@
+"""Tests walking multi-level manager account hierarchies."""
+
+import json
+import re
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+SEARCH_URL = re.compile(
+    r"https://googleads\.googleapis\.com/v18/customers/(\d+)/googleAds:search.*"
+)
+
+# Manager id -> (client id, is manager) of its direct clients. Customer 21 is
+# reachable through both sub-managers 20 and 30, and 30 through the root and 20.
+HIERARCHY = {
+    "1234512345": [("11", False), ("20", True), ("30", True)],
+    "20": [("21", False), ("22", False), ("30", True)],
+    "30": [("21", False), ("31", False)],
+}
+
+
+def hierarchy_callback(request):
+    """Answer a customer_client query with the manager and its direct clients"""
+    manager_id = SEARCH_URL.match(request.url).group(1)
+    clients = [(manager_id, True, "0")] + [
+        (client_id, manager, "1") for client_id, manager in HIERARCHY[manager_id]
+    ]
+    body = {
+        "results": [
+            {
+                "customerClient": {
+                    "resourceName": f"customers/{manager_id}/customerClients/{id_}",
+                    "clientCustomer": f"customers/{id_}",
+                    "level": level,
+                    "status": "ENABLED",
+                    "manager": manager,
+                    "id": id_,
+                }
+            }
+            for id_, manager, level in clients
+        ]
+    }
+    return 200, {}, json.dumps(body)
+
+
+class TestCustomerHierarchyTraversal(unittest.TestCase):
+    """Test class for the breadth first walk of the customer hierarchy"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "max_parallel_hierarchy_queries": 2,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    @responses.activate
+    def test_nested_customers_visited_once(self):
+        """Test clients of sub-managers are found, each once, breadth first"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_customer_hierarchy"]
+        )
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+            json={"resourceNames": ["customers/1234512345", "customers/20"]},
+            status=200,
+        )
+        responses.add_callback(responses.POST, SEARCH_URL, hierarchy_callback)
+
+        tap.sync_all()
+
+        clients = [
+            msg.record["customerClient"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+            and msg.stream == "stream_customer_hierarchy"
+        ]
+        self.assertEqual(
+            [(client["id"], client["level"]) for client in clients],
+            [("11", "1"), ("21", "2"), ("22", "2"), ("31", "2")],
+        )
+        queried = [
+            SEARCH_URL.match(call.request.url).group(1)
+            for call in responses.calls
+            if SEARCH_URL.match(call.request.url)
+        ]
+        self.assertEqual(sorted(queried), ["1234512345", "20", "30"])
+
+    @responses.activate
+    def test_accessible_client_account_synced(self):
+        """Test an accessible customer that is not a manager is synced itself"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_customer_hierarchy"]
+        )
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+            json={"resourceNames": ["customers/55"]},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            SEARCH_URL,
+            json={
+                "results": [
+                    {
+                        "customerClient": {
+                            "id": "55",
+                            "level": "0",
+                            "manager": False,
+                            "status": "ENABLED",
+                        }
+                    }
+                ]
+            },
+            status=200,
+        )
+
+        tap.sync_all()
+
+        clients = [
+            msg.record["customerClient"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+            and msg.stream == "stream_customer_hierarchy"
+        ]
+        self.assertEqual(
+            [(client["id"], client["level"]) for client in clients], [("55", "0")]
+        )
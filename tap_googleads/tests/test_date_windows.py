@@ -0,0 +1,219 @@
+"""Tests date windows and incremental sync of performance report streams."""
+
+import json
+import re
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+from singer_sdk.exceptions import ConfigValidationError
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.tap import TapGoogleAds
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+
+def window_dates(request):
+    """Return the start and end date of a windowed query"""
+    return tuple(
+        re.findall(r"'(\d{4}-\d{2}-\d{2})'", json.loads(request.body)["query"])
+    )
+
+
+def search_callback(fail_from="9999-12-31"):
+    """Return one row per day of the queried window, failing from fail_from"""
+
+    def callback(request):
+        start, end = window_dates(request)
+        if start >= fail_from:
+            return 400, {}, json.dumps({"error": {"status": "INVALID_ARGUMENT"}})
+        body = {
+            "results": [
+                {
+                    "campaign": {"name": "Campaign", "status": "ENABLED"},
+                    "segments": {"date": f"2024-01-{day:02d}", "device": "MOBILE"},
+                }
+                for day in range(int(start[-2:]), int(end[-2:]) + 1)
+            ]
+        }
+        return 200, {}, json.dumps(body)
+
+    return callback
+
+
+class TestTapGoogleadsDateWindows(unittest.TestCase):
+    """Test class for date_window_days and max_parallel_windows"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-14",
+            "date_window_days": 4,
+            "max_parallel_windows": 2,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def window_queries(self):
+        return [
+            tuple(
+                re.findall(
+                    r"'(\d{4}-\d{2}-\d{2})'", json.loads(call.request.body)["query"]
+                )
+            )
+            for call in responses.calls
+            if call.request.url == SEARCH_URL
+        ]
+
+    def record_dates(self):
+        return [
+            msg.record["segments"]["date"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+
+    def test_window_settings_below_one_rejected(self):
+        """Test windows of no days, or no windows at a time, fail validation"""
+        for setting, value in [
+            ("date_window_days", 0),
+            ("date_window_days", -1),
+            ("max_parallel_windows", 0),
+        ]:
+            with self.subTest(setting=setting, value=value):
+                with self.assertRaises(ConfigValidationError):
+                    TapGoogleAds(config={**self.mock_config, setting: value})
+
+    @responses.activate
+    def test_date_range_split_into_windows(self):
+        """Test each window is queried once and records keep date order"""
+
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, search_callback())
+
+        tap.sync_all()
+
+        self.assertEqual(
+            sorted(self.window_queries()),
+            [
+                ("2024-01-01", "2024-01-04"),
+                ("2024-01-05", "2024-01-08"),
+                ("2024-01-09", "2024-01-12"),
+                ("2024-01-13", "2024-01-14"),
+            ],
+        )
+        self.assertEqual(
+            self.record_dates(), [f"2024-01-{day:02d}" for day in range(1, 15)]
+        )
+        state = test_utils.SINGER_MESSAGES[-1].value
+        partition = state["bookmarks"]["stream_campaign_performance"]["partitions"][0]
+        self.assertEqual(partition["replication_key_value"], "2024-01-14")
+
+    @responses.activate
+    def test_failed_sync_resumes_after_last_completed_window(self):
+        """Test the next sync starts after the last window that was written"""
+
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(
+            responses.POST, SEARCH_URL, search_callback(fail_from="2024-01-13")
+        )
+
+        with self.assertRaises(Exception):
+            tap.sync_all()
+
+        states = [
+            msg.value
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.StateMessage)
+        ]
+        partition = states[-1]["bookmarks"]["stream_campaign_performance"][
+            "partitions"
+        ][0]
+        self.assertEqual(partition["replication_key_value"], "2024-01-12")
+
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"], state=states[-1]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, search_callback())
+
+        tap.sync_all()
+
+        self.assertEqual(self.window_queries(), [("2024-01-13", "2024-01-14")])
+        self.assertEqual(self.record_dates(), ["2024-01-13", "2024-01-14"])
+
+    @responses.activate
+    def test_incremental_sync_refetches_lookback_days(self):
+        """Test a bookmarked partition restarts attribution_lookback_days earlier"""
+
+        self.mock_config["attribution_lookback_days"] = 3
+        state = {
+            "bookmarks": {
+                "stream_campaign_performance": {
+                    "partitions": [
+                        {
+                            "context": {"customer_id": "11"},
+                            "replication_key": "date",
+                            "replication_key_value": "2024-01-10",
+                        }
+                    ]
+                }
+            }
+        }
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"], state=state
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, search_callback())
+
+        tap.sync_all()
+
+        self.assertEqual(
+            self.window_queries(),
+            [("2024-01-08", "2024-01-11"), ("2024-01-12", "2024-01-14")],
+        )
+        self.assertEqual(self.record_dates()[0], "2024-01-08")
+
+    @responses.activate
+    def test_lookback_days_never_before_start_date(self):
+        """Test the lookback does not reach back before start_date"""
+
+        self.mock_config["attribution_lookback_days"] = 30
+        state = {
+            "bookmarks": {
+                "stream_campaign_performance": {
+                    "partitions": [
+                        {
+                            "context": {"customer_id": "11"},
+                            "replication_key": "date",
+                            "replication_key_value": "2024-01-02",
+                        }
+                    ]
+                }
+            }
+        }
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"], state=state
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, search_callback())
+
+        tap.sync_all()
+
+        self.assertEqual(self.window_queries()[0], ("2024-01-01", "2024-01-04"))
+        self.assertEqual(self.record_dates()[0], "2024-01-01")
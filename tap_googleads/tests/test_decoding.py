@@ -0,0 +1,57 @@
+"""Tests decoding Google Ads API response bodies."""
+
+import json
+import unittest
+
+import requests
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.decoding import decode_response, iter_json_array
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Test class for the incremental JSON array decoder"""
+
+    def test_elements_decoded_across_any_chunk_boundary(self):
+        """Test every chunk size yields the same elements"""
+        body = json.dumps(test_utils.search_stream_return_data).encode()
+
+        for size in (1, 2, 5, 64, len(body)):
+            chunks = [body[i : i + size] for i in range(0, len(body), size)]
+            self.assertEqual(
+                list(iter_json_array(chunks)), test_utils.search_stream_return_data
+            )
+
+    def test_strings_with_brackets_split_across_chunks(self):
+        """Test brackets, escapes and multibyte characters inside strings"""
+        elements = [
+            {"results": [{"adGroup": {"name": 'Café "[1]", {x}\\'}}]},
+            {"results": [{"adGroup": {"name": "]}]"}}]},
+        ]
+        body = json.dumps(elements, ensure_ascii=False).encode()
+
+        for size in (1, 3, 7):
+            chunks = [body[i : i + size] for i in range(0, len(body), size)]
+            self.assertEqual(list(iter_json_array(chunks)), elements)
+
+    def test_truncated_body_raises(self):
+        """Test a body cut off mid-element is an error"""
+        body = json.dumps(test_utils.search_stream_return_data).encode()
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array([body[:-10]]))
+
+
+class TestDecodeResponse(unittest.TestCase):
+    """Test class for the shared response body decode"""
+
+    def test_body_decoded_once(self):
+        """Test repeated calls return the cached body"""
+        response = requests.Response()
+        response._content = b'{"results": [], "nextPageToken": "abc"}'
+
+        first = decode_response(response)
+        response._content = b"not json"
+
+        self.assertIs(decode_response(response), first)
+        self.assertEqual(first["nextPageToken"], "abc")
@@ -0,0 +1,80 @@
+"""Tests pruning report queries to the properties selected in the catalog."""
+
+import unittest
+
+from singer_sdk._singerlib import Catalog, Metadata
+from singer_sdk.helpers._catalog import (
+    deselect_all_streams,
+    set_catalog_stream_selected,
+)
+
+from tap_googleads.tap import TapGoogleAds
+
+
+class TestFieldPruning(unittest.TestCase):
+    """Test class for building gaql from the selected catalog properties"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+        }
+
+    def get_stream(self, stream_name, deselected=()):
+        """Return stream_name of a tap whose catalog deselects the breadcrumbs"""
+        tap = TapGoogleAds(config=self.mock_config)
+        catalog = Catalog.from_dict(tap.catalog_dict)
+        deselect_all_streams(catalog=catalog)
+        set_catalog_stream_selected(
+            catalog=catalog, stream_name=stream_name, selected=True
+        )
+        for breadcrumb in deselected:
+            catalog.get_stream(stream_name).metadata[breadcrumb] = Metadata(
+                selected=False
+            )
+        tap = TapGoogleAds(config=self.mock_config, catalog=catalog.to_dict())
+        return tap.streams[stream_name]
+
+    def test_all_selected(self):
+        """Test the query is unchanged when every property is selected"""
+        stream = self.get_stream("stream_campaign_performance")
+
+        self.assertEqual(stream.selected_gaql, stream.gaql)
+
+    def test_deselected_properties_pruned(self):
+        """Test deselected objects and nested properties are not queried"""
+        stream = self.get_stream(
+            "stream_campaign_performance_by_age_range_and_device",
+            [
+                ("properties", "metrics"),
+                ("properties", "adGroupCriterion", "properties", "bidModifier"),
+                ("properties", "campaign", "properties", "advertisingChannelType"),
+            ],
+        )
+
+        self.assertEqual(
+            stream.selected_gaql.strip(),
+            "SELECT ad_group_criterion.age_range.type, campaign.name, "
+            "campaign.status, ad_group.name, segments.date, segments.device, "
+            "ad_group_criterion.system_serving_status FROM age_range_view "
+            "WHERE segments.date >= {start_date} and segments.date <= {end_date}",
+        )
+
+    def test_keys_kept(self):
+        """Test primary key and date fields are queried even when deselected"""
+        self.mock_config["enable_click_view_report_stream"] = True
+        stream = self.get_stream(
+            "stream_click_view_report",
+            [("properties", "clickView"), ("properties", "segments")],
+        )
+
+        query = stream.selected_gaql
+        for field in ("click_view.gclid", "click_view.keyword", "segments.date"):
+            self.assertIn(field, query)
+        self.assertNotIn("click_view.ad_group_ad", query)
+        self.assertNotIn("segments.click_type", query)
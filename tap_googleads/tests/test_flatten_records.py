@@ -0,0 +1,145 @@
+"""Tests flattening records into snake_case keys."""
+
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.tap import TapGoogleAds
+from tap_googleads.transform import RecordFlattener
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "customer_id": {"type": "string"},
+        "adGroup": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string"},
+                "labels": {"type": "array", "items": {"type": "string"}},
+            },
+        },
+        "keywordInfo": {
+            "type": ["object", "null"],
+            "properties": {"matchType": {"type": ["string", "null"]}},
+        },
+    },
+}
+
+
+class TestRecordFlattener(unittest.TestCase):
+    """Test class for the precompiled record flattener"""
+
+    def test_schema_flattened(self):
+        """Test nested properties become nullable snake_case properties"""
+        self.assertEqual(
+            RecordFlattener(SCHEMA).schema["properties"],
+            {
+                "customer_id": {"type": "string"},
+                "ad_group__id": {"type": ["string", "null"]},
+                "ad_group__labels": {
+                    "type": ["array", "null"],
+                    "items": {"type": "string"},
+                },
+                "keyword_info__match_type": {"type": ["string", "null"]},
+            },
+        )
+
+    def test_record_flattened(self):
+        """Test a record is flattened, including keys missing from the schema"""
+        flattener = RecordFlattener(SCHEMA)
+        record = {
+            "customer_id": "11",
+            "adGroup": {"id": "1", "labels": ["a"], "resourceName": "r"},
+            "keywordInfo": None,
+        }
+
+        for _ in range(2):
+            self.assertEqual(
+                flattener(record),
+                {
+                    "customer_id": "11",
+                    "ad_group__id": "1",
+                    "ad_group__labels": ["a"],
+                    "ad_group__resource_name": "r",
+                },
+            )
+
+
+class TestFlattenRecords(unittest.TestCase):
+    """Test class for the flatten_records setting"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "flatten_records": True,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def test_primary_keys_flattened(self):
+        """Test camelCase primary keys are declared in snake_case"""
+        self.mock_config["enable_click_view_report_stream"] = True
+        stream = TapGoogleAds(config=self.mock_config).streams[
+            "stream_click_view_report"
+        ]
+
+        self.assertIn("click_view__keyword_info__match_type", stream.primary_keys)
+        self.assertIn(
+            "click_view__keyword_info__match_type", stream.schema["properties"]
+        )
+
+    @responses.activate
+    def test_sync_flattened_records(self):
+        """Test a report is synced as flattened records"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add(
+            responses.POST,
+            SEARCH_URL,
+            json={
+                "results": [
+                    {
+                        "campaign": {"name": "Campaign", "status": "ENABLED"},
+                        "segments": {"date": "2024-01-01", "device": "MOBILE"},
+                        "metrics": {"clicks": "3"},
+                    }
+                ]
+            },
+        )
+
+        tap.sync_all()
+
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+            and msg.stream == "stream_campaign_performance"
+        ]
+        self.assertEqual(
+            records,
+            [
+                {
+                    "customer_id": "11",
+                    "date": "2024-01-01",
+                    "campaign__name": "Campaign",
+                    "campaign__status": "ENABLED",
+                    "segments__device": "MOBILE",
+                    "segments__date": "2024-01-01",
+                    "metrics__clicks": "3",
+                }
+            ],
+        )
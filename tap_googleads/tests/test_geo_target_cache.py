@@ -0,0 +1,137 @@
+"""Tests caching the geo target constant stream between runs."""
+
+import json
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.cache import FileCache
+
+SEARCH_URL = re.compile(
+    r"https://googleads\.googleapis\.com/v18/customers/1234/googleAds:search.*"
+)
+
+geo_target_constant_return_data = {
+    "results": [
+        {
+            "geoTargetConstant": {
+                "resourceName": f"geoTargetConstants/{geo_id}",
+                "id": str(geo_id),
+                "name": name,
+                "status": "ENABLED",
+            }
+        }
+        for geo_id, name in ((2826, "United Kingdom"), (2840, "United States"))
+    ]
+}
+
+
+class TestGeoTargetConstantCache(unittest.TestCase):
+    """Test class for cache_dir and skip_unchanged_geo_target_constants"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "cache_dir": self.cache_dir.name,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def sync(self, state=None):
+        """Sync the geo target constant stream, returning its record ids"""
+        del test_utils.SINGER_MESSAGES[:]
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_geo_target_constant"], state
+        )
+        tap.sync_all()
+        return [
+            msg.record["geoTargetConstant"]["id"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+
+    def last_state(self):
+        states = [
+            msg
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.StateMessage)
+        ]
+        return states[-1].value
+
+    @responses.activate
+    def test_second_run_served_from_cache(self):
+        """Test a fresh cache answers the next run without an API call"""
+        test_utils.add_customer_responses([])
+        responses.add(responses.POST, SEARCH_URL, json=geo_target_constant_return_data)
+
+        self.assertEqual(self.sync(), ["2826", "2840"])
+        self.assertEqual(self.sync(), ["2826", "2840"])
+
+        searches = [
+            call for call in responses.calls if "googleAds:search" in call.request.url
+        ]
+        self.assertEqual(len(searches), 1)
+
+    @responses.activate
+    def test_unchanged_rows_skipped(self):
+        """Test no records are emitted when the state has the same content hash"""
+        self.mock_config["skip_unchanged_geo_target_constants"] = True
+        test_utils.add_customer_responses([])
+        responses.add(responses.POST, SEARCH_URL, json=geo_target_constant_return_data)
+
+        self.assertEqual(self.sync(), ["2826", "2840"])
+        state = self.last_state()
+        self.assertIn("content_hash", state["bookmarks"]["stream_geo_target_constant"])
+
+        self.assertEqual(self.sync(state), [])
+
+
+class TestFileCache(unittest.TestCase):
+    """Test class for the on-disk cache"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = FileCache(self.cache_dir.name, ttl=60)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_entry_for_other_key_ignored(self):
+        """Test rows cached for another query are not returned"""
+        self.cache.save("rows", "SELECT a", [{"a": 1}])
+
+        self.assertEqual(self.cache.load("rows", "SELECT a").rows, [{"a": 1}])
+        self.assertIsNone(self.cache.load("rows", "SELECT b"))
+
+    def test_edited_entry_ignored(self):
+        """Test a file whose rows no longer match its hash is discarded"""
+        self.cache.save("rows", "SELECT a", [{"a": 1}])
+        path = Path(self.cache_dir.name) / "rows.json"
+        data = json.loads(path.read_text())
+        data["rows"] = [{"a": 2}]
+        path.write_text(json.dumps(data))
+
+        self.assertIsNone(self.cache.load("rows", "SELECT a"))
+
+    def test_stale_entry_ignored(self):
+        """Test entries older than the TTL are not returned"""
+        FileCache(self.cache_dir.name, ttl=0).save("rows", "SELECT a", [{"a": 1}])
+
+        self.assertIsNone(
+            FileCache(self.cache_dir.name, ttl=0).load("rows", "SELECT a")
+        )
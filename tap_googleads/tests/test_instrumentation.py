@@ -0,0 +1,101 @@
+"""Tests performance metrics per stream and customer."""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import responses
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.instrumentation import Histogram
+from tap_googleads.tests.test_throttle import quota_error
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+
+class TestHistogram(unittest.TestCase):
+    """Test class for the request duration histogram"""
+
+    def test_cumulative_buckets(self):
+        """Test observations are counted in cumulative buckets"""
+        histogram = Histogram(buckets=(1.0, 5.0))
+        for value in (0.5, 1.0, 3.0, 10.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [("1.0", 2), ("5.0", 3), ("+Inf", 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.sum, 14.5)
+
+
+class TestSyncMetrics(unittest.TestCase):
+    """Test class for metrics reported by a sync"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.textfile = Path(self.directory) / "tap_googleads.prom"
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "prometheus_textfile": str(self.textfile),
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def metric_points(self, logs):
+        points = [
+            json.loads(line.split("METRIC: ", 1)[1])
+            for line in logs.output
+            if "METRIC: " in line
+        ]
+        return {
+            point["metric"]: point["value"]
+            for point in points
+            if point["tags"].get("stream") == "stream_campaign_performance"
+            and point["tags"].get("context", {}).get("customer_id") == "11"
+        }
+
+    @responses.activate
+    def test_metrics_per_stream_and_customer(self):
+        """Test pages, bytes, retries and durations are reported per customer"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add(responses.POST, SEARCH_URL, json=quota_error("0s"), status=429)
+        body = {
+            "results": [
+                {
+                    "campaign": {"name": "Campaign"},
+                    "segments": {"date": "2024-01-01"},
+                }
+            ]
+        }
+        responses.add(responses.POST, SEARCH_URL, json=body)
+
+        with self.assertLogs("singer_sdk.metrics", level="INFO") as logs:
+            tap.sync_all()
+
+        points = self.metric_points(logs)
+        self.assertEqual(points["page_count"], 1)
+        self.assertEqual(points["retry_count"], 1)
+        self.assertEqual(points["response_bytes"], len(json.dumps(body)))
+        self.assertEqual(points["http_request_duration_histogram"]["count"], 2)
+        self.assertIn("records_per_second", points)
+
+        text = self.textfile.read_text()
+        labels = 'stream="stream_campaign_performance",customer_id="11"'
+        self.assertIn(f"tap_googleads_pages_total{{{labels}}} 1", text)
+        self.assertIn(f"tap_googleads_records_total{{{labels}}} 1", text)
+        self.assertIn(
+            f"tap_googleads_request_duration_seconds_count{{{labels}}} 2", text
+        )
@@ -0,0 +1,203 @@
+"""Tests bounding the memory held by pages fetched ahead of being written."""
+
+import json
+import re
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.parallel import MemoryBudget, OrderedPrefetcher
+
+SEARCH_URL = re.compile(
+    r"https://googleads\.googleapis\.com/v18/customers/(\d+)/googleAds:search"
+)
+CUSTOMER_IDS = ["11", "12", "13", "14"]
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """Test class for holding memory from prefetching workers"""
+
+    def test_workers_wait_for_records_to_be_written(self):
+        """Test a worker whose records are not read next waits for the budget"""
+        budget = MemoryBudget(100)
+
+        def pages(name):
+            for page in range(3):
+                with budget.hold(60):
+                    yield name, page
+
+        with OrderedPrefetcher(2, buffer_size=1) as prefetcher:
+            first = prefetcher.submit(pages, "first")
+            second = prefetcher.submit(pages, "second")
+            time.sleep(0.3)
+            # One worker holds a page in the budget, the other waits for it
+            self.assertEqual(budget.used, 60)
+
+            items = list(first) + list(second)
+
+        self.assertEqual(
+            items, [(name, page) for name in ("first", "second") for page in range(3)]
+        )
+        self.assertEqual(budget.used, 0)
+
+    def test_writing_thread_never_waits(self):
+        """Test the thread writing records holds memory beyond the ceiling"""
+        budget = MemoryBudget(100)
+        holding = threading.Event()
+
+        def hold():
+            with budget.hold(80):
+                holding.set()
+                time.sleep(0.2)
+
+        with OrderedPrefetcher(1) as prefetcher:
+            pending = prefetcher.submit(lambda: [hold()])
+            holding.wait(5)
+            with budget.hold(80):
+                self.assertEqual(budget.used, 160)
+            list(pending)
+
+        self.assertEqual(budget.peak, 160)
+
+
+class TestMemoryBudgetSync(unittest.TestCase):
+    """Test class for syncing with max_buffered_memory_mb"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "max_parallel_customers": 4,
+            "max_buffered_memory_mb": 2,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def search_callback(self, request):
+        customer_id = SEARCH_URL.match(request.url).group(1)
+        page = int(json.loads(request.body).get("pageToken") or 0)
+        # Pages of about 300 kB, held as 1.5 MB each, with more rows than a worker
+        # hands on before the page is written
+        body = {
+            "results": [
+                {
+                    "campaign": {"id": "1", "name": "x" * 100},
+                    "adGroup": {"id": f"{customer_id}-{page}-{row}"},
+                    "segments": {"date": "2024-01-01"},
+                    "metrics": {"clicks": "1"},
+                }
+                for row in range(1500)
+            ]
+        }
+        if page < 1:
+            body["nextPageToken"] = str(page + 1)
+        return 200, {}, json.dumps(body)
+
+    @responses.activate
+    def test_sync_within_memory_ceiling(self):
+        """Test every customer is synced in order, one page held ahead at a time"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+        test_utils.add_customer_responses(CUSTOMER_IDS)
+        responses.add_callback(responses.POST, SEARCH_URL, self.search_callback)
+
+        tap.sync_all()
+
+        records = [
+            msg.record["adGroup"]["id"]
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            records,
+            [
+                f"{customer_id}-{page}-{row}"
+                for customer_id in CUSTOMER_IDS
+                for page in range(2)
+                for row in range(1500)
+            ],
+        )
+        budget = tap.memory_budget
+        self.assertEqual(budget.used, 0)
+        # The page read next, and at most one more page fetched ahead
+        self.assertLessEqual(budget.peak, 3.5 * 1024 * 1024)
+
+
+class TestMemoryBudgetClickView(unittest.TestCase):
+    """Test class for click view days fetched at once with max_buffered_memory_mb"""
+
+    def setUp(self):
+        self.days = [
+            (date.today() - timedelta(days=days)).isoformat() for days in (3, 2, 1)
+        ]
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": self.days[0],
+            "enable_click_view_report_stream": True,
+            "max_parallel_windows": 3,
+            "max_buffered_memory_mb": 1,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def search_callback(self, request):
+        query = json.loads(request.body)["query"]
+        day = re.search(r"segments.date = '([\d-]+)'", query).group(1)
+        # Days of about 300 kB, held as 1.5 MB each
+        rows = [
+            {
+                "clickView": {"gclid": f"{day}-{click}", "keyword": "x" * 100},
+                "segments": {"date": day},
+            }
+            for click in range(1500)
+        ]
+        return 200, {}, json.dumps({"results": rows})
+
+    @responses.activate
+    def test_days_held_until_written(self):
+        """Test a fetched day keeps its memory until written, and others wait"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_click_view_report"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(
+            responses.POST,
+            "https://googleads.googleapis.com/v18/customers/11/googleAds:search",
+            self.search_callback,
+        )
+        held_while_written = []
+
+        def write_message(message):
+            if isinstance(message, singer.RecordMessage):
+                held_while_written.append(tap.memory_budget.used)
+            test_utils.accumulate_singer_messages(message)
+
+        tap.write_message = write_message
+
+        tap.sync_all()
+
+        self.assertEqual(len(held_while_written), 3 * 1500)
+        self.assertGreater(min(held_while_written), 1024 * 1024)
+        budget = tap.memory_budget
+        self.assertEqual(budget.used, 0)
+        # The oldest day, and at most one more fetched while nothing was held
+        self.assertLessEqual(budget.peak, 3.5 * 1024 * 1024)
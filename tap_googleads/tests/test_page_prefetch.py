@@ -0,0 +1,101 @@
+"""Tests requesting report pages ahead of the records being written."""
+
+import json
+import time
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+
+class TestPagePrefetch(unittest.TestCase):
+    """Test class for the page_prefetch_depth setting"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "page_prefetch_depth": 2,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+        self.page_tokens = []
+
+    def search_callback(self, request):
+        page = int(json.loads(request.body).get("pageToken") or 0)
+        self.page_tokens.append(page)
+        body = {
+            "results": [
+                {
+                    "campaign": {"id": "1"},
+                    "adGroup": {"id": str(page)},
+                    "segments": {"date": "2024-01-01"},
+                    "metrics": {"clicks": "1"},
+                }
+            ]
+        }
+        if page < 5:
+            body["nextPageToken"] = str(page + 1)
+        return 200, {}, json.dumps(body)
+
+    def add_responses(self):
+        test_utils.add_customer_responses(["11"])
+        responses.add_callback(responses.POST, SEARCH_URL, self.search_callback)
+
+    @responses.activate
+    def test_pages_requested_ahead(self):
+        """Test the next pages are requested while the first page is read"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+        self.add_responses()
+        stream = tap.streams["stream_adgroupsperformance"]
+        context = {
+            "customer_id": "11",
+            "start_date": "'2024-01-01'",
+            "end_date": "'2024-01-01'",
+        }
+
+        records = iter(stream.request_records(context))
+        next(records)
+        deadline = time.monotonic() + 5
+        while len(self.page_tokens) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Two pages held, and the next one requested meanwhile
+        time.sleep(0.1)
+        self.assertEqual(self.page_tokens, [0, 1, 2, 3])
+        self.assertEqual(
+            [record["adGroup"]["id"] for record in records], ["1", "2", "3", "4", "5"]
+        )
+
+    @responses.activate
+    def test_sync_with_prefetch(self):
+        """Test every page is synced in order"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+        self.add_responses()
+
+        tap.sync_all()
+
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            [record["adGroup"]["id"] for record in records],
+            ["0", "1", "2", "3", "4", "5"],
+        )
@@ -0,0 +1,152 @@
+"""Tests syncing report streams for several customers concurrently."""
+
+import json
+import re
+import threading
+import time
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+SEARCH_URL = re.compile(
+    r"https://googleads\.googleapis\.com/v18/customers/(\d+)/googleAds:search.*"
+)
+
+
+class TestTapGoogleadsParallelCustomers(unittest.TestCase):
+    """Test class for syncing customers with max_parallel_customers"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "max_parallel_customers": 3,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def search_callback(self, request):
+        customer_id = SEARCH_URL.match(request.url).group(1)
+        if customer_id == "1234512345":
+            body = test_utils.customer_client_return_data(["11", "12", "13"])
+        else:
+            # Earlier customers answer slowest, so completion order is reversed
+            time.sleep((14 - int(customer_id)) * 0.05)
+            body = {
+                "results": [
+                    {
+                        "campaign": {"id": "1"},
+                        "adGroup": {"id": f"{customer_id}{row}"},
+                        "segments": {"date": "2024-01-01"},
+                        "metrics": {"clicks": "1"},
+                    }
+                    for row in range(2)
+                ]
+            }
+        return 200, {}, json.dumps(body)
+
+    @responses.activate
+    def test_parallel_customers_emit_records_in_customer_order(self):
+        """Test records from concurrently fetched customers keep customer order"""
+
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+            json={"resourceNames": ["customers/1234512345"]},
+            status=200,
+        )
+        responses.add_callback(responses.POST, SEARCH_URL, self.search_callback)
+
+        tap.sync_all()
+
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            [record["customer_id"] for record in records],
+            ["11", "11", "12", "12", "13", "13"],
+        )
+        self.assertEqual(records[0]["adGroup"]["id"], "110")
+
+    @responses.activate
+    def test_customers_of_several_accessible_customers_fetched_concurrently(self):
+        """Test clients of different accessible customers are fetched together"""
+        in_flight = []
+        lock = threading.Lock()
+        overlapping = []
+
+        def search_callback(request):
+            customer_id = SEARCH_URL.match(request.url).group(1)
+            if customer_id.startswith("9"):
+                client_id = customer_id[1:]
+                return (
+                    200,
+                    {},
+                    json.dumps(test_utils.customer_client_return_data([client_id])),
+                )
+            with lock:
+                in_flight.append(customer_id)
+                overlapping.append(len(in_flight))
+            time.sleep(0.2)
+            with lock:
+                in_flight.remove(customer_id)
+            body = {
+                "results": [
+                    {
+                        "campaign": {"id": "1"},
+                        "adGroup": {"id": f"{customer_id}0"},
+                        "segments": {"date": "2024-01-01"},
+                        "metrics": {"clicks": "1"},
+                    }
+                ]
+            }
+            return 200, {}, json.dumps(body)
+
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+            json={"resourceNames": ["customers/911", "customers/912", "customers/913"]},
+            status=200,
+        )
+        responses.add_callback(responses.POST, SEARCH_URL, search_callback)
+
+        tap.sync_all()
+
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            [record["customer_id"] for record in records], ["11", "12", "13"]
+        )
+        self.assertEqual(max(overlapping), 3)
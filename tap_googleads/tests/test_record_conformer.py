@@ -0,0 +1,140 @@
+"""Tests conforming records to their schema with compiled conversions."""
+
+import logging
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.transform import RecordConformer, int64_as_integer
+
+SEARCH_URL = "https://googleads.googleapis.com/v18/customers/11/googleAds:search"
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "customer_id": {"type": "string"},
+        "campaignBudget": {
+            "type": "object",
+            "properties": {"amountMicros": {"type": "string"}},
+        },
+        "metrics": {
+            "type": "object",
+            "properties": {
+                "clicks": {"type": ["string", "null"]},
+                "ctr": {"type": "number"},
+            },
+        },
+        "labels": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"id": {"type": "integer"}}},
+        },
+    },
+}
+
+
+class TestRecordConformer(unittest.TestCase):
+    """Test class for the compiled record conformer"""
+
+    def test_int64_as_integer(self):
+        """Test metrics and micros amounts typed as strings become integers"""
+        properties = int64_as_integer(SCHEMA)["properties"]
+
+        self.assertEqual(properties["customer_id"], {"type": "string"})
+        self.assertEqual(
+            properties["campaignBudget"]["properties"]["amountMicros"],
+            {"type": ["integer"]},
+        )
+        self.assertEqual(
+            properties["metrics"]["properties"],
+            {"clicks": {"type": ["integer", "null"]}, "ctr": {"type": "number"}},
+        )
+
+    def test_record_conformed(self):
+        """Test numeric strings are converted and unmapped properties dropped"""
+        conformer = RecordConformer(
+            int64_as_integer(SCHEMA), "stream", logging.getLogger("test")
+        )
+
+        with self.assertLogs("test", level="WARNING") as logs:
+            record = conformer(
+                {
+                    "customer_id": "11",
+                    "campaignBudget": {"amountMicros": "5000000"},
+                    "metrics": {"clicks": None, "ctr": "0.5", "extra": 1},
+                    "labels": [{"id": "7"}],
+                }
+            )
+
+        self.assertEqual(
+            record,
+            {
+                "customer_id": "11",
+                "campaignBudget": {"amountMicros": 5000000},
+                "metrics": {"clicks": None, "ctr": 0.5},
+                "labels": [{"id": 7}],
+            },
+        )
+        self.assertIn("metrics.extra", logs.output[0])
+
+
+class TestCoerceInt64Metrics(unittest.TestCase):
+    """Test class for the coerce_int64_metrics setting"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "coerce_int64_metrics": True,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    @responses.activate
+    def test_sync_integer_metrics(self):
+        """Test a report is synced with its int64 metrics as integers"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign_performance"]
+        )
+        test_utils.add_customer_responses(["11"])
+        responses.add(
+            responses.POST,
+            SEARCH_URL,
+            json={
+                "results": [
+                    {
+                        "campaign": {"name": "Campaign"},
+                        "segments": {"date": "2024-01-01"},
+                        "metrics": {"clicks": "3", "costMicros": "1250000"},
+                    }
+                ]
+            },
+        )
+
+        tap.sync_all()
+
+        schemas = [
+            msg.schema
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.SchemaMessage)
+            and msg.stream == "stream_campaign_performance"
+        ]
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+            and msg.stream == "stream_campaign_performance"
+        ]
+        self.assertIn(
+            "integer",
+            schemas[0]["properties"]["metrics"]["properties"]["clicks"]["type"],
+        )
+        self.assertEqual(records[0]["metrics"], {"clicks": 3, "costMicros": 1250000})
@@ -0,0 +1,56 @@
+"""Tests reading report streams from googleAds:searchStream."""
+
+import json
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+
+
+class TestTapGoogleadsSearchStream(unittest.TestCase):
+    """Test class for report streams using use_search_stream"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "use_search_stream": True,
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    @responses.activate
+    def test_search_stream_sync(self):
+        """Test every row of every searchStream batch is synced"""
+
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_adgroupsperformance"]
+        )
+
+        test_utils.add_customer_responses(["11"])
+        responses.add(
+            responses.POST,
+            "https://googleads.googleapis.com/v18/customers/11/googleAds:searchStream",
+            json=test_utils.search_stream_return_data,
+            status=200,
+        )
+
+        tap.sync_all()
+
+        records = [
+            msg.record
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(
+            [record["adGroup"]["id"] for record in records],
+            ["0", "1", "2", "3", "4", "5"],
+        )
+        self.assertNotIn("pageToken", json.loads(responses.calls[-1].request.body))
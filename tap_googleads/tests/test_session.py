@@ -0,0 +1,118 @@
+"""Tests the HTTP session shared by the streams of the tap."""
+
+import gzip
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+import responses
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.session import HTTP2Adapter, build_requests_session
+from tap_googleads.tap import TapGoogleAds
+
+
+class _GzipJSONHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = gzip.compress(json.dumps({"results": [{"id": "1"}]}).encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSharedSession(unittest.TestCase):
+    """Test class for the tap's shared requests session"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def test_streams_share_one_session(self):
+        """Test every stream uses the tap's session"""
+        tap = TapGoogleAds(config=self.mock_config)
+
+        sessions = {id(stream.requests_session) for stream in tap.streams.values()}
+
+        self.assertEqual(sessions, {id(tap.requests_session)})
+        self.assertEqual(tap.requests_session.headers["Accept-Encoding"], "gzip")
+
+    def test_pool_sized_for_concurrency(self):
+        """Test the connection pool covers every concurrent request"""
+        session = build_requests_session(
+            {"max_parallel_customers": 4, "max_parallel_windows": 5}
+        )
+
+        self.assertEqual(
+            session.get_adapter("https://googleads.googleapis.com")._pool_maxsize, 20
+        )
+
+    @responses.activate
+    def test_token_and_api_requests_use_shared_session(self):
+        """Test the token refresh goes through the shared session too"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_accessible_customers"]
+        )
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+        # The authenticator is a singleton, forget any token from earlier tests
+        tap.streams["stream_accessible_customers"].authenticator.last_refreshed = None
+
+        tap.sync_all()
+
+        # Plain requests would send its default "gzip, deflate"
+        self.assertEqual(
+            [call.request.headers["Accept-Encoding"] for call in responses.calls],
+            ["gzip", "gzip"],
+        )
+
+
+class TestHTTP2Adapter(unittest.TestCase):
+    """Test class for the httpx backed transport adapter"""
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), _GzipJSONHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_gzip_response_decoded(self):
+        """Test a gzipped body is returned decoded, streamed or not"""
+        session = requests.Session()
+        session.mount("http://", HTTP2Adapter())
+
+        for stream in (False, True):
+            response = session.get(self.url, stream=stream, timeout=(5, 5))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.json(), {"results": [{"id": "1"}]})
@@ -0,0 +1,138 @@
+"""Tests sharding customers across tap processes and merging their states."""
+
+import re
+import unittest
+
+import responses
+import singer_sdk._singerlib as singer
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.sharding import Shard, merge_states
+
+SEARCH_URL = re.compile(
+    r"https://googleads\.googleapis\.com/v18/customers/(\d+)/googleAds:search.*"
+)
+CUSTOMER_IDS = [str(customer_id) for customer_id in range(11, 31)]
+
+
+class TestShard(unittest.TestCase):
+    """Test class for assigning customers to shards"""
+
+    def test_parse(self):
+        """Test shards are parsed from N/M, and default to a single shard"""
+        self.assertEqual(Shard.parse("2/4"), Shard(2, 4))
+        self.assertEqual(Shard.parse(None), Shard(1, 1))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                Shard.parse(value)
+
+    def test_every_customer_in_one_shard(self):
+        """Test each customer belongs to exactly one of the shards"""
+        shards = [Shard(index, 3) for index in (1, 2, 3)]
+        for customer_id in CUSTOMER_IDS:
+            self.assertEqual(
+                sum(shard.includes(customer_id) for shard in shards), 1, customer_id
+            )
+        self.assertTrue(all(Shard().includes(c) for c in CUSTOMER_IDS))
+
+
+def partition(customer_id, bookmark):
+    return {
+        "context": {"customer_id": customer_id},
+        "replication_key": "date",
+        "replication_key_value": bookmark,
+    }
+
+
+class TestMergeStates(unittest.TestCase):
+    """Test class for merging the states of the shards of a run"""
+
+    def test_partitions_taken_from_their_shard(self):
+        """Test each customer's bookmark comes from the shard that synced it"""
+        first = next(c for c in CUSTOMER_IDS if Shard(1, 2).includes(c))
+        second = next(c for c in CUSTOMER_IDS if Shard(2, 2).includes(c))
+        states = [
+            {
+                "bookmarks": {
+                    "stream_campaign_performance": {
+                        "partitions": [
+                            partition(first, "2024-01-31"),
+                            partition(second, "2024-01-01"),
+                        ]
+                    },
+                    "stream_geo_target_constant": {"content_hash": "new"},
+                }
+            },
+            {
+                "bookmarks": {
+                    "stream_campaign_performance": {
+                        "partitions": [
+                            partition(first, "2024-01-01"),
+                            partition(second, "2024-01-31"),
+                            partition("999", "2024-01-15"),
+                        ]
+                    },
+                    "stream_geo_target_constant": {"content_hash": "old"},
+                }
+            },
+        ]
+
+        merged = merge_states(states)
+
+        self.assertEqual(
+            merged["bookmarks"]["stream_campaign_performance"]["partitions"],
+            [
+                partition(first, "2024-01-31"),
+                partition(second, "2024-01-31"),
+                partition("999", "2024-01-15"),
+            ],
+        )
+        self.assertEqual(
+            merged["bookmarks"]["stream_geo_target_constant"], {"content_hash": "new"}
+        )
+
+
+class TestShardedSync(unittest.TestCase):
+    """Test class for syncing a single shard of the customers"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+            "start_date": "2024-01-01",
+            "end_date": "2024-01-01",
+            "shard": "2/3",
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def search_callback(self, request):
+        customer_id = SEARCH_URL.match(request.url).group(1)
+        return 200, {}, '{"results": [{"campaign": {"id": "%s"}}]}' % customer_id
+
+    @responses.activate
+    def test_only_shard_customers_synced(self):
+        """Test only the shard's customers are synced, and no global streams"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_campaign", "stream_geo_target_constant"]
+        )
+        test_utils.add_customer_responses(CUSTOMER_IDS)
+        responses.add_callback(responses.POST, SEARCH_URL, self.search_callback)
+
+        tap.sync_all()
+
+        records = [
+            msg
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual({msg.stream for msg in records}, {"stream_campaign"})
+        self.assertEqual(
+            [msg.record["campaign"]["id"] for msg in records],
+            [c for c in CUSTOMER_IDS if Shard(2, 3).includes(c)],
+        )
@@ -0,0 +1,186 @@
+"""Tests throttling and quota aware retries of Google Ads API requests."""
+
+import json
+import threading
+import time
+import unittest
+
+import requests
+import responses
+import singer_sdk._singerlib as singer
+from singer_sdk.exceptions import RetriableAPIError
+
+import tap_googleads.tests.utils as test_utils
+from tap_googleads.tap import TapGoogleAds
+from tap_googleads.throttle import RateLimiter, retry_delay
+
+ACCESSIBLE_CUSTOMERS_URL = (
+    "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers"
+)
+
+
+def quota_error(delay):
+    """Build a RESOURCE_EXHAUSTED error body asking to retry after delay"""
+    return {
+        "error": {
+            "code": 429,
+            "status": "RESOURCE_EXHAUSTED",
+            "details": [
+                {
+                    "@type": "type.googleapis.com/google.ads.googleads.v18.errors.GoogleAdsFailure",  # noqa: E501
+                    "errors": [
+                        {
+                            "errorCode": {"quotaError": "RESOURCE_EXHAUSTED"},
+                            "details": {
+                                "quotaErrorDetails": {
+                                    "rateScope": "DEVELOPER",
+                                    "retryDelay": delay,
+                                }
+                            },
+                        }
+                    ],
+                }
+            ],
+        }
+    }
+
+
+def make_response(body, status=429):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode()
+    return response
+
+
+class TestRetryDelay(unittest.TestCase):
+    """Test class for reading retryDelay from error bodies"""
+
+    def test_quota_error_details(self):
+        """Test the delay of a googleAds:search quota error"""
+        self.assertEqual(retry_delay(make_response(quota_error("30s"))), 30.0)
+
+    def test_search_stream_error(self):
+        """Test the delay of a googleAds:searchStream quota error"""
+        self.assertEqual(retry_delay(make_response([quota_error("1.5s")])), 1.5)
+
+    def test_no_delay(self):
+        """Test other errors have no delay"""
+        self.assertIsNone(retry_delay(make_response({"error": {"code": 500}})))
+        response = requests.Response()
+        response._content = b"<html>Too many requests</html>"
+        self.assertIsNone(retry_delay(response))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test class for the shared rate limiter"""
+
+    def test_rate_limited(self):
+        """Test requests beyond the burst are spaced at the configured rate"""
+        limiter = RateLimiter(requests_per_second=50)
+
+        start = time.monotonic()
+        for _ in range(60):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+    def test_throttled_pauses_and_recovers(self):
+        """Test a quota error pauses requests and halves the rate until recovery"""
+        limiter = RateLimiter(requests_per_second=16)
+
+        limiter.throttled(0.2)
+        start = time.monotonic()
+        limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertEqual(limiter.rate, 8)
+        for _ in range(10):
+            limiter.succeeded()
+        self.assertEqual(limiter.rate, 16)
+
+    def test_requests_per_customer_capped(self):
+        """Test no more than the cap of requests run at once for a customer"""
+        limiter = RateLimiter(max_requests_per_customer=2)
+        running = {"1": 0, "2": 0}
+        peak = {"1": 0, "2": 0}
+        lock = threading.Lock()
+
+        def send(customer_id):
+            with limiter.request(customer_id):
+                with lock:
+                    running[customer_id] += 1
+                    peak[customer_id] = max(peak[customer_id], running[customer_id])
+                time.sleep(0.02)
+                with lock:
+                    running[customer_id] -= 1
+
+        threads = [
+            threading.Thread(target=send, args=(customer_id,))
+            for customer_id in ("1", "2") * 5
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak, {"1": 2, "2": 2})
+
+
+class TestQuotaAwareRetries(unittest.TestCase):
+    """Test class for retrying RESOURCE_EXHAUSTED errors"""
+
+    def setUp(self):
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+        del test_utils.SINGER_MESSAGES[:]
+
+    def test_backoff_waits_for_retry_delay(self):
+        """Test the backoff waits the retryDelay, or backs off exponentially"""
+        stream = TapGoogleAds(config=self.mock_config).streams[
+            "stream_accessible_customers"
+        ]
+        waits = stream.backoff_wait_generator()
+        waits.send(None)
+
+        quota = RetriableAPIError("quota", make_response(quota_error("7s")))
+        self.assertEqual(waits.send(quota), 7.0)
+        self.assertEqual(waits.send(RetriableAPIError("unavailable")), 4.0)
+
+    @responses.activate
+    def test_quota_error_retried(self):
+        """Test a sync survives a quota error"""
+        tap = test_utils.set_up_tap_for_sync(
+            self.mock_config, ["stream_accessible_customers"]
+        )
+        responses.add(
+            responses.POST,
+            "https://www.googleapis.com/oauth2/v4/token",
+            json={"access_token": 12341234, "expires_in": 3622},
+            status=200,
+        )
+        responses.add(
+            responses.GET, ACCESSIBLE_CUSTOMERS_URL, json=quota_error("0s"), status=429
+        )
+        responses.add(
+            responses.GET,
+            ACCESSIBLE_CUSTOMERS_URL,
+            json=test_utils.accessible_customer_return_data,
+            status=200,
+        )
+
+        tap.sync_all()
+
+        records = [
+            msg
+            for msg in test_utils.SINGER_MESSAGES
+            if isinstance(msg, singer.RecordMessage)
+        ]
+        self.assertEqual(len(records), 1)
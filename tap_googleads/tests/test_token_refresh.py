@@ -0,0 +1,113 @@
+"""Tests refreshing and persisting the OAuth access token."""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+
+import requests
+import responses
+from singer_sdk.helpers._util import utc_now
+
+from tap_googleads.auth import _SessionOAuthAuthenticator
+from tap_googleads.tap import TapGoogleAds
+
+TOKEN_URL = "https://www.googleapis.com/oauth2/v4/token"
+
+
+class Authenticator(_SessionOAuthAuthenticator):
+    """Authenticator without the singleton, so each test gets its own"""
+
+    @property
+    def oauth_request_body(self):
+        return {}
+
+
+class TestTokenRefresh(unittest.TestCase):
+    """Test class for refreshing the access token"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.mock_config = {
+            "oauth_credentials": {
+                "client_id": "1234",
+                "client_secret": "1234",
+                "refresh_token": "1234",
+            },
+            "login_customer_id": "1234",
+            "developer_token": "1234",
+        }
+        responses.reset()
+
+    def authenticator(self, **config):
+        self.mock_config.update(config)
+        stream = TapGoogleAds(config=self.mock_config).streams[
+            "stream_accessible_customers"
+        ]
+        return Authenticator(stream=stream, auth_endpoint=TOKEN_URL)
+
+    def add_token_response(self, token="token", expires_in=3600):
+        responses.add(
+            responses.POST,
+            TOKEN_URL,
+            json={"access_token": token, "expires_in": expires_in},
+        )
+
+    def authorization(self, authenticator):
+        request = requests.Request("GET", "https://example.com").prepare()
+        return authenticator(request).headers["Authorization"]
+
+    @responses.activate
+    def test_single_refresh_under_concurrency(self):
+        """Test concurrent requests share a single token refresh"""
+        self.add_token_response()
+        authenticator = self.authenticator()
+        headers = []
+
+        threads = [
+            threading.Thread(
+                target=lambda: headers.append(self.authorization(authenticator))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(headers, ["Bearer token"] * 8)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_refreshed_ahead_of_expiry(self):
+        """Test a token about to expire is refreshed"""
+        self.add_token_response("old")
+        self.add_token_response("new")
+        authenticator = self.authenticator()
+
+        self.assertEqual(self.authorization(authenticator), "Bearer old")
+        self.assertEqual(self.authorization(authenticator), "Bearer old")
+        authenticator.last_refreshed = utc_now() - timedelta(seconds=3500)
+
+        self.assertEqual(self.authorization(authenticator), "Bearer new")
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_persisted_token_reused(self):
+        """Test a persisted token is reused by the next run, in a private file"""
+        self.add_token_response("persisted")
+        config = {"cache_dir": self.directory, "persist_access_token": True}
+
+        self.assertEqual(
+            self.authorization(self.authenticator(**config)), "Bearer persisted"
+        )
+        self.assertEqual(
+            self.authorization(self.authenticator(**config)), "Bearer persisted"
+        )
+
+        self.assertEqual(len(responses.calls), 1)
+        path = os.path.join(self.directory, "oauth_access_token.json")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
@@ -1,5 +1,6 @@
 """Utilities used in this module"""
 
+import responses
 from singer_sdk._singerlib import Catalog
 from singer_sdk.helpers._catalog import (
     deselect_all_streams,
@@ -12,6 +13,22 @@ accessible_customer_return_data = {
     "resourceNames": ["customers/1234512345", "customers/5432154321"]
 }
 
+search_stream_return_data = [
+    {
+        "results": [
+            {
+                "campaign": {"id": "1"},
+                "adGroup": {"id": str(row)},
+                "segments": {"date": "2024-01-01"},
+                "metrics": {"clicks": '"quoted" \\ clicks]}'},
+            }
+            for row in range(batch * 3, batch * 3 + 3)
+        ],
+        "fieldMask": "campaign.id,adGroup.id,metrics.clicks",
+    }
+    for batch in range(2)
+]
+
 SINGER_MESSAGES = []
 
 
@@ -20,7 +37,7 @@ def accumulate_singer_messages(message):
     SINGER_MESSAGES.append(message)
 
 
-def set_up_tap_with_custom_catalog(mock_config, stream_list):
+def set_up_tap_with_custom_catalog(mock_config, stream_list, state=None):
     tap = TapGoogleAds(config=mock_config)
     # Run discovery
     tap.run_discovery()
@@ -35,4 +52,52 @@ def set_up_tap_with_custom_catalog(mock_config, stream_list):
             selected=True,
         )
     # Initialise tap with new catalog
-    return TapGoogleAds(config=mock_config, catalog=catalog.to_dict())
+    return TapGoogleAds(config=mock_config, catalog=catalog.to_dict(), state=state)
+
+
+def set_up_tap_for_sync(mock_config, stream_list, state=None):
+    """Set up a tap with a custom catalog, collecting its singer messages"""
+    tap = set_up_tap_with_custom_catalog(mock_config, stream_list, state)
+    tap.write_message = accumulate_singer_messages
+    return tap
+
+
+def customer_client_return_data(customer_ids):
+    """Build a googleAds:search response for the customer hierarchy stream"""
+    return {
+        "results": [
+            {
+                "customerClient": {
+                    "resourceName": f"customers/{customer_id}",
+                    "clientCustomer": f"customers/{customer_id}",
+                    "level": "1",
+                    "status": "ENABLED",
+                    "manager": False,
+                    "id": customer_id,
+                }
+            }
+            for customer_id in customer_ids
+        ]
+    }
+
+
+def add_customer_responses(customer_ids):
+    """Mock the token, accessible customer and hierarchy requests for customer_ids"""
+    responses.add(
+        responses.POST,
+        "https://www.googleapis.com/oauth2/v4/token",
+        json={"access_token": 12341234, "expires_in": 3622},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        "https://googleads.googleapis.com/v18/customers:listAccessibleCustomers",
+        json={"resourceNames": ["customers/1234512345"]},
+        status=200,
+    )
+    responses.add(
+        responses.POST,
+        "https://googleads.googleapis.com/v18/customers/1234512345/googleAds:search",
+        json=customer_client_return_data(customer_ids),
+        status=200,
+    )
@@ -0,0 +1,130 @@
+"""Client side throttling of Google Ads API requests."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+import requests
+
+from tap_googleads.decoding import decode_response
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)s$")
+
+
+def _find_retry_delay(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        if isinstance(value.get("retryDelay"), str):
+            return value["retryDelay"]
+        value = list(value.values())
+    if isinstance(value, list):
+        for item in value:
+            found = _find_retry_delay(item)
+            if found is not None:
+                return found
+    return None
+
+
+def retry_delay(response: requests.Response) -> Optional[float]:
+    """Return how long a quota error asks to wait before retrying, in seconds.
+
+    Google Ads reports exhausted quota as `RESOURCE_EXHAUSTED` with a `retryDelay`
+    duration such as `"30s"`, in its quota error details or in a `RetryInfo`.
+
+    Args:
+        response: An API response.
+
+    Returns:
+        The requested delay, or None if the response does not specify one.
+    """
+    try:
+        body = decode_response(response)
+    except ValueError:
+        return None
+    match = _DURATION.match(_find_retry_delay(body) or "")
+    return float(match.group(1)) if match else None
+
+
+class RateLimiter:
+    """Token bucket and per-customer concurrency caps shared by a whole run.
+
+    Requests take a token from a bucket refilled at `requests_per_second`, up to
+    one second's worth. When the API reports exhausted quota every request pauses
+    for the delay it asks for, and the rate is halved, then recovers step by step
+    with each successful response, so throughput stays close to what the API
+    allows.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        max_requests_per_customer: Optional[int] = None,
+    ) -> None:
+        """Create a limiter; None disables the corresponding limit."""
+        self.max_rate = requests_per_second
+        self.rate = requests_per_second
+        self.max_requests_per_customer = max_requests_per_customer
+        self._burst = max(requests_per_second or 1.0, 1.0)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self._customer_slots: Dict[str, threading.Semaphore] = {}
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def reserve(self) -> float:
+        """Take a token if a request may be sent now, else return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._resume_at - now
+            rate = self.rate
+            if wait > 0 or not rate:
+                return max(wait, 0.0)
+            elapsed = now - self._updated
+            self._tokens = min(self._burst, self._tokens + elapsed * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / rate
+
+    def _customer_slot(self, customer_id: Optional[str]) -> ContextManager:
+        if not self.max_requests_per_customer or customer_id is None:
+            return nullcontext()
+        with self._lock:
+            if customer_id not in self._customer_slots:
+                self._customer_slots[customer_id] = threading.BoundedSemaphore(
+                    self.max_requests_per_customer
+                )
+            return self._customer_slots[customer_id]
+
+    @contextmanager
+    def request(self, customer_id: Optional[str] = None) -> Iterator[None]:
+        """Hold a request slot of `customer_id` and a token while sending a request."""
+        with self._customer_slot(customer_id):
+            self.acquire()
+            yield
+
+    def throttled(self, delay: Optional[float]) -> None:
+        """Pause all requests for `delay` seconds, or one, and halve the rate."""
+        with self._lock:
+            resume_at = time.monotonic() + (1.0 if delay is None else delay)
+            self._resume_at = max(self._resume_at, resume_at)
+            if self.rate and self.max_rate:
+                self.rate = max(self.rate / 2, self.max_rate / 16)
+
+    def succeeded(self) -> None:
+        """Recover part of the rate lost to earlier quota errors."""
+        with self._lock:
+            if self.rate and self.max_rate and self.rate < self.max_rate:
+                self.rate = min(self.rate + self.max_rate / 16, self.max_rate)
@@ -0,0 +1,338 @@
+"""Record transformations compiled once per stream."""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+import threading
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from singer_sdk.helpers._typing import _warn_unmapped_properties
+
+_CAMEL_CASE_BOUNDARY = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+@lru_cache(maxsize=None)
+def snake_case(key: str) -> str:
+    """Return the snake_case form of a camelCase key, e.g. `adGroup` to `ad_group`."""
+    return _CAMEL_CASE_BOUNDARY.sub("_", key).lower()
+
+
+def flat_key(key: str) -> str:
+    """Return the flattened snake_case form of a `__` separated key path."""
+    return "__".join(snake_case(part) for part in key.split("__"))
+
+
+class _Plan(Dict[str, Union[str, "_Plan"]]):
+    """Output key, or nested plan, of each property of an object."""
+
+    def __init__(self, prefix: str) -> None:
+        super().__init__()
+        self.prefix = prefix
+
+
+def _is_object(schema: dict) -> bool:
+    types = schema.get("type", [])
+    return "properties" in schema and (types == "object" or "object" in types)
+
+
+def _nullable(schema: dict) -> dict:
+    types = schema.get("type")
+    if types is None or types == "null" or "null" in types:
+        return schema
+    return {
+        **schema,
+        "type": [types, "null"] if isinstance(types, str) else [*types, "null"],
+    }
+
+
+class RecordFlattener:
+    """Flatten nested camelCase records into `parent__child` snake_case keys.
+
+    The key of every schema property is worked out once, when the flattener is
+    built, so transforming a record is a single walk over its values with a dict
+    lookup per key. Keys missing from the schema are converted on first sight and
+    remembered.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        """Compile the flattening of records of `schema`."""
+        properties: Dict[str, Any] = {}
+        self._plan = self._compile(schema.get("properties", {}), _Plan(""), properties)
+        self.schema = {**schema, "properties": properties}
+
+    def _compile(self, schema_properties: dict, plan: _Plan, properties: dict) -> _Plan:
+        for key, schema in schema_properties.items():
+            name = plan.prefix + snake_case(key)
+            if _is_object(schema):
+                nested = _Plan(name + "__")
+                self._compile(schema["properties"], nested, properties)
+                plan[key] = nested
+            else:
+                properties[name] = _nullable(schema) if plan.prefix else schema
+                plan[key] = name
+        return plan
+
+    def __call__(self, record: dict) -> dict:
+        """Return the flattened copy of `record`."""
+        flat: Dict[str, Any] = {}
+        self._flatten(record, self._plan, flat)
+        return flat
+
+    def _flatten(self, values: dict, plan: _Plan, flat: dict) -> None:
+        for key, value in values.items():
+            target = plan.get(key)
+            if target is None:
+                target = plan[key] = plan.prefix + snake_case(key)
+            if isinstance(target, str):
+                flat[target] = value
+            elif isinstance(value, dict):
+                self._flatten(value, target, flat)
+
+
+# Value of a field missing from a packed row
+_ABSENT = object()
+
+
+class _Layout(Dict[str, Union[int, "_Layout"]]):
+    """Position in a packed row, or nested layout, of each key of an object.
+
+    `position` is where the object's key is kept when its value is not an object.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        super().__init__()
+        self.prefix = prefix
+        self.position: Optional[int] = None
+
+
+class RowPacker:
+    """Pack rows into tuples of their values, and unpack them back into dicts.
+
+    A decoded row is a nest of dicts repeating the same keys, each with its own
+    overhead. Packed, a row is a single tuple of its values, at the positions of
+    a field index shared by every row of the stream and extended whenever a row
+    has a new key, so rows of any shape round-trip. Strings are interned, except
+    those of `unique_fields`, so the enum values, ids and names repeated across
+    rows are each held once.
+    """
+
+    def __init__(self, unique_fields: Collection[str] = ()) -> None:
+        """Start an empty field index; `unique_fields` are dotted key paths."""
+        self._unique_fields = frozenset(unique_fields)
+        self._layout = _Layout("")
+        self._interned: List[bool] = []
+        self._lock = threading.Lock()
+
+    def pack(self, row: dict) -> tuple:
+        """Return the values of `row` at their positions in the field index."""
+        values: List[Any] = [_ABSENT] * len(self._interned)
+        self._pack(row, self._layout, values)
+        return tuple(values)
+
+    def _pack(self, row: dict, layout: _Layout, values: List[Any]) -> None:
+        interned = self._interned
+        for key, value in row.items():
+            target = layout.get(key)
+            nested = value.__class__ is dict and bool(value)
+            if target.__class__ is not int and not (
+                target.__class__ is _Layout and nested
+            ):
+                target = self._position(layout, key, value, values)
+            if target.__class__ is _Layout:
+                self._pack(value, target, values)  # type: ignore[arg-type]
+                continue
+            if value.__class__ is str and interned[target]:  # type: ignore[index]
+                value = sys.intern(value)
+            try:
+                values[target] = value  # type: ignore[index]
+            except IndexError:
+                # Another thread extended the index since `values` was sized
+                values.extend(
+                    [_ABSENT] * (target + 1 - len(values))  # type: ignore[operator]
+                )
+                values[target] = value  # type: ignore[index]
+
+    def _position(
+        self, layout: _Layout, key: str, value: Any, values: List[Any]
+    ) -> Any:
+        """Return where `key` of `layout` is kept, adding it to the index if new.
+
+        A non-empty object starts a nested layout, while any other value, or an
+        object at a key with a position already, is kept as it is.
+        """
+        with self._lock:
+            target = layout.get(key)
+            if target is None and value.__class__ is dict and value:
+                target = layout[key] = _Layout(f"{layout.prefix}{key}.")
+                return target
+            if isinstance(target, int) or (
+                isinstance(target, _Layout) and target.position is not None
+            ):
+                return target if isinstance(target, int) else target.position
+            position = len(self._interned)
+            self._interned.append(layout.prefix + key not in self._unique_fields)
+            if target is None:
+                layout[key] = position
+            else:
+                target.position = position
+            values.extend([_ABSENT] * (position + 1 - len(values)))
+            return position
+
+    def unpack(self, values: Sequence[Any]) -> dict:
+        """Return the row packed into `values`."""
+        with self._lock:
+            missing = len(self._interned) - len(values)
+            if missing > 0:
+                # Packed before the index was extended
+                values = (*values, *[_ABSENT] * missing)
+            return self._unpack(values, self._layout)
+
+    def _unpack(self, values: Sequence[Any], layout: _Layout) -> dict:
+        row = {}
+        for key, target in layout.items():
+            if target.__class__ is int:
+                value = values[target]  # type: ignore[index]
+                if value is not _ABSENT:
+                    row[key] = value
+                continue
+            nested = self._unpack(values, target)  # type: ignore[arg-type]
+            if nested:
+                row[key] = nested
+            elif target.position is not None:  # type: ignore[union-attr]
+                value = values[target.position]  # type: ignore[union-attr]
+                if value is not _ABSENT:
+                    row[key] = value
+        return row
+
+    def unpack_all(self, rows: List[tuple]) -> Iterator[dict]:
+        """Unpack and yield `rows` in order, letting go of each packed row."""
+        rows.reverse()
+        while rows:
+            yield self.unpack(rows.pop())
+
+
+def _types(schema: dict) -> List[str]:
+    types = schema.get("type", [])
+    return [types] if isinstance(types, str) else list(types)
+
+
+def int64_as_integer(schema: dict, *, metrics: bool = False) -> dict:
+    """Return a copy of `schema` typing int64 fields as integers.
+
+    The API encodes int64 values as JSON strings. Those are the metrics typed as
+    strings, such as `metrics.clicks`, and the `...Micros` amounts.
+    """
+    properties = {}
+    for key, prop in schema.get("properties", {}).items():
+        types = _types(prop)
+        if "properties" in prop:
+            prop = int64_as_integer(prop, metrics=metrics or key == "metrics")
+        elif "string" in types and (metrics or key.endswith("Micros")):
+            prop = {**prop, "type": ["integer" if t == "string" else t for t in types]}
+        properties[key] = prop
+    return {**schema, "properties": properties}
+
+
+_Conform = Callable[[Any, List[str]], Any]
+
+
+def _to_integer(value: Any, unmapped: List[str]) -> Any:
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _to_number(value: Any, unmapped: List[str]) -> Any:
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+class RecordConformer:
+    """Conform records to a stream schema with conversions compiled from it.
+
+    This does the work of the SDK's generic `conform_record_data_types` for the
+    types report schemas use: numeric strings become integers or numbers, and
+    properties missing from the schema are dropped with a warning. The
+    conversion of every property is chosen once, when the conformer is built,
+    and properties needing none are copied as they are.
+    """
+
+    def __init__(self, schema: dict, stream_name: str, logger: logging.Logger) -> None:
+        """Compile the conversions of records of `schema`."""
+        self._conform = self._compile_object(schema, "")
+        self._stream_name = stream_name
+        self._logger = logger
+
+    def _compile(self, schema: dict, path: str) -> Optional[_Conform]:
+        types = _types(schema)
+        if "properties" in schema and "object" in types:
+            return self._compile_object(schema, path)
+        if "array" in types and "items" in schema:
+            conform_item = self._compile(schema["items"], path)
+            if conform_item is None:
+                return None
+
+            def conform_array(value: Any, unmapped: List[str]) -> Any:
+                if not isinstance(value, list):
+                    return value
+                return [conform_item(item, unmapped) for item in value]
+
+            return conform_array
+        if "integer" in types:
+            return _to_integer
+        if "number" in types:
+            return _to_number
+        return None
+
+    def _compile_object(self, schema: dict, path: str) -> _Conform:
+        conversions = {
+            key: self._compile(prop, f"{path}{key}.")
+            for key, prop in schema["properties"].items()
+        }
+        keep_unmapped = bool(schema.get("additionalProperties"))
+
+        def conform_object(value: Any, unmapped: List[str]) -> Any:
+            if not isinstance(value, dict):
+                return value
+            conformed = {}
+            for key, item in value.items():
+                if key in conversions:
+                    conform = conversions[key]
+                    conformed[key] = (
+                        item if conform is None else conform(item, unmapped)
+                    )
+                elif keep_unmapped:
+                    conformed[key] = item
+                else:
+                    unmapped.append(path + key)
+            return conformed
+
+        return conform_object
+
+    def __call__(self, record: dict) -> dict:
+        """Return the conformed copy of `record`."""
+        unmapped: List[str] = []
+        conformed = self._conform(record, unmapped)
+        if unmapped:
+            _warn_unmapped_properties(self._stream_name, tuple(unmapped), self._logger)
+        return conformed